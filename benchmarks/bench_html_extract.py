@@ -0,0 +1,109 @@
+"""
+Benchmark HTML text extraction engines
+
+Compares the single-pass lxml extractor (extract_text) against the original
+BeautifulSoup implementation (extract_text_bs4) on a corpus of pages and
+reports throughput and peak memory for each. Each engine runs in its own
+child process so peak RSS reflects only that engine.
+
+Usage:
+    python -m benchmarks.bench_html_extract
+    python -m benchmarks.bench_html_extract --corpus path/to/saved/pages --repeat 5
+"""
+
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.corpus import build_corpus, load_corpus  # noqa: E402
+from src.core.html_extractor import extract_text, extract_text_bs4  # noqa: E402
+
+
+ENGINES = {
+    "bs4 (original)": extract_text_bs4,
+    "lxml single-pass": extract_text,
+}
+
+
+def _rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_engine(name, pages, repeat, queue):
+    extractor = ENGINES[name]
+    baseline = _rss_mb()
+    results = {}
+    timings = {}
+    for page_name, html in pages.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results[page_name] = extractor(html)
+            best = min(best, time.perf_counter() - start)
+        timings[page_name] = best
+    queue.put((timings, results, _rss_mb() - baseline))
+
+
+def run_engine(name, pages, repeat):
+    """Run one engine in a fresh process and collect its timings and output."""
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=_run_engine, args=(name, pages, repeat, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML text extraction")
+    parser.add_argument("--corpus", help="Directory of saved *.html pages (default: generated corpus)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per page; the best time is reported")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus) if args.corpus else build_corpus()
+    if not pages:
+        sys.exit(f"No pages found in {args.corpus}")
+
+    sizes = {name: len(html.encode("utf-8")) for name, html in pages.items()}
+    total_mb = sum(sizes.values()) / (1024 * 1024)
+    print(f"Corpus: {len(pages)} pages, {total_mb:.1f} MB, best of {args.repeat} runs\n")
+
+    reports = {name: run_engine(name, pages, args.repeat) for name in ENGINES}
+
+    header = f"{'page':<22}{'size KB':>10}" + "".join(f"{name + ' ms':>22}" for name in ENGINES) + f"{'speedup':>10}"
+    print(header)
+    print("-" * len(header))
+    baseline_name, candidate_name = list(ENGINES)
+    for page_name in pages:
+        row = f"{page_name:<22}{sizes[page_name] / 1024:>10.0f}"
+        for name in ENGINES:
+            row += f"{reports[name][0][page_name] * 1000:>22.1f}"
+        speedup = reports[baseline_name][0][page_name] / reports[candidate_name][0][page_name]
+        print(row + f"{speedup:>9.1f}x")
+
+    print()
+    for name in ENGINES:
+        timings, _, peak_mb = reports[name]
+        elapsed = sum(timings.values())
+        print(f"{name:<20} throughput {total_mb / elapsed:>7.1f} MB/s   peak RSS growth {peak_mb:>7.1f} MB")
+
+    mismatched = [
+        page_name for page_name in pages
+        if reports[baseline_name][1][page_name] != reports[candidate_name][1][page_name]
+    ]
+    print()
+    if mismatched:
+        print(f"Output differs from the original on: {', '.join(mismatched)}")
+    else:
+        print("Output identical to the original on every page")
+
+
+if __name__ == "__main__":
+    main()
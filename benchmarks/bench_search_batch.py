@@ -0,0 +1,125 @@
+"""
+Benchmark batch search against separate search calls
+
+Serves SearxNG responses from an in-process mock with a fixed per-request
+latency and compares N sequential search_general calls (one tool call per
+query) against a single search_batch call over the same queries. The result
+cache is disabled so every query reaches the mock server.
+
+Usage:
+    python -m benchmarks.bench_search_batch
+    python -m benchmarks.bench_search_batch --queries 8 --latency 0.3 --repeat 5
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.search import SearxngClient  # noqa: E402
+
+
+RESULTS_PER_QUERY = 10
+
+
+def make_handler(latency: float, jitter: float, overlap: float, seed: int = 0):
+    """Build a mock SearxNG handler with latency and cross-query URL overlap."""
+    rng = random.Random(seed)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency + rng.uniform(0, jitter))
+        query = request.url.params['q']
+        # Result URLs depend only on the query so every run returns the same set
+        query_rng = random.Random(f"{seed}:{query}")
+        results = []
+        for rank in range(RESULTS_PER_QUERY):
+            # Some results are shared between queries, as with reformulations
+            if query_rng.random() < overlap:
+                url = f"https://shared.example/{rank}"
+            else:
+                url = f"https://{query.replace(' ', '-')}.example/{rank}"
+            results.append({
+                'url': url,
+                'title': f"{query} result {rank}",
+                'content': "snippet " * 20,
+                'engine': 'mock',
+                'score': round(1.0 / (rank + 1), 2),
+            })
+        return httpx.Response(200, json={
+            'query': query,
+            'number_of_results': len(results),
+            'results': results,
+        })
+
+    return handler
+
+
+def make_client(handler) -> SearxngClient:
+    client = SearxngClient(
+        "http://searxng.bench",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    client.cache = None
+    return client
+
+
+async def run_sequential(client: SearxngClient, queries):
+    start = time.perf_counter()
+    results = []
+    for query in queries:
+        results.extend(await client.search_general(query, max_results=RESULTS_PER_QUERY))
+    return time.perf_counter() - start, len(results), len({result.url for result in results})
+
+
+async def run_batch(client: SearxngClient, queries):
+    start = time.perf_counter()
+    response = await client.search_batch(queries, max_results=RESULTS_PER_QUERY)
+    return time.perf_counter() - start, len(response.results)
+
+
+async def bench(args):
+    queries = [f"query variant {index}" for index in range(args.queries)]
+    client = make_client(make_handler(args.latency, args.jitter, args.overlap))
+    try:
+        sequential = []
+        batch = []
+        for _ in range(args.repeat):
+            sequential.append(await run_sequential(client, queries))
+            batch.append(await run_batch(client, queries))
+    finally:
+        await client.aclose()
+
+    sequential_best = min(run[0] for run in sequential)
+    batch_best = min(run[0] for run in batch)
+    _, returned, unique = sequential[0]
+    merged = batch[0][1]
+
+    print(f"{args.queries} queries, {args.latency * 1000:.0f} ms (+{args.jitter * 1000:.0f} ms jitter) "
+          f"per SearxNG request, best of {args.repeat} runs\n")
+    print(f"{'mode':<28}{'wall ms':>10}{'results':>10}")
+    print("-" * 48)
+    print(f"{'separate search calls':<28}{sequential_best * 1000:>10.1f}{returned:>10}")
+    print(f"{'search_batch':<28}{batch_best * 1000:>10.1f}{merged:>10}")
+    print()
+    print(f"Speedup: {sequential_best / batch_best:.1f}x; "
+          f"{returned - unique} duplicate URLs removed by the merge")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch search")
+    parser.add_argument("--queries", type=int, default=5, help="Number of queries per batch")
+    parser.add_argument("--latency", type=float, default=0.25, help="Simulated SearxNG latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Random extra latency in seconds")
+    parser.add_argument("--overlap", type=float, default=0.3, help="Share of results common to all queries")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the best time is reported")
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Deterministic HTML corpus for extraction benchmarks
+
+Generates pages shaped like the ones fetch_content sees in practice:
+news/blog articles with navigation and ad chrome, documentation pages with
+code blocks, forum threads, and table-heavy reference pages. Pages are
+seeded so every run benchmarks the same bytes.
+"""
+
+import random
+from pathlib import Path
+from typing import Dict
+
+
+WORDS = (
+    "the of and to in is that for it as with was on be by this are at from or an "
+    "search engine result page content server client request response latency cache "
+    "python model agent token stream parse document query index network protocol "
+    "data value system function method class module package error exception retry"
+).split()
+
+
+def _sentence(rng: random.Random, length: int = 14) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(length // 2, length * 2))]
+    words[0] = words[0].capitalize()
+    return " ".join(words) + "."
+
+
+def _paragraph(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(3, 7)):
+        sentence = _sentence(rng)
+        if rng.random() < 0.3:
+            word = rng.choice(WORDS)
+            sentence = sentence.replace(f" {word} ", f" <a href=\"/wiki/{word}\">{word}</a> ", 1)
+        if rng.random() < 0.2:
+            word = rng.choice(WORDS)
+            sentence = sentence.replace(f" {word} ", f" <strong>{word}</strong> ", 1)
+        parts.append(sentence)
+    return "<p>" + " ".join(parts) + "</p>\n"
+
+
+def _chrome(rng: random.Random) -> Dict[str, str]:
+    """Navigation, header, footer and script blocks shared by all page types."""
+    links = "".join(f'<li><a href="/section/{i}">{rng.choice(WORDS).title()}</a></li>' for i in range(40))
+    state = ",".join(f'"{rng.choice(WORDS)}{i}":{rng.randint(0, 10**6)}' for i in range(400))
+    return {
+        "head": (
+            "<head><meta charset=\"utf-8\"><title>" + _sentence(rng, 6) + "</title>"
+            "<style>" + "".join(f".c{i}{{margin:{i}px;color:#{i:06x}}}" for i in range(300)) + "</style>"
+            "<script>window.__STATE__={" + state + "};</script></head>\n"
+        ),
+        "header": "<header><div class=\"logo\">Site</div><nav><ul>" + links + "</ul></nav></header>\n",
+        "aside": "<aside><h3>Related</h3><ul>" + links + "</ul><div class=\"ad\">Advertisement</div></aside>\n",
+        "footer": "<footer><p>&copy; 2025 Example Media</p><nav><ul>" + links + "</ul></nav></footer>\n",
+        "tracking": "<script>" + "(function(){var t=" + str(rng.random()) + ";})();" * 50 + "</script>\n",
+    }
+
+
+def article_page(rng: random.Random, paragraphs: int) -> str:
+    chrome = _chrome(rng)
+    body = []
+    for i in range(paragraphs):
+        if i % 8 == 0:
+            body.append(f"<h2 id=\"s{i}\">{_sentence(rng, 5)}</h2>\n")
+        body.append(_paragraph(rng))
+        if i % 15 == 7:
+            body.append("<figure><img src=\"/img.png\" alt=\"figure\"><figcaption>" + _sentence(rng) + "</figcaption></figure>\n")
+        if i % 20 == 11:
+            body.append("<!-- ad slot --><div class=\"ad\"><script>loadAd(" + str(i) + ")</script></div>\n")
+    return (
+        "<!DOCTYPE html><html lang=\"en\">" + chrome["head"] + "<body>" + chrome["header"] +
+        "<main><article>" + "".join(body) + "</article></main>" + chrome["aside"] +
+        chrome["footer"] + chrome["tracking"] + "</body></html>"
+    )
+
+
+def docs_page(rng: random.Random, sections: int) -> str:
+    chrome = _chrome(rng)
+    body = []
+    for i in range(sections):
+        body.append(f"<h3>{rng.choice(WORDS)}.{rng.choice(WORDS)}()</h3>\n")
+        body.append(_paragraph(rng))
+        code = "\n".join(
+            f"    {rng.choice(WORDS)} = {rng.choice(WORDS)}({rng.choice(WORDS)}, {rng.randint(0, 99)})"
+            for _ in range(rng.randint(4, 12))
+        )
+        body.append(f"<pre><code class=\"language-python\">def {rng.choice(WORDS)}():\n{code}\n</code></pre>\n")
+        body.append("<ul>" + "".join(f"<li><code>{rng.choice(WORDS)}</code> &ndash; {_sentence(rng, 8)}</li>" for _ in range(5)) + "</ul>\n")
+    return (
+        "<!DOCTYPE html><html>" + chrome["head"] + "<body>" + chrome["header"] +
+        "<div class=\"content\">" + "".join(body) + "</div>" + chrome["footer"] + "</body></html>"
+    )
+
+
+def forum_page(rng: random.Random, posts: int) -> str:
+    chrome = _chrome(rng)
+    body = []
+    for i in range(posts):
+        body.append(
+            f"<div class=\"post\" id=\"p{i}\"><div class=\"meta\"><span class=\"user\">user{rng.randint(1, 5000)}</span>"
+            f"<time datetime=\"2025-01-{i % 28 + 1:02d}\">Jan {i % 28 + 1}</time></div>"
+            f"<div class=\"body\">{_paragraph(rng)}"
+            + (f"<blockquote>{_sentence(rng)}</blockquote>" if i % 3 == 0 else "") +
+            "</div><div class=\"actions\"><button>Reply</button><button>Like</button></div></div>\n"
+        )
+    return (
+        "<!DOCTYPE html><html>" + chrome["head"] + "<body>" + chrome["header"] +
+        "<section class=\"thread\">" + "".join(body) + "</section>" + chrome["aside"] +
+        chrome["footer"] + "</body></html>"
+    )
+
+
+def table_page(rng: random.Random, rows: int) -> str:
+    chrome = _chrome(rng)
+    header = "<tr>" + "".join(f"<th>{rng.choice(WORDS)}</th>" for _ in range(8)) + "</tr>"
+    body = "".join(
+        "<tr>" + "".join(f"<td>{rng.choice(WORDS)} {rng.randint(0, 10**5)}</td>" for _ in range(8)) + "</tr>\n"
+        for _ in range(rows)
+    )
+    return (
+        "<!DOCTYPE html><html>" + chrome["head"] + "<body>" + chrome["header"] +
+        "<table><thead>" + header + "</thead><tbody>" + body + "</tbody></table>" +
+        chrome["footer"] + "</body></html>"
+    )
+
+
+def build_corpus(seed: int = 1234) -> Dict[str, str]:
+    """Return the benchmark corpus as a mapping of page name to HTML."""
+    rng = random.Random(seed)
+    return {
+        "article_small.html": article_page(rng, 20),
+        "article_large.html": article_page(rng, 600),
+        "docs.html": docs_page(rng, 150),
+        "forum.html": forum_page(rng, 400),
+        "table.html": table_page(rng, 4000),
+        "article_huge.html": article_page(rng, 4000),
+    }
+
+
+def load_corpus(directory: str) -> Dict[str, str]:
+    """Load saved pages (*.html) from a directory."""
+    pages = {}
+    for path in sorted(Path(directory).glob("*.htm*")):
+        pages[path.name] = path.read_text(encoding="utf-8", errors="replace")
+    return pages
+
+
+def write_corpus(directory: str, seed: int = 1234) -> None:
+    """Write the generated corpus to a directory."""
+    target = Path(directory)
+    target.mkdir(parents=True, exist_ok=True)
+    for name, html in build_corpus(seed).items():
+        (target / name).write_text(html, encoding="utf-8")
@@ -0,0 +1,242 @@
+"""
+Audio preprocessing, segmentation and transcript stitching for STT
+"""
+
+import re
+import shutil
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from .config import SearchException
+
+
+# Silence detection settings passed to ffmpeg's silencedetect filter
+SILENCE_NOISE_DB = -30
+SILENCE_MIN_DURATION = 0.4
+
+# How far (in seconds) a cut point may move from its target to land in a silence
+SILENCE_SEARCH_WINDOW = 30.0
+
+# Segments shorter than this fraction of the target length are merged into the previous one
+MIN_TAIL_FRACTION = 0.25
+
+# Silence trimming: pauses longer than TRIM_MIN_SILENCE below TRIM_NOISE_DB
+# are shortened to TRIM_KEEP_SILENCE seconds
+TRIM_NOISE_DB = -40
+TRIM_MIN_SILENCE = 0.6
+TRIM_KEEP_SILENCE = 0.25
+
+# Bitrate of preprocessed audio (mono opus, plenty for speech)
+PREPROCESS_BITRATE = '32k'
+
+# Maximum number of words compared when removing the overlap between segments
+MAX_OVERLAP_WORDS = 40
+
+_SILENCE_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+def ffmpeg_available() -> bool:
+    """Check whether the ffmpeg and ffprobe binaries are on PATH."""
+    return shutil.which('ffmpeg') is not None and shutil.which('ffprobe') is not None
+
+
+def _run(command: List[str], timeout: float) -> subprocess.CompletedProcess:
+    """Run an ffmpeg tool and raise SearchException if it fails."""
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise SearchException(f"{command[0]} failed: {e}")
+    if result.returncode != 0:
+        raise SearchException(f"{command[0]} failed: {result.stderr.strip()[-500:]}")
+    return result
+
+
+def probe_duration(path: Path) -> float:
+    """Return the duration of an audio file in seconds."""
+    result = _run([
+        'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1', str(path)
+    ], timeout=60)
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        raise SearchException(f"ffprobe returned no duration for {path.name}")
+
+
+def parse_silences(ffmpeg_output: str) -> List[Tuple[float, float]]:
+    """
+    Parse silencedetect log lines into (start, end) intervals.
+
+    A trailing silence_start without a matching end (silence running to the
+    end of the file) is ignored.
+    """
+    silences = []
+    start = None
+    for line in ffmpeg_output.splitlines():
+        match = _SILENCE_START.search(line)
+        if match:
+            start = max(float(match.group(1)), 0.0)
+            continue
+        match = _SILENCE_END.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def detect_silences(path: Path) -> List[Tuple[float, float]]:
+    """Run ffmpeg silencedetect over an audio file and return the silent intervals."""
+    result = _run([
+        'ffmpeg', '-nostdin', '-hide_banner', '-i', str(path), '-vn',
+        '-af', f'silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_DURATION}',
+        '-f', 'null', '-'
+    ], timeout=600)
+    return parse_silences(result.stderr)
+
+
+def plan_segments(
+    duration: float,
+    silences: Sequence[Tuple[float, float]],
+    segment_seconds: float,
+    overlap: float
+) -> List[Tuple[float, float]]:
+    """
+    Choose segment boundaries for an audio file.
+
+    Cuts are placed every segment_seconds, moved to the middle of the
+    nearest silence within SILENCE_SEARCH_WINDOW when there is one. Every
+    segment after the first starts overlap seconds before its cut so words
+    spoken across a cut without a pause appear whole in one segment.
+
+    Args:
+        duration: Total audio duration in seconds
+        silences: Silent (start, end) intervals
+        segment_seconds: Target segment length
+        overlap: Seconds each segment re-reads before its cut
+
+    Returns:
+        List of (start, end) times; a single segment means no split
+    """
+    if duration <= 0 or segment_seconds <= 0:
+        return [(0.0, max(duration, 0.0))]
+
+    midpoints = sorted((start + end) / 2 for start, end in silences)
+    window = min(SILENCE_SEARCH_WINDOW, segment_seconds / 4)
+
+    cuts = [0.0]
+    while duration - cuts[-1] > segment_seconds * (1 + MIN_TAIL_FRACTION):
+        target = cuts[-1] + segment_seconds
+        nearby = [point for point in midpoints if abs(point - target) <= window and point > cuts[-1]]
+        cuts.append(min(nearby, key=lambda point: abs(point - target)) if nearby else target)
+    cuts.append(duration)
+
+    return [
+        (max(cuts[index] - overlap, 0.0) if index else 0.0, cuts[index + 1])
+        for index in range(len(cuts) - 1)
+    ]
+
+
+def build_preprocess_filter(trim_silence: bool, tempo: float) -> Optional[str]:
+    """
+    Build the ffmpeg audio filter chain for STT preprocessing.
+
+    Args:
+        trim_silence: Shorten long pauses (including leading silence)
+        tempo: Playback speed factor (1.0 keeps the original speed)
+
+    Returns:
+        The filter string, or None when nothing needs to change
+    """
+    filters = []
+    if trim_silence:
+        filters.append(
+            f'silenceremove=start_periods=1:start_threshold={TRIM_NOISE_DB}dB'
+            f':stop_periods=-1:stop_duration={TRIM_MIN_SILENCE}'
+            f':stop_threshold={TRIM_NOISE_DB}dB:stop_silence={TRIM_KEEP_SILENCE}'
+        )
+    if tempo > 0 and tempo != 1.0:
+        # atempo accepts 0.5-2.0 per instance on older ffmpeg, so chain it
+        remaining = tempo
+        while remaining > 2.0:
+            filters.append('atempo=2.0')
+            remaining /= 2.0
+        while remaining < 0.5:
+            filters.append('atempo=0.5')
+            remaining /= 0.5
+        filters.append(f'atempo={remaining:.6g}')
+    return ','.join(filters) or None
+
+
+def preprocess_audio(source: Path, destination: Path, audio_filter: str) -> Path:
+    """Re-encode audio through a filter chain into mono opus."""
+    _run([
+        'ffmpeg', '-nostdin', '-v', 'error', '-y', '-i', str(source), '-vn',
+        '-af', audio_filter, '-ac', '1', '-c:a', 'libopus', '-b:a', PREPROCESS_BITRATE,
+        str(destination)
+    ], timeout=1800)
+    return destination
+
+
+def extract_segment(source: Path, start: float, end: float, destination: Path) -> Path:
+    """Copy [start, end) of an audio file into a new file without re-encoding."""
+    _run([
+        'ffmpeg', '-nostdin', '-v', 'error', '-y', '-ss', f'{start:.3f}', '-i', str(source),
+        '-t', f'{end - start:.3f}', '-vn', '-c', 'copy', str(destination)
+    ], timeout=300)
+    return destination
+
+
+def _word_key(word: str) -> str:
+    return ''.join(char for char in word.lower() if char.isalnum())
+
+
+def _find_overlap(previous: List[str], current: List[str]) -> Optional[Tuple[int, int]]:
+    """
+    Find where current repeats the end of previous.
+
+    A few words at either edge may be garbled because the audio was cut
+    mid-word, so the match may stop short of the end of previous and start
+    slightly into current.
+
+    Returns:
+        (words to drop from the end of previous, words to drop from the
+        start of current), or None when no overlap was found
+    """
+    tail = [_word_key(word) for word in previous[-MAX_OVERLAP_WORDS:]]
+    head = [_word_key(word) for word in current[:MAX_OVERLAP_WORDS]]
+    for size in range(min(len(tail), len(head)), 1, -1):
+        for tail_skip in range(0, 3):
+            end = len(tail) - tail_skip
+            if end < size:
+                break
+            window = tail[end - size:end]
+            for head_skip in range(0, 3):
+                if head[head_skip:head_skip + size] == window:
+                    return tail_skip, head_skip + size
+    return None
+
+
+def stitch_transcripts(parts: Sequence[str]) -> str:
+    """
+    Join segment transcripts in order, removing text repeated by the overlap.
+
+    Args:
+        parts: Transcripts of consecutive overlapping segments
+
+    Returns:
+        The combined transcript with whitespace collapsed
+    """
+    words: List[str] = []
+    for part in parts:
+        current = part.split()
+        if words and current:
+            overlap = _find_overlap(words, current)
+            if overlap is not None:
+                drop_previous, drop_current = overlap
+                if drop_previous:
+                    del words[-drop_previous:]
+                current = current[drop_current:]
+        words.extend(current)
+    return ' '.join(words)
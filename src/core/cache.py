@@ -0,0 +1,198 @@
+"""
+In-process TTL + LRU caching utilities
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Freshness states returned by TTLCache.get_with_state
+FRESH = 'fresh'
+STALE = 'stale'
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after a TTL.
+
+    Entries younger than ``ttl`` are fresh. Entries older than ``ttl`` but
+    younger than ``ttl + stale_ttl`` are stale: they can still be served while
+    a refresh runs in the background (stale-while-revalidate). Anything older
+    is dropped. The cache is bounded by entry count and, optionally, by the
+    total size reported by ``sizeof``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept
+            ttl: Seconds an entry is considered fresh
+            stale_ttl: Extra seconds a stale entry may still be served
+            max_bytes: Optional bound on the summed size of all entries
+            sizeof: Function returning the size of a value (required with max_bytes)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._refresh_tasks: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get_with_state(key, record=False)[1] is not None
+
+    def _remove(self, key: Hashable) -> None:
+        """Drop an entry and release its accounted size (lock must be held)."""
+        _, _, size = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def get_with_state(self, key: Hashable, record: bool = True) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Look up a key and report its freshness.
+
+        Args:
+            key: Cache key
+            record: Whether the lookup counts towards hit/miss statistics
+
+        Returns:
+            Tuple of (value, state) where state is FRESH, STALE or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if record:
+                    self.misses += 1
+                return None, None
+
+            value, stored_at, _ = entry
+            age = time.monotonic() - stored_at
+            if age >= self.ttl + self.stale_ttl:
+                self._remove(key)
+                if record:
+                    self.misses += 1
+                return None, None
+
+            self._entries.move_to_end(key)
+            if age < self.ttl:
+                if record:
+                    self.hits += 1
+                return value, FRESH
+
+            if record:
+                self.stale_hits += 1
+            return value, STALE
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh value for the key, or the default."""
+        value, state = self.get_with_state(key)
+        return value if state == FRESH else default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries as needed."""
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            # Values that can never fit are not cached at all
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+
+            self._entries[key] = (value, time.monotonic(), size)
+            self._total_bytes += size
+
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._total_bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return a cached value, loading it on a miss.
+
+        Stale entries are returned immediately and refreshed in the background;
+        at most one refresh runs per key.
+
+        Args:
+            key: Cache key
+            loader: Coroutine function producing the value
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        value, state = self.get_with_state(key)
+        if state == FRESH:
+            return value
+        if state == STALE:
+            self._schedule_refresh(key, loader)
+            return value
+
+        value = await loader()
+        self.set(key, value)
+        return value
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        """Start a background refresh for a key unless one is already running."""
+        if key in self._refresh_tasks:
+            return
+
+        async def refresh():
+            try:
+                self.set(key, await loader())
+            except Exception as e:
+                logger.warning(f"Background cache refresh failed for {key!r}: {e}")
+            finally:
+                self._refresh_tasks.pop(key, None)
+
+        self._refresh_tasks[key] = asyncio.create_task(refresh())
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+            }
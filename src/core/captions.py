@@ -0,0 +1,132 @@
+"""
+YouTube caption track selection and parsing
+"""
+
+import html
+import json
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Caption formats we can parse, in order of preference
+CAPTION_FORMATS = ('json3', 'vtt')
+
+# Pseudo-tracks that are not captions of the spoken audio
+_IGNORED_TRACKS = frozenset(['live_chat', 'rechat'])
+
+_VTT_TIMING = re.compile(r'^\s*(\d{2}:)?\d{2}:\d{2}[.,]\d{3}\s+-->')
+_VTT_TAG = re.compile(r'<[^>]+>')
+
+
+def _matches(track_lang: str, language: str) -> bool:
+    """Check whether a track language (e.g. 'en-US') matches a wanted language (e.g. 'en')."""
+    track_lang = track_lang.lower()
+    language = language.lower()
+    return track_lang == language or track_lang.split('-')[0] == language
+
+
+def _pick_format(formats: Sequence[dict]) -> Optional[dict]:
+    """Return the most easily parsed caption format of a track."""
+    by_ext = {entry.get('ext'): entry for entry in formats if entry.get('url')}
+    for ext in CAPTION_FORMATS:
+        if ext in by_ext:
+            return by_ext[ext]
+    return None
+
+
+def select_caption_track(
+    info: dict,
+    languages: Sequence[str],
+    allow_automatic: bool = True
+) -> Optional[Tuple[str, str, dict]]:
+    """
+    Choose the caption track that best represents the spoken audio.
+
+    Manual subtitles win over automatic captions, but only in a wanted
+    language or the video's own language (in that order); manual tracks in
+    other languages may be fan or foreign translations and are never used.
+    Automatic captions are only taken in the video's original language,
+    never as machine translations.
+
+    Args:
+        info: yt-dlp info dict with 'subtitles' and 'automatic_captions'
+        languages: Preferred language codes
+        allow_automatic: Whether auto-generated captions may be used
+
+    Returns:
+        Tuple of (language, kind, format_entry) where kind is 'manual' or
+        'automatic', or None when no usable track exists
+    """
+    original = info.get('language')
+    manual: Dict[str, List[dict]] = {
+        lang: formats for lang, formats in (info.get('subtitles') or {}).items()
+        if lang not in _IGNORED_TRACKS
+    }
+
+    wanted = list(languages) + ([original] if original else [])
+    ordered = [lang for want in wanted for lang in manual if _matches(lang, want)]
+    for lang in ordered:
+        entry = _pick_format(manual[lang])
+        if entry is not None:
+            return lang, 'manual', entry
+
+    if not allow_automatic:
+        return None
+
+    automatic: Dict[str, List[dict]] = info.get('automatic_captions') or {}
+    # yt-dlp marks the untranslated automatic track with an '-orig' suffix
+    candidates = [lang for lang in automatic if lang.endswith('-orig')]
+    if original:
+        candidates += [lang for lang in automatic if lang == original]
+    for lang in candidates:
+        entry = _pick_format(automatic[lang])
+        if entry is not None:
+            return lang, 'automatic', entry
+    return None
+
+
+def parse_json3(data: str) -> str:
+    """Extract the caption text from a YouTube json3 track."""
+    payload = json.loads(data)
+    lines = []
+    for event in payload.get('events') or []:
+        text = ''.join(segment.get('utf8', '') for segment in event.get('segs') or [])
+        text = ' '.join(text.split())
+        if text and (not lines or lines[-1] != text):
+            lines.append(text)
+    return ' '.join(lines)
+
+
+def parse_vtt(data: str) -> str:
+    """
+    Extract the caption text from a WebVTT track.
+
+    Cue timings, settings, inline tags and notes are dropped. Automatic
+    captions repeat the previous line at the start of every cue, so
+    consecutive duplicate lines are collapsed.
+    """
+    lines = []
+    in_note = False
+    for raw_line in data.splitlines():
+        line = raw_line.strip()
+        if not line:
+            in_note = False
+            continue
+        if in_note or line.startswith(('WEBVTT', 'Kind:', 'Language:', 'STYLE', 'REGION')):
+            continue
+        if line.startswith('NOTE'):
+            in_note = True
+            continue
+        if _VTT_TIMING.match(line) or line.isdigit():
+            continue
+        text = ' '.join(html.unescape(_VTT_TAG.sub('', line)).split())
+        if text and (not lines or lines[-1] != text):
+            lines.append(text)
+    return ' '.join(lines)
+
+
+def parse_captions(data: str, ext: str) -> str:
+    """Parse a caption track of the given format into plain text."""
+    if ext == 'json3':
+        return parse_json3(data)
+    return parse_vtt(data)
@@ -5,20 +5,62 @@ Configuration management for SearxNG search
 import os
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 class SearchConfig:
     """Configuration settings for search functionality."""
     
-    # Default SearxNG host
+    # Default SearxNG host; a comma-separated list spreads searches over several instances
     DEFAULT_SEARXNG_HOST = os.getenv('SEARXNG_HOST', 'http://berry:8189')
     
+    # SearxNG backend pool: an instance failing SEARXNG_FAILURE_THRESHOLD times
+    # in a row is ejected for SEARXNG_EJECT_SECONDS, health probes readmit
+    # recovered instances every SEARXNG_HEALTH_INTERVAL seconds (0 disables
+    # them), a failed search is retried on up to SEARXNG_MAX_ATTEMPTS instances
+    # and a second instance is queried when the first has not answered within
+    # SEARXNG_HEDGE_DELAY seconds (0 disables hedging)
+    SEARXNG_FAILURE_THRESHOLD = int(os.getenv('SEARXNG_FAILURE_THRESHOLD', '3'))
+    SEARXNG_EJECT_SECONDS = float(os.getenv('SEARXNG_EJECT_SECONDS', '30'))
+    SEARXNG_HEALTH_INTERVAL = float(os.getenv('SEARXNG_HEALTH_INTERVAL', '10'))
+    SEARXNG_HEALTH_PATH = os.getenv('SEARXNG_HEALTH_PATH', '/healthz')
+    SEARXNG_MAX_ATTEMPTS = int(os.getenv('SEARXNG_MAX_ATTEMPTS', '2'))
+    SEARXNG_HEDGE_DELAY = float(os.getenv('SEARXNG_HEDGE_DELAY', '0'))
+    
     # Request timeout settings
     REQUEST_TIMEOUT = 10
     
+    # SearxNG connection pool settings
+    SEARXNG_MAX_CONNECTIONS = int(os.getenv('SEARXNG_MAX_CONNECTIONS', '100'))
+    SEARXNG_MAX_KEEPALIVE = int(os.getenv('SEARXNG_MAX_KEEPALIVE', '20'))
+    SEARXNG_KEEPALIVE_EXPIRY = float(os.getenv('SEARXNG_KEEPALIVE_EXPIRY', '30'))
+    SEARXNG_HTTP2 = _env_bool('SEARXNG_HTTP2', False)
+    
+    # Search result cache (a TTL of 0 disables caching)
+    SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL', '300'))
+    SEARCH_CACHE_STALE_TTL = float(os.getenv('SEARCH_CACHE_STALE_TTL', '600'))
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '1024'))
+    
     # Result limits
     MAX_GENERAL_RESULTS = 25
     MAX_VIDEO_RESULTS = 20
     MAX_SUMMARY_RESULTS = 15
     
+    # Batch search limits
+    SEARCH_BATCH_MAX_QUERIES = 10
+    
+    # search_and_fetch pipeline limits
+    DEFAULT_PIPELINE_PAGES = 3
+    MAX_PIPELINE_PAGES = 10
+    DEFAULT_PIPELINE_PAGE_CHARS = 5000
+    DEFAULT_PIPELINE_DEADLINE = 20.0
+    MAX_PIPELINE_DEADLINE = 60.0
+    
     # Default result counts
     DEFAULT_GENERAL_RESULTS = 15
     DEFAULT_VIDEO_RESULTS = 10
@@ -26,13 +68,91 @@ class SearchConfig:
     
     # Web fetching configuration
     MAX_CONTENT_LENGTH = 30000
-    FETCH_TIMEOUT = 30.0
+    # Direct fetches: connect and time-to-first-byte budgets, and FETCH_TIMEOUT
+    # for the whole download. The Jina reader is started in parallel when the
+    # origin has not answered within FETCH_HEDGE_DELAY seconds (0 waits for
+    # the direct fetch to fail first)
+    FETCH_TIMEOUT = float(os.getenv('FETCH_TIMEOUT', '30'))
+    FETCH_CONNECT_TIMEOUT = float(os.getenv('FETCH_CONNECT_TIMEOUT', '5'))
+    FETCH_TTFB_TIMEOUT = float(os.getenv('FETCH_TTFB_TIMEOUT', '15'))
+    FETCH_HEDGE_DELAY = float(os.getenv('FETCH_HEDGE_DELAY', '5'))
+    MAX_FETCH_BYTES = int(os.getenv('MAX_FETCH_BYTES', str(10 * 1024 * 1024)))
+    
+    # Batch fetching (fetch_many)
+    FETCH_MANY_MAX_URLS = 20
+    FETCH_MANY_CONCURRENCY = int(os.getenv('FETCH_MANY_CONCURRENCY', '8'))
+    FETCH_MANY_PER_HOST = int(os.getenv('FETCH_MANY_PER_HOST', '2'))
+    
+    # HTML parsing runs in a thread below the threshold (in characters) and
+    # in a process pool above it (0 workers keeps all parsing in threads)
+    PARSE_PROCESS_THRESHOLD = int(os.getenv('PARSE_PROCESS_THRESHOLD', str(512 * 1024)))
+    PARSE_PROCESS_WORKERS = int(os.getenv('PARSE_PROCESS_WORKERS', str(os.cpu_count() or 1)))
+    
+    # Parsed document cache used for fetch_content pagination (a TTL of 0 disables caching)
+    DOCUMENT_CACHE_TTL = float(os.getenv('DOCUMENT_CACHE_TTL', '600'))
+    DOCUMENT_CACHE_MAX_ENTRIES = int(os.getenv('DOCUMENT_CACHE_MAX_ENTRIES', '256'))
+    DOCUMENT_CACHE_MAX_BYTES = int(os.getenv('DOCUMENT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    
+    # Local PDF text extraction (requires pypdf). PDFs are paginated by page,
+    # extracted PDF_PAGES_PER_BATCH pages at a time, and sent to the Jina
+    # reader when local extraction is off or fails
+    PDF_LOCAL_EXTRACTION = _env_bool('PDF_LOCAL_EXTRACTION', True)
+    PDF_MAX_BYTES = int(os.getenv('PDF_MAX_BYTES', str(50 * 1024 * 1024)))
+    PDF_PAGES_PER_BATCH = int(os.getenv('PDF_PAGES_PER_BATCH', '8'))
+    PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+    PDF_PAGE_CACHE_MAX_ENTRIES = 8192
+    
+    # Persistent content store (disabled unless a directory is configured)
+    CONTENT_STORE_DIR = os.getenv('CONTENT_STORE_DIR', '')
+    CONTENT_STORE_MAX_BYTES = int(os.getenv('CONTENT_STORE_MAX_BYTES', str(1024 * 1024 * 1024)))
+    CONTENT_STORE_FRESH_TTL = float(os.getenv('CONTENT_STORE_FRESH_TTL', '600'))
     USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     
     # YouTube STT configuration
     STT_ENDPOINT = os.getenv('STT_ENDPOINT', 'http://192.168.8.116:8000/v1')
     STT_MODEL = os.getenv('STT_MODEL', 'Systran/faster-distil-whisper-large-v3')
     STT_API_KEY = os.getenv('STT_API_KEY', 'dummy')
+    
+    # Caption tracks are used instead of STT when a video has them
+    YOUTUBE_CAPTIONS_ENABLED = _env_bool('YOUTUBE_CAPTIONS_ENABLED', True)
+    YOUTUBE_CAPTION_LANGUAGES = os.getenv('YOUTUBE_CAPTION_LANGUAGES', 'en')
+    YOUTUBE_AUTOMATIC_CAPTIONS = _env_bool('YOUTUBE_AUTOMATIC_CAPTIONS', True)
+    
+    # Native audio fast path: upload YouTube's own audio stream when its
+    # container is in STT_NATIVE_FORMATS, transcoding only as a fallback
+    STT_NATIVE_AUDIO = _env_bool('STT_NATIVE_AUDIO', True)
+    STT_NATIVE_FORMATS = os.getenv('STT_NATIVE_FORMATS', 'webm,m4a')
+    STT_IN_MEMORY_AUDIO_BYTES = 25 * 1024 * 1024
+    
+    # Optional preprocessing before STT: shorten long silences and speed the
+    # audio up by STT_TEMPO (1.0 keeps the original speed); requires ffmpeg
+    STT_TRIM_SILENCE = _env_bool('STT_TRIM_SILENCE', False)
+    STT_TEMPO = float(os.getenv('STT_TEMPO', '1.0'))
+    
+    # Long audio is split into overlapping segments of about STT_SEGMENT_SECONDS
+    # (0 disables splitting) that are transcribed STT_CONCURRENCY at a time
+    STT_CONCURRENCY = int(os.getenv('STT_CONCURRENCY', '4'))
+    STT_SEGMENT_SECONDS = float(os.getenv('STT_SEGMENT_SECONDS', '300'))
+    STT_SEGMENT_OVERLAP = float(os.getenv('STT_SEGMENT_OVERLAP', '2'))
+    
+    # Background transcription jobs (start_youtube_transcription)
+    TRANSCRIPTION_WORKERS = int(os.getenv('TRANSCRIPTION_WORKERS', '2'))
+    TRANSCRIPTION_QUEUE_SIZE = int(os.getenv('TRANSCRIPTION_QUEUE_SIZE', '32'))
+    TRANSCRIPTION_JOB_RETENTION = float(os.getenv('TRANSCRIPTION_JOB_RETENTION', '3600'))
+    
+    # Transcript cache keyed by (video_id, STT model)
+    TRANSCRIPT_CACHE_ENABLED = _env_bool('TRANSCRIPT_CACHE_ENABLED', True)
+    TRANSCRIPT_CACHE_DIR = os.getenv(
+        'TRANSCRIPT_CACHE_DIR',
+        os.path.join(os.path.expanduser('~'), '.cache', 'webintel-mcp', 'transcripts')
+    )
+    TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv('TRANSCRIPT_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+    TRANSCRIPT_CACHE_MAX_AGE = float(os.getenv('TRANSCRIPT_CACHE_MAX_AGE', str(30 * 24 * 3600)))
+    
+    # Tracing: finished spans are written as JSON lines to 'stdout', 'stderr'
+    # or, with 'file', to TRACE_FILE ('none' disables tracing)
+    TRACE_EXPORTER = os.getenv('TRACE_EXPORTER', 'none').strip().lower()
+    TRACE_FILE = os.getenv('TRACE_FILE', 'traces.jsonl')
 
 
 class SearchException(Exception):
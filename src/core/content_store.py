@@ -0,0 +1,304 @@
+"""
+Persistent on-disk store for fetched documents
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .config import SearchException
+from .models import StoredDocument
+
+
+logger = logging.getLogger(__name__)
+
+# Number of characters between byte-offset checkpoints in the text index
+CHECKPOINT_CHARS = 4096
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    url TEXT PRIMARY KEY,
+    text_hash TEXT NOT NULL,
+    body_hash TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    text_length INTEGER NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    checkpoints BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_last_access ON documents (last_access);
+"""
+
+
+def _encode_with_checkpoints(text: str) -> Tuple[bytes, List[int]]:
+    """
+    Encode text as UTF-8 and record the byte offset of every checkpoint.
+
+    Returns:
+        Tuple of (encoded_text, checkpoints) where checkpoints[i] is the byte
+        offset of character i * CHECKPOINT_CHARS
+    """
+    parts = []
+    checkpoints = []
+    position = 0
+    for start in range(0, len(text), CHECKPOINT_CHARS):
+        checkpoints.append(position)
+        encoded = text[start:start + CHECKPOINT_CHARS].encode('utf-8')
+        parts.append(encoded)
+        position += len(encoded)
+    return b''.join(parts), checkpoints
+
+
+class ContentStore:
+    """
+    Content-addressed document store that survives restarts.
+
+    Raw bodies and extracted text are written once per distinct content hash
+    under ``objects/``; a SQLite index maps URLs to those objects together with
+    their ETag/Last-Modified validators. Text slices are read through mmap
+    using a sparse character-to-byte index, so paginating a large document
+    never loads the whole text into memory. The total size is capped and the
+    least recently accessed documents are evicted first.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        """
+        Open (or create) a content store.
+
+        Args:
+            root: Directory holding the index and objects
+            max_bytes: Maximum total size of stored bodies and text
+        """
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / 'index.sqlite3'), check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def close(self) -> None:
+        """Close the SQLite index."""
+        with self._lock:
+            self._db.close()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def _write_object(self, data: bytes) -> str:
+        """Write data under its content hash and return the hash."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+        return digest
+
+    def _release_object(self, digest: Optional[str]) -> None:
+        """Delete an object unless another document still references it (lock must be held)."""
+        if not digest:
+            return
+        row = self._db.execute(
+            "SELECT 1 FROM documents WHERE text_hash = ? OR body_hash = ? LIMIT 1",
+            (digest, digest)
+        ).fetchone()
+        if row is None:
+            self._object_path(digest).unlink(missing_ok=True)
+
+    def _row_to_document(self, row) -> StoredDocument:
+        checkpoints = array('Q')
+        checkpoints.frombytes(row[9])
+        return StoredDocument(
+            url=row[0],
+            text_hash=row[1],
+            body_hash=row[2],
+            etag=row[3],
+            last_modified=row[4],
+            text_length=row[5],
+            size_bytes=row[6],
+            stored_at=row[7],
+            checkpoints=checkpoints.tolist(),
+        )
+
+    def get(self, url: str) -> Optional[StoredDocument]:
+        """Return the stored document for a URL, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, text_hash, body_hash, etag, last_modified, text_length, "
+                "size_bytes, stored_at, last_access, checkpoints FROM documents WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        document = self._row_to_document(row)
+        if not self._object_path(document.text_hash).exists():
+            # Objects removed behind our back; forget the entry
+            self.delete(url)
+            return None
+        return document
+
+    def put(
+        self,
+        url: str,
+        text: str,
+        body: bytes = b'',
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> Optional[StoredDocument]:
+        """
+        Store a document, replacing any previous version for the URL.
+
+        Args:
+            url: Document URL
+            text: Extracted text
+            body: Raw response body (optional)
+            etag: ETag response header
+            last_modified: Last-Modified response header
+
+        Returns:
+            Metadata of the stored document, or None if it exceeds the size cap
+        """
+        encoded, checkpoints = _encode_with_checkpoints(text)
+        size_bytes = len(encoded) + len(body)
+        if size_bytes > self.max_bytes:
+            return None
+
+        now = time.time()
+
+        with self._lock:
+            # Objects are written under the lock so concurrent eviction cannot
+            # release a blob before its index row exists
+            text_hash = self._write_object(encoded)
+            body_hash = self._write_object(body) if body else None
+            previous = self._db.execute(
+                "SELECT text_hash, body_hash FROM documents WHERE url = ?", (url,)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO documents (url, text_hash, body_hash, etag, last_modified, "
+                "text_length, size_bytes, stored_at, last_access, checkpoints) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, text_hash, body_hash, etag, last_modified, len(text), size_bytes,
+                 now, now, array('Q', checkpoints).tobytes())
+            )
+            if previous is not None:
+                for digest in previous:
+                    if digest not in (text_hash, body_hash):
+                        self._release_object(digest)
+            self._evict_locked()
+            self._db.commit()
+
+        return StoredDocument(
+            url=url,
+            text_hash=text_hash,
+            body_hash=body_hash,
+            etag=etag,
+            last_modified=last_modified,
+            text_length=len(text),
+            size_bytes=size_bytes,
+            stored_at=now,
+            checkpoints=checkpoints,
+        )
+
+    def touch(self, url: str, revalidated: bool = False) -> None:
+        """
+        Mark a document as recently used.
+
+        Args:
+            url: Document URL
+            revalidated: Also reset its age after a successful revalidation
+        """
+        now = time.time()
+        with self._lock:
+            if revalidated:
+                self._db.execute(
+                    "UPDATE documents SET last_access = ?, stored_at = ? WHERE url = ?", (now, now, url)
+                )
+            else:
+                self._db.execute("UPDATE documents SET last_access = ? WHERE url = ?", (now, url))
+            self._db.commit()
+
+    def delete(self, url: str) -> None:
+        """Remove a document and any objects nothing else references."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT text_hash, body_hash FROM documents WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return
+            self._db.execute("DELETE FROM documents WHERE url = ?", (url,))
+            for digest in row:
+                self._release_object(digest)
+            self._db.commit()
+
+    def total_bytes(self) -> int:
+        """Return the accounted size of all stored documents."""
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM documents").fetchone()[0]
+
+    def _evict_locked(self) -> None:
+        """Evict least recently accessed documents until under the size cap (lock must be held)."""
+        total = self._db.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM documents").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._db.execute(
+            "SELECT url, text_hash, body_hash, size_bytes FROM documents ORDER BY last_access ASC"
+        ).fetchall()
+        for url, text_hash, body_hash, size_bytes in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM documents WHERE url = ?", (url,))
+            self._release_object(text_hash)
+            self._release_object(body_hash)
+            total -= size_bytes
+            logger.debug(f"Evicted {url} from content store")
+
+    def read_slice(self, document: StoredDocument, start: int, end: int) -> str:
+        """
+        Read characters [start, end) of a stored document's text.
+
+        Only the bytes between the surrounding checkpoints are mapped and
+        decoded, independent of the document's total size.
+
+        Raises:
+            SearchException: If the stored text cannot be read
+        """
+        start = max(0, start)
+        end = min(end, document.text_length)
+        if start >= end:
+            return ""
+
+        first = start // CHECKPOINT_CHARS
+        last = -(-end // CHECKPOINT_CHARS)
+        byte_start = document.checkpoints[first]
+
+        try:
+            with open(self._object_path(document.text_hash), 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    byte_end = document.checkpoints[last] if last < len(document.checkpoints) else len(mapped)
+                    segment = mapped[byte_start:byte_end].decode('utf-8')
+        except (OSError, ValueError) as e:
+            raise SearchException(f"Failed to read stored content: {e}")
+
+        base = first * CHECKPOINT_CHARS
+        return segment[start - base:end - base]
+
+    def read_body(self, document: StoredDocument) -> Optional[bytes]:
+        """Return the raw response body of a stored document, if one was kept."""
+        if not document.body_hash:
+            return None
+        path = self._object_path(document.body_hash)
+        return path.read_bytes() if path.exists() else None
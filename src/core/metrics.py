@@ -0,0 +1,278 @@
+"""
+Prometheus-style metrics for tool calls and upstream requests
+"""
+
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Latency buckets in seconds; the upper ones cover transcription of long videos
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0
+)
+
+# A metric family rendered at scrape time: (name, type, help, [(labels, value)])
+MetricFamily = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _Metric:
+    """Base class for labelled metrics; every update goes through a lock."""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        with self._lock:
+            samples = self._samples()
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + samples
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(list(zip(self.labelnames, key)))} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track_inprogress(self, **labels) -> Iterator[None]:
+        """Count the wrapped block as in flight while it runs."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state is not None else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, (bucket_counts, total, count) in sorted(self._values.items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(labels + [('le', _format_value(bound))])} {cumulative}"
+                )
+            lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self, families: Optional[List[MetricFamily]] = None) -> str:
+        """
+        Render every metric, plus families collected at scrape time.
+
+        Args:
+            families: Extra (name, type, help, samples) families such as cache
+                statistics read from their owners when scraped
+
+        Returns:
+            The exposition text, ending with a newline
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, kind, documentation, samples in families or []:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(list(labels.items()))} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def clear(self) -> None:
+        """Reset every metric (used by tests)."""
+        for metric in self._metrics:
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+TOOL_REQUESTS = REGISTRY.counter('webintel_tool_requests_total', 'Tool calls received.', ['tool'])
+TOOL_ERRORS = REGISTRY.counter('webintel_tool_errors_total', 'Tool calls that raised an error.', ['tool'])
+TOOL_LATENCY = REGISTRY.histogram('webintel_tool_duration_seconds', 'Tool call latency.', ['tool'])
+TOOL_IN_FLIGHT = REGISTRY.gauge('webintel_tool_in_flight', 'Tool calls in progress.', ['tool'])
+
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    'webintel_upstream_duration_seconds',
+    'Latency of requests to SearxNG, origins, the Jina reader, YouTube and STT.',
+    ['upstream', 'outcome'],
+)
+UPSTREAM_IN_FLIGHT = REGISTRY.gauge('webintel_upstream_in_flight', 'Upstream requests in progress.', ['upstream'])
+
+BYTES_DOWNLOADED = REGISTRY.counter(
+    'webintel_downloaded_bytes_total', 'Response bytes downloaded from upstreams.', ['upstream']
+)
+CHARS_RETURNED = REGISTRY.counter('webintel_returned_chars_total', 'Content characters returned by tools.', ['tool'])
+
+
+def track_tool(tool: str):
+    """
+    Decorate an async tool handler to count, time and track its calls.
+
+    Any exception, including a ToolError reporting bad input, counts as an
+    error.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            TOOL_REQUESTS.inc(tool=tool)
+            started = time.perf_counter()
+            try:
+                with TOOL_IN_FLIGHT.track_inprogress(tool=tool):
+                    return await func(*args, **kwargs)
+            except Exception:
+                TOOL_ERRORS.inc(tool=tool)
+                raise
+            finally:
+                TOOL_LATENCY.observe(time.perf_counter() - started, tool=tool)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def track_upstream(upstream: str) -> Iterator[None]:
+    """
+    Time a request to an upstream service and count it as in flight.
+
+    The outcome label is 'ok', 'error', or 'cancelled' for requests
+    abandoned because another one answered first. Works around blocking
+    calls in threads as well as around awaits.
+    """
+    outcome = 'error'
+    started = time.perf_counter()
+    UPSTREAM_IN_FLIGHT.inc(upstream=upstream)
+    try:
+        yield
+        outcome = 'ok'
+    except asyncio.CancelledError:
+        outcome = 'cancelled'
+        raise
+    finally:
+        UPSTREAM_IN_FLIGHT.dec(upstream=upstream)
+        UPSTREAM_LATENCY.observe(time.perf_counter() - started, upstream=upstream, outcome=outcome)
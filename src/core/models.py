@@ -2,7 +2,7 @@
 Pydantic models for search results and API responses
 """
 
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from pydantic import BaseModel
 
 
@@ -16,6 +16,15 @@ class GeneralSearchResult(BaseModel):
     author: Optional[str] = None
 
 
+class BatchSearchResult(GeneralSearchResult):
+    queries: List[str] = []
+
+
+class BatchSearchResponse(BaseModel):
+    results: List[BatchSearchResult] = []
+    failed_queries: Dict[str, str] = {}
+
+
 class VideoSearchResult(BaseModel):
     title: str
     url: str
@@ -44,6 +53,21 @@ class VideoSearchResultOutput(BaseModel):
     length: Optional[Union[str, float]] = None
 
 
+class BatchSearchResultOutput(BaseModel):
+    """Output model for one merged result of the search_batch tool."""
+    title: str
+    url: str
+    content: Optional[str] = None
+    score: float
+    queries: List[str]
+
+
+class SearchBatchOutput(BaseModel):
+    """Output model for search_batch tool."""
+    results: List[BatchSearchResultOutput]
+    failed_queries: Dict[str, str] = {}
+
+
 class FetchContentOutput(BaseModel):
     """Output model for fetch_content tool."""
     content: str
@@ -55,14 +79,72 @@ class FetchContentOutput(BaseModel):
     success: bool
 
 
+class FetchManyItemOutput(BaseModel):
+    """Output model for one URL of the fetch_many tool."""
+    url: str
+    success: bool
+    content: Optional[str] = None
+    content_length: int = 0
+    is_truncated: bool = False
+    offset: int = 0
+    next_offset: Optional[int] = None
+    total_length: int = 0
+    error: Optional[str] = None
+
+
+class SearchAndFetchResultOutput(BaseModel):
+    """Output model for one result of the search_and_fetch tool."""
+    title: str
+    url: str
+    snippet: Optional[str] = None
+    score: float
+    page_content: Optional[str] = None
+    page_content_length: int = 0
+    is_truncated: bool = False
+    next_offset: Optional[int] = None
+    total_length: int = 0
+    error: Optional[str] = None
+
+
 class YouTubeContentOutput(BaseModel):
     """Output model for fetch_youtube_content tool."""
     video_id: str
     transcript: str
     transcript_length: int
+    source: str
+    audio_duration: Optional[float] = None
+    processed_duration: Optional[float] = None
     success: bool
 
 
+class TranscriptionJobOutput(BaseModel):
+    """Output model for start_youtube_transcription tool."""
+    job_id: str
+    status: str
+    queue_position: int = 0
+
+
+class TranscriptionJobStatusOutput(BaseModel):
+    """Output model for get_transcription_status tool."""
+    job_id: str
+    video_input: str
+    status: str
+    stage: Optional[str] = None
+    progress: float = 0.0
+    segments_done: int = 0
+    segments_total: int = 0
+    queue_position: int = 0
+    partial_transcript: Optional[str] = None
+    video_id: Optional[str] = None
+    transcript: Optional[str] = None
+    transcript_length: int = 0
+    source: Optional[str] = None
+    audio_duration: Optional[float] = None
+    processed_duration: Optional[float] = None
+    error: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+
 # Raw response model for internal use
 class RawResult(BaseModel):
     url: str
@@ -94,3 +176,50 @@ class RawSearxngResponse(BaseModel):
     infoboxes: List[dict] = []
     suggestions: List[str] = []
     unresponsive_engines: List[List[str]] = []
+
+
+# Document models for internal use by the web fetcher
+class FetchedDocument(BaseModel):
+    """A freshly downloaded document with its extracted text."""
+    text: str
+    is_truncated: bool = False  # text was cut off at the download byte cap
+    body: bytes = b''
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class PdfDocument(BaseModel):
+    """A downloaded PDF whose pages are extracted on demand."""
+    key: str  # SHA-256 of data, identifying this version of the file
+    data: bytes
+    page_count: int
+
+
+class StoredDocument(BaseModel):
+    """Metadata for a document held in the persistent content store."""
+    url: str
+    text_hash: str
+    body_hash: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    text_length: int
+    size_bytes: int
+    stored_at: float
+    checkpoints: List[int] = []
+
+
+# Transcript model for internal use by the YouTube fetcher
+class YouTubeTranscript(BaseModel):
+    """A video transcript and where it came from ('captions' or 'stt')."""
+    video_id: str
+    transcript: str
+    source: str
+    audio_duration: Optional[float] = None
+    processed_duration: Optional[float] = None
+
+
+class AudioTranscript(BaseModel):
+    """Transcript of downloaded audio and its duration before and after preprocessing."""
+    transcript: str
+    audio_duration: Optional[float] = None
+    processed_duration: Optional[float] = None
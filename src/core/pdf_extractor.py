@@ -0,0 +1,96 @@
+"""
+Page-level PDF text extraction
+"""
+
+import io
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # pragma: no cover - pypdf is optional, PDFs then go to the reader
+    PdfReader = None
+
+
+# Parsed documents kept by each process, so later page ranges of a PDF are
+# extracted without sending or parsing the file again
+READER_CACHE_SIZE = 4
+
+_readers: "OrderedDict[str, PdfReader]" = OrderedDict()
+# pypdf readers are not safe to share between threads; the lock also
+# serializes extraction when PDFs are parsed in threads instead of processes
+_readers_lock = threading.RLock()
+
+
+class PdfNotLoaded(Exception):
+    """Raised when a process holds no parsed copy of the requested PDF."""
+
+
+def pdf_available() -> bool:
+    """Check whether the PDF extraction library is installed."""
+    return PdfReader is not None
+
+
+def _open(data: bytes) -> "PdfReader":
+    """Open a PDF held in memory, unlocking files encrypted without a user password."""
+    reader = PdfReader(io.BytesIO(data))
+    if reader.is_encrypted:
+        reader.decrypt('')
+    return reader
+
+
+def _reader(key: str, data: Optional[bytes]) -> "PdfReader":
+    """
+    Return the parsed PDF for key, parsing data if this process has none.
+
+    Raises:
+        PdfNotLoaded: If the PDF is not parsed here and data is None
+    """
+    reader = _readers.get(key)
+    if reader is not None:
+        _readers.move_to_end(key)
+        return reader
+    if data is None:
+        raise PdfNotLoaded(key)
+    reader = _open(data)
+    _readers[key] = reader
+    while len(_readers) > READER_CACHE_SIZE:
+        _readers.popitem(last=False)
+    return reader
+
+
+def count_pages(key: str, data: bytes) -> int:
+    """
+    Parse a PDF, keep it under key and return its number of pages.
+
+    Only the document structure is parsed; no page content is decoded.
+    """
+    with _readers_lock:
+        return len(_reader(key, data).pages)
+
+
+def extract_pages(key: str, start: int, end: int, data: Optional[bytes] = None) -> List[str]:
+    """
+    Extract the text of pages [start, end) of a PDF.
+
+    Pages before start are never decoded, so reading deep into a long
+    document costs the same as reading its first pages.
+
+    Args:
+        key: Identifier the PDF was parsed under
+        start: Index of the first page (0-based)
+        end: Index after the last page; clamped to the page count
+        data: The PDF file contents, needed only if this process has not
+            parsed the PDF yet
+
+    Returns:
+        One string per page with whitespace runs collapsed to single spaces
+
+    Raises:
+        PdfNotLoaded: If the PDF is not parsed here and data is None
+    """
+    with _readers_lock:
+        reader = _reader(key, data)
+        end = min(end, len(reader.pages))
+        return [' '.join((reader.pages[index].extract_text() or '').split()) for index in range(start, end)]
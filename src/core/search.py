@@ -2,10 +2,19 @@
 Core search functionality for SearxNG
 """
 
-import requests
-from typing import List, Optional, Union
+import asyncio
+import logging
+import httpx
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit
 
+from .cache import TTLCache
+from .searxng_pool import SearxngBackendPool, parse_hosts
+from .singleflight import SingleFlight
+from .tracing import current_span, traced
 from .models import (
+    BatchSearchResponse,
+    BatchSearchResult,
     GeneralSearchResult, 
     VideoSearchResult, 
     RawSearxngResponse
@@ -17,19 +26,157 @@ from .config import (
 )
 
 
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    """Check whether HTTP/2 was requested and the h2 package is installed."""
+    if not SearchConfig.SEARXNG_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("SEARXNG_HTTP2 is enabled but the 'h2' package is not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+def _normalize_terms(value: Union[str, List[str], None]) -> Tuple[str, ...]:
+    """Normalize an engines/categories argument into a sorted tuple."""
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.split(',')
+    return tuple(sorted({term.strip().lower() for term in value if term.strip()}))
+
+
+def _normalize_url(url: str) -> str:
+    """Normalize a result URL for deduplication (case-insensitive host, no fragment or trailing slash)."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    path = parts.path.rstrip('/')
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+
 class SearxngClient:
     """Client for interacting with SearxNG search API."""
     
-    def __init__(self, host: str = None):
+    def __init__(
+        self,
+        host: Union[str, List[str]] = None,
+        http_client: httpx.AsyncClient = None,
+        cache: TTLCache = None
+    ):
         """
         Initialize the SearxNG client.
         
         Args:
-            host: SearxNG server URL (uses default from config if not provided)
+            host: SearxNG server URL, or several as a list or comma-separated
+                string (uses default from config if not provided)
+            http_client: Optional pre-configured async HTTP client to share
+            cache: Optional result cache (built from config if not provided)
         """
-        self.host = host or SearchConfig.DEFAULT_SEARXNG_HOST
+        self.pool = SearxngBackendPool(
+            parse_hosts(host or SearchConfig.DEFAULT_SEARXNG_HOST),
+            failure_threshold=SearchConfig.SEARXNG_FAILURE_THRESHOLD,
+            eject_seconds=SearchConfig.SEARXNG_EJECT_SECONDS,
+            health_interval=SearchConfig.SEARXNG_HEALTH_INTERVAL,
+            health_path=SearchConfig.SEARXNG_HEALTH_PATH,
+        )
+        self.host = self.pool.backends[0].url
+        self._http_client = http_client
+        if cache is None and SearchConfig.SEARCH_CACHE_TTL > 0 and SearchConfig.SEARCH_CACHE_MAX_ENTRIES > 0:
+            cache = TTLCache(
+                max_entries=SearchConfig.SEARCH_CACHE_MAX_ENTRIES,
+                ttl=SearchConfig.SEARCH_CACHE_TTL,
+                stale_ttl=SearchConfig.SEARCH_CACHE_STALE_TTL,
+            )
+        self.cache = cache
+        self._inflight = SingleFlight()
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the long-lived pooled HTTP client, creating it on first use."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                timeout=SearchConfig.REQUEST_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=SearchConfig.SEARXNG_MAX_CONNECTIONS,
+                    max_keepalive_connections=SearchConfig.SEARXNG_MAX_KEEPALIVE,
+                    keepalive_expiry=SearchConfig.SEARXNG_KEEPALIVE_EXPIRY,
+                ),
+                http2=_http2_available(),
+            )
+        return self._http_client
     
-    def _search_raw(
+    async def aclose(self) -> None:
+        """Stop the health probes, close the pooled HTTP client and release its connections."""
+        await self.pool.aclose()
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+    
+    async def _send_search(self, params: Dict) -> httpx.Response:
+        """
+        Send a search to the best backend, failing over and hedging across the pool.
+        
+        A failed request is retried on the next best backend, up to
+        SEARXNG_MAX_ATTEMPTS backends. With SEARXNG_HEDGE_DELAY set, a second
+        backend is queried when the first has not answered in time and the
+        first successful response wins; the slower request is cancelled.
+        
+        Raises:
+            httpx.HTTPError: The last error if every attempt failed
+        """
+        self.pool.start_health_checks(self._get_http_client)
+        http_client = self._get_http_client()
+        max_attempts = min(max(SearchConfig.SEARXNG_MAX_ATTEMPTS, 1), len(self.pool))
+        hedge_delay = SearchConfig.SEARXNG_HEDGE_DELAY if max_attempts > 1 else 0
+        
+        used = []
+        pending = set()
+        
+        def start_attempt() -> bool:
+            backend = self.pool.select(exclude=used)
+            if backend is None or len(used) >= max_attempts:
+                return False
+            used.append(backend)
+            pending.add(asyncio.create_task(self.pool.request(backend, http_client, '/search', params)))
+            return True
+        
+        start_attempt()
+        last_error = None
+        hedging = hedge_delay > 0
+        try:
+            while pending:
+                hedging = hedging and len(used) == 1
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if hedging else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                pending.difference_update(done)
+                done = list(done)
+                errors = [task.exception() for task in done]
+                for task, error in zip(done, errors):
+                    if error is None:
+                        return task.result()
+                for error in errors:
+                    if not isinstance(error, httpx.HTTPError):
+                        raise error
+                    last_error = error
+                
+                # Fail over after an error, or hedge when the first backend is slow
+                if (errors or hedging) and not start_attempt():
+                    # No backend left to try: wait for the requests in flight
+                    hedging = False
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    @traced('SearxngClient._search_raw')
+    async def _search_raw(
         self, 
         query: str, 
         engines: Union[str, List[str]] = None, 
@@ -52,7 +199,6 @@ class SearxngClient:
             SearchRequestException: If the search request fails
             SearchParseException: If response parsing fails
         """
-        url = f"{self.host}/search"
         params = {'q': query, 'format': 'json'}
         
         if engines:
@@ -67,14 +213,18 @@ class SearxngClient:
             else:
                 params['categories'] = categories
         
+        current_span().set_attributes({
+            'search.query': query,
+            'search.engines': params.get('engines'),
+            'search.categories': params.get('categories'),
+        })
         try:
-            response = requests.get(
-                url, 
-                params=params, 
-                timeout=SearchConfig.REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
+            response = await self._send_search(params)
             data = response.json()
+            current_span().set_attributes({
+                'http.response.body.size': len(response.content),
+                'search.result_count': len(data.get('results', [])),
+            })
             
             # Slice results if max_results is specified
             if max_results is not None and 'results' in data:
@@ -82,12 +232,52 @@ class SearxngClient:
             
             return RawSearxngResponse(**data)
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise SearchRequestException(f"Search request failed: {e}")
         except Exception as e:
             raise SearchParseException(f"Failed to parse search response: {e}")
     
-    def search_general(
+    async def _search_cached(
+        self,
+        query: str,
+        engines: Union[str, List[str]] = None,
+        categories: Union[str, List[str]] = None,
+        max_results: int = None
+    ) -> RawSearxngResponse:
+        """
+        Perform a raw search through the result cache.
+        
+        Results are keyed by the normalized query, engines, categories and
+        max_results. Stale results are served immediately while a background
+        refresh fetches a new copy, and concurrent identical searches share
+        a single request to SearxNG.
+        """
+        key = (
+            ' '.join(query.lower().split()),
+            _normalize_terms(engines),
+            _normalize_terms(categories),
+            max_results,
+        )
+        
+        def load():
+            return self._inflight.do(
+                key,
+                lambda: self._search_raw(query, engines, categories, max_results)
+            )
+        
+        if self.cache is None:
+            return await load()
+        return await self.cache.get_or_load(key, load)
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Return search cache hit/miss counters (empty if caching is disabled)."""
+        return self.cache.stats() if self.cache is not None else {}
+    
+    def backend_stats(self) -> List[Dict]:
+        """Return latency, load and circuit state of every SearxNG backend."""
+        return self.pool.stats()
+    
+    async def search_general(
         self, 
         query: str, 
         max_results: int = None
@@ -107,7 +297,7 @@ class SearxngClient:
         elif max_results > SearchConfig.MAX_GENERAL_RESULTS:
             max_results = SearchConfig.MAX_GENERAL_RESULTS
         
-        raw_response = self._search_raw(query, max_results=max_results)
+        raw_response = await self._search_cached(query, max_results=max_results)
         
         results = []
         for result in raw_response.results:
@@ -122,7 +312,83 @@ class SearxngClient:
         
         return results
     
-    def search_videos(
+    async def search_batch(
+        self,
+        queries: List[str],
+        max_results: int = None
+    ) -> BatchSearchResponse:
+        """
+        Run several general searches concurrently and merge their results.
+        
+        All queries are sent at once over the shared connection pool (and
+        through the result cache). Results are deduplicated by URL and
+        interleaved by rank, so every query's top results come first; each
+        result lists the queries that found it and keeps its best score.
+        
+        Args:
+            queries: The search queries (queries differing only in case or
+                spacing are sent once)
+            max_results: Maximum number of results per query
+            
+        Returns:
+            BatchSearchResponse with the merged results and the error of
+            every query that failed
+            
+        Raises:
+            SearchRequestException: If every query failed to reach SearxNG
+            SearchParseException: If every query failed and the first
+                failure was a parse error
+        """
+        unique_queries = {}
+        for query in queries:
+            key = ' '.join(query.lower().split())
+            if key and key not in unique_queries:
+                unique_queries[key] = query.strip()
+        queries = list(unique_queries.values())
+        
+        responses = await asyncio.gather(
+            *(self.search_general(query, max_results=max_results) for query in queries),
+            return_exceptions=True
+        )
+        
+        failed_queries = {}
+        ranked = []
+        for query, response in zip(queries, responses):
+            if isinstance(response, Exception):
+                failed_queries[query] = str(response)
+            elif isinstance(response, BaseException):
+                raise response
+            else:
+                ranked.append((query, response))
+        
+        if queries and not ranked:
+            raise next(response for response in responses if isinstance(response, Exception))
+        
+        # Interleave by rank so no single query dominates the merged list
+        merged: Dict[str, BatchSearchResult] = {}
+        depth = max((len(results) for _, results in ranked), default=0)
+        for rank in range(depth):
+            for query, results in ranked:
+                if rank >= len(results):
+                    continue
+                result = results[rank]
+                key = _normalize_url(result.url)
+                existing = merged.get(key)
+                if existing is None:
+                    merged[key] = BatchSearchResult(**result.model_dump(), queries=[query])
+                    continue
+                if query not in existing.queries:
+                    existing.queries.append(query)
+                if (result.score or 0.0) > (existing.score or 0.0):
+                    existing.score = result.score
+        
+        order = {query: index for index, query in enumerate(queries)}
+        for result in merged.values():
+            result.queries.sort(key=order.__getitem__)
+        
+        return BatchSearchResponse(results=list(merged.values()), failed_queries=failed_queries)
+    
+    async def search_videos(
         self, 
         query: str, 
         engines: str = 'youtube', 
@@ -144,7 +410,7 @@ class SearxngClient:
         elif max_results > SearchConfig.MAX_VIDEO_RESULTS:
             max_results = SearchConfig.MAX_VIDEO_RESULTS
         
-        raw_response = self._search_raw(
+        raw_response = await self._search_cached(
             query,
             engines=engines,
             categories='videos',
@@ -169,6 +435,15 @@ class SearxngClient:
         return results
 
 
+async def _search_once(host: Optional[str], method: str, *args):
+    """Run a single search on a short-lived client and close it afterwards."""
+    client = SearxngClient(host)
+    try:
+        return await getattr(client, method)(*args)
+    finally:
+        await client.aclose()
+
+
 # Convenience functions that maintain backward compatibility
 def search_general(query: str, host: str = None, max_results: int = None) -> List[GeneralSearchResult]:
     """
@@ -182,8 +457,7 @@ def search_general(query: str, host: str = None, max_results: int = None) -> Lis
     Returns:
         List of GeneralSearchResult objects
     """
-    client = SearxngClient(host)
-    return client.search_general(query, max_results)
+    return asyncio.run(_search_once(host, 'search_general', query, max_results))
 
 
 def search_videos(query: str, host: str = None, engines: str = 'youtube', max_results: int = None) -> List[VideoSearchResult]:
@@ -199,5 +473,4 @@ def search_videos(query: str, host: str = None, engines: str = 'youtube', max_re
     Returns:
         List of VideoSearchResult objects
     """
-    client = SearxngClient(host)
-    return client.search_videos(query, engines, max_results)
\ No newline at end of file
+    return asyncio.run(_search_once(host, 'search_videos', query, engines, max_results))
\ No newline at end of file
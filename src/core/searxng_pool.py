@@ -0,0 +1,254 @@
+"""
+Health-checked, latency-aware pool of SearxNG backends
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Union
+
+import httpx
+
+from .metrics import BYTES_DOWNLOADED, track_upstream
+from .tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest latency sample in a backend's moving average
+EWMA_ALPHA = 0.3
+
+
+def parse_hosts(hosts: Union[str, Sequence[str]]) -> List[str]:
+    """Split a comma-separated host list (or a list of hosts) into unique hosts."""
+    if isinstance(hosts, str):
+        hosts = hosts.split(',')
+    unique = []
+    for host in hosts:
+        host = host.strip().rstrip('/')
+        if host and host not in unique:
+            unique.append(host)
+    return unique
+
+
+class SearxngBackend:
+    """
+    Request statistics and circuit state of one SearxNG instance.
+
+    A backend that fails ``failure_threshold`` times in a row is ejected for
+    ``eject_seconds``. After that it is half-open: a single trial request
+    (or health probe) is let through, and its outcome either readmits the
+    backend or ejects it again.
+    """
+
+    def __init__(self, url: str, failure_threshold: int, eject_seconds: float):
+        self.url = url
+        self.failure_threshold = max(failure_threshold, 1)
+        self.eject_seconds = eject_seconds
+        self.latency: Optional[float] = None
+        self.outstanding = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def ejected(self) -> bool:
+        """Whether the circuit is open (including half-open)."""
+        return self.failures >= self.failure_threshold
+
+    def available(self, now: float) -> bool:
+        """Whether a request may be sent to this backend now."""
+        if not self.ejected:
+            return True
+        return now >= self.ejected_until and self.outstanding == 0
+
+    def score(self) -> float:
+        """
+        Expected wait for a new request: average latency times queue length.
+
+        Backends without samples score 0 so they are tried first.
+        """
+        return (self.latency or 0.0) * (self.outstanding + 1)
+
+    def record_latency(self, seconds: float) -> None:
+        """Fold a latency sample into the moving average."""
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency = EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * self.latency
+
+    def record_success(self, seconds: Optional[float] = None) -> None:
+        """Record a successful request (or probe) and close the circuit."""
+        if seconds is not None:
+            self.record_latency(seconds)
+        if self.ejected:
+            logger.info(f"SearxNG backend {self.url} readmitted")
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        """Record a failed request (or probe), ejecting the backend at the threshold."""
+        self.failures += 1
+        self.errors += 1
+        if self.ejected:
+            if self.failures == self.failure_threshold:
+                logger.warning(f"SearxNG backend {self.url} ejected after {self.failures} consecutive failures")
+            self.ejected_until = time.monotonic() + self.eject_seconds
+
+    def stats(self) -> Dict:
+        return {
+            'url': self.url,
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            'outstanding': self.outstanding,
+            'requests': self.requests,
+            'errors': self.errors,
+            'ejected': self.ejected,
+        }
+
+
+class SearxngBackendPool:
+    """
+    Set of SearxNG backends with latency-aware selection.
+
+    Requests go to the available backend with the lowest expected wait
+    (EWMA latency weighted by outstanding requests). When every backend is
+    ejected, the one due back soonest is used rather than failing outright.
+    Optional background probes readmit recovered backends without waiting
+    for a live request to try them.
+    """
+
+    def __init__(
+        self,
+        hosts: Sequence[str],
+        failure_threshold: int,
+        eject_seconds: float,
+        health_interval: float = 0.0,
+        health_path: str = '/healthz'
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            hosts: Backend base URLs
+            failure_threshold: Consecutive failures that eject a backend
+            eject_seconds: Seconds an ejected backend receives no requests
+            health_interval: Seconds between health probes (0 disables them)
+            health_path: Path probed on every backend
+        """
+        if not hosts:
+            raise ValueError("At least one SearxNG host is required")
+        self.backends = [SearxngBackend(host, failure_threshold, eject_seconds) for host in hosts]
+        self.health_interval = health_interval
+        self.health_path = health_path
+        self._health_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.backends)
+
+    def select(self, exclude: Sequence[SearxngBackend] = ()) -> Optional[SearxngBackend]:
+        """
+        Choose the backend for the next request.
+
+        Args:
+            exclude: Backends already used for this request
+
+        Returns:
+            The chosen backend, or None if every backend is excluded
+        """
+        candidates = [backend for backend in self.backends if backend not in exclude]
+        if not candidates:
+            return None
+        now = time.monotonic()
+        available = [backend for backend in candidates if backend.available(now)]
+        if not available:
+            return min(candidates, key=lambda backend: backend.ejected_until)
+        return min(available, key=lambda backend: (backend.score(), backend.outstanding))
+
+    async def request(
+        self,
+        backend: SearxngBackend,
+        http_client: httpx.AsyncClient,
+        path: str,
+        params: Optional[Dict] = None
+    ) -> httpx.Response:
+        """
+        Send a GET to a backend and record its latency and outcome.
+
+        Transport errors and error statuses count as failures. A request
+        cancelled because another backend answered first still contributes
+        its elapsed time, so a slow backend is not mistaken for an idle one.
+
+        Args:
+            backend: Backend to query
+            http_client: Client to send the request with
+            path: Path appended to the backend URL
+            params: Query parameters
+
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        backend.outstanding += 1
+        backend.requests += 1
+        started = time.monotonic()
+        try:
+            with span('searxng.request', {'server.address': backend.url}) as current, track_upstream('searxng'):
+                response = await http_client.get(f"{backend.url}{path}", params=params)
+                current.set_attributes({
+                    'http.response.status_code': response.status_code,
+                    'http.response.body.size': len(response.content),
+                })
+                response.raise_for_status()
+        except httpx.HTTPError:
+            backend.record_failure()
+            raise
+        except asyncio.CancelledError:
+            backend.record_latency(time.monotonic() - started)
+            raise
+        finally:
+            backend.outstanding -= 1
+        backend.record_success(time.monotonic() - started)
+        BYTES_DOWNLOADED.inc(len(response.content), upstream='searxng')
+        return response
+
+    async def probe(self, backend: SearxngBackend, http_client: httpx.AsyncClient) -> bool:
+        """Probe one backend's health endpoint and update its circuit."""
+        try:
+            response = await http_client.get(f"{backend.url}{self.health_path}")
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.debug(f"Health probe of {backend.url} failed: {e}")
+            backend.record_failure()
+            return False
+        backend.record_success()
+        return True
+
+    def start_health_checks(self, get_http_client) -> None:
+        """
+        Start the probe loop on the running event loop if it is enabled.
+
+        Args:
+            get_http_client: Callable returning the client to probe with
+        """
+        if self.health_interval <= 0 or len(self.backends) < 2:
+            return
+        if self._health_task is not None and not self._health_task.done():
+            return
+
+        async def run():
+            while True:
+                await asyncio.sleep(self.health_interval)
+                http_client = get_http_client()
+                await asyncio.gather(*(self.probe(backend, http_client) for backend in self.backends))
+
+        self._health_task = asyncio.create_task(run())
+
+    async def aclose(self) -> None:
+        """Stop the probe loop."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+    def stats(self) -> List[Dict]:
+        """Return per-backend latency, load and circuit state."""
+        return [backend.stats() for backend in self.backends]
@@ -0,0 +1,293 @@
+"""
+Stage-level tracing with OpenTelemetry-shaped span records
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TextIO
+
+from .config import SearchConfig
+
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'webintel-mcp'
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar('current_span', default=None)
+
+# httpcore trace events timed on HTTP request spans, mapped to the attribute
+# prefix they are recorded under. DNS resolution happens inside connect_tcp,
+# so it is part of the connect time.
+_HTTP_PHASES = {
+    'connection.connect_tcp': 'network.connect',
+    'connection.start_tls': 'network.tls',
+    'http11.receive_response_headers': 'http.ttfb',
+    'http2.receive_response_headers': 'http.ttfb',
+}
+
+
+def _timestamp(nanoseconds: int) -> str:
+    return datetime.fromtimestamp(nanoseconds / 1e9, tz=timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+class Span:
+    """
+    One timed stage of a request.
+
+    Spans nest through a context variable, so a span opened inside another
+    one (including in tasks and asyncio.to_thread calls started from it)
+    becomes its child and shares its trace ID.
+    """
+
+    recording = True
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.status = 'UNSET'
+        self.description: Optional[str] = None
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+        self.set_attributes(attributes or {})
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute; None values are skipped."""
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        """Record a point in time within the span, such as the arrival of response headers."""
+        self.events.append({'name': name, 'timestamp': time.time_ns(), 'attributes': dict(attributes or {})})
+
+    def record_exception(self, error: BaseException) -> None:
+        """Mark the span failed and attach the exception as an event."""
+        self.status = 'ERROR'
+        self.description = f"{type(error).__name__}: {error}"
+        self.add_event('exception', {'exception.type': type(error).__name__, 'exception.message': str(error)})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the span like the OpenTelemetry SDK's console exporter."""
+        status = {'status_code': self.status}
+        if self.description:
+            status['description'] = self.description
+        return {
+            'name': self.name,
+            'context': {'trace_id': f'0x{self.trace_id}', 'span_id': f'0x{self.span_id}', 'trace_state': '[]'},
+            'kind': 'SpanKind.INTERNAL',
+            'parent_id': f'0x{self.parent_id}' if self.parent_id else None,
+            'start_time': _timestamp(self.start_time),
+            'end_time': _timestamp(self.end_time or time.time_ns()),
+            'duration_ms': round(((self.end_time or time.time_ns()) - self.start_time) / 1e6, 3),
+            'status': status,
+            'attributes': self.attributes,
+            'events': [
+                {'name': event['name'], 'timestamp': _timestamp(event['timestamp']), 'attributes': event['attributes']}
+                for event in self.events
+            ],
+            'links': [],
+            'resource': {'attributes': {'service.name': SERVICE_NAME}, 'schema_url': ''},
+        }
+
+
+class _NonRecordingSpan(Span):
+    """Span handed out while tracing is disabled; every call is a no-op."""
+
+    recording = False
+
+    def __init__(self):
+        pass
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def record_exception(self, error: BaseException) -> None:
+        pass
+
+
+NON_RECORDING_SPAN = _NonRecordingSpan()
+
+
+class JsonLinesExporter:
+    """Write each finished span as one JSON line to a text stream."""
+
+    def __init__(self, stream: TextIO, owns_stream: bool = False):
+        self.stream = stream
+        self.owns_stream = owns_stream
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def shutdown(self) -> None:
+        if self.owns_stream:
+            self.stream.close()
+
+
+class InMemoryExporter:
+    """Keep finished spans in a list (used by tests)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _exporter_from_config():
+    """Create the exporter selected by TRACE_EXPORTER, or None if tracing is off."""
+    kind = SearchConfig.TRACE_EXPORTER
+    if kind in ('', 'none', 'off'):
+        return None
+    if kind == 'stdout':
+        return JsonLinesExporter(sys.stdout)
+    if kind == 'stderr':
+        return JsonLinesExporter(sys.stderr)
+    if kind == 'file':
+        try:
+            return JsonLinesExporter(open(SearchConfig.TRACE_FILE, 'a', encoding='utf-8'), owns_stream=True)
+        except OSError as e:
+            logger.warning(f"Tracing disabled, cannot open {SearchConfig.TRACE_FILE}: {e}")
+            return None
+    logger.warning(f"Tracing disabled, unknown TRACE_EXPORTER {kind!r}")
+    return None
+
+
+_exporter = _exporter_from_config()
+
+
+def set_exporter(exporter):
+    """
+    Replace the span exporter.
+
+    Args:
+        exporter: Object with export(span) and shutdown(), or None to
+            disable tracing
+
+    Returns:
+        The previous exporter
+    """
+    global _exporter
+    previous, _exporter = _exporter, exporter
+    return previous
+
+
+def current_span() -> Span:
+    """Return the innermost open span, or a no-op span outside of any."""
+    return _current_span.get() or NON_RECORDING_SPAN
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Span]:
+    """
+    Open a span around a block as a child of the current span.
+
+    Exceptions mark the span as failed and propagate. Cancellation (a hedged
+    request losing its race) is recorded as an attribute rather than an
+    error. The span is exported when the block exits.
+    """
+    exporter = _exporter
+    if exporter is None:
+        yield NON_RECORDING_SPAN
+        return
+
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except asyncio.CancelledError:
+        current.set_attribute('cancelled', True)
+        raise
+    except Exception as e:
+        current.record_exception(e)
+        raise
+    finally:
+        current.end_time = time.time_ns()
+        _current_span.reset(token)
+        try:
+            exporter.export(current)
+        except Exception as e:
+            logger.debug(f"Failed to export span {name}: {e}")
+
+
+def http_trace(target: Span) -> Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]]:
+    """
+    Return an httpx trace extension that times connection phases on a span.
+
+    Pass it as extensions={'trace': http_trace(span)} on an async request.
+    Connect (including DNS resolution), TLS handshake and the wait for the
+    response headers are recorded as '<phase>.duration_ms' attributes and as
+    events. Phases are missing when a pooled connection is reused.
+
+    Returns:
+        The callback, or None (no tracing) if the span is not recording
+    """
+    if not target.recording:
+        return None
+    started: Dict[str, int] = {}
+
+    async def trace(event: str, info: Dict[str, Any]) -> None:
+        name, _, stage = event.rpartition('.')
+        phase = _HTTP_PHASES.get(name)
+        if phase is None:
+            return
+        if stage == 'started':
+            started[name] = time.monotonic_ns()
+        elif stage in ('complete', 'failed') and name in started:
+            duration = round((time.monotonic_ns() - started.pop(name)) / 1e6, 3)
+            target.set_attribute(f'{phase}.duration_ms', duration)
+            attributes: Dict[str, Any] = {'duration_ms': duration}
+            if stage == 'failed':
+                attributes['exception.message'] = str(info.get('exception'))
+            target.add_event(phase, attributes)
+
+    return trace
+
+
+def traced(name: str):
+    """Decorate a function or coroutine function to run inside a span."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,56 @@
+"""
+Durable cache of YouTube transcripts
+"""
+
+import time
+from typing import Optional
+
+from .content_store import ContentStore
+
+
+class TranscriptCache:
+    """
+    Transcript cache keyed by (video_id, STT model).
+
+    Transcripts are kept in a dedicated ContentStore so they survive restarts
+    and share its size cap and LRU eviction. Entries older than ``max_age``
+    are treated as missing and removed on access.
+    """
+
+    def __init__(self, root: str, max_bytes: int, max_age: float):
+        """
+        Open (or create) a transcript cache.
+
+        Args:
+            root: Directory holding the cache
+            max_bytes: Maximum total size of cached transcripts
+            max_age: Seconds after which a transcript is discarded
+        """
+        self.store = ContentStore(root, max_bytes=max_bytes)
+        self.max_age = max_age
+
+    @staticmethod
+    def _key(video_id: str, model: str) -> str:
+        return f"youtube:{video_id}:{model}"
+
+    def get(self, video_id: str, model: str) -> Optional[str]:
+        """Return the cached transcript, or None if missing or expired."""
+        key = self._key(video_id, model)
+        stored = self.store.get(key)
+        if stored is None:
+            return None
+
+        if time.time() - stored.stored_at > self.max_age:
+            self.store.delete(key)
+            return None
+
+        self.store.touch(key)
+        return self.store.read_slice(stored, 0, stored.text_length)
+
+    def put(self, video_id: str, model: str, transcript: str) -> None:
+        """Cache a transcript."""
+        self.store.put(self._key(video_id, model), transcript)
+
+    def close(self) -> None:
+        """Close the underlying store."""
+        self.store.close()
@@ -0,0 +1,265 @@
+"""
+Background job queue for YouTube transcriptions
+"""
+
+import asyncio
+import contextvars
+import itertools
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .config import SearchException
+from .models import YouTubeTranscript
+from .tracing import span
+from .youtube_fetcher import YouTubeContentFetcher, parse_video_id
+
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+_FINISHED = (COMPLETED, FAILED)
+
+
+class TranscriptionJob:
+    """
+    State of one queued transcription.
+
+    Progress updates arrive from the worker thread running the fetcher, so
+    every read and write goes through the job's lock. The submitter's
+    context is kept so the job's spans join the trace of the request that
+    queued it.
+    """
+
+    _sequence = itertools.count()
+
+    def __init__(self, video_input: str, use_cache: bool, key: tuple):
+        self.job_id = uuid.uuid4().hex
+        self.video_input = video_input
+        self.use_cache = use_cache
+        self.key = key
+        self.sequence = next(self._sequence)
+        self.status = QUEUED
+        self.stage: Optional[str] = None
+        self.segments_done = 0
+        self.segments_total = 0
+        self.partial_transcript: Optional[str] = None
+        self.result: Optional[YouTubeTranscript] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.context = contextvars.copy_context()
+        self._lock = threading.Lock()
+
+    def update_progress(
+        self,
+        stage: str,
+        segments_done: int = 0,
+        segments_total: int = 0,
+        partial_transcript: Optional[str] = None
+    ) -> None:
+        """Record a progress report from the fetcher."""
+        with self._lock:
+            self.stage = stage
+            self.segments_done = segments_done
+            self.segments_total = segments_total
+            if partial_transcript is not None:
+                self.partial_transcript = partial_transcript
+
+    def mark_running(self) -> None:
+        with self._lock:
+            self.status = RUNNING
+            self.started_at = time.time()
+
+    def mark_completed(self, result: YouTubeTranscript) -> None:
+        with self._lock:
+            self.status = COMPLETED
+            self.result = result
+            self.partial_transcript = None
+            self.finished_at = time.time()
+
+    def mark_failed(self, error: str) -> None:
+        with self._lock:
+            self.status = FAILED
+            self.error = error
+            self.finished_at = time.time()
+
+    def snapshot(self) -> Dict:
+        """Return a consistent copy of the job state."""
+        with self._lock:
+            if self.status == COMPLETED:
+                progress = 1.0
+            elif self.segments_total:
+                progress = self.segments_done / self.segments_total
+            else:
+                progress = 0.0
+            return {
+                'job_id': self.job_id,
+                'video_input': self.video_input,
+                'status': self.status,
+                'stage': self.stage,
+                'progress': round(progress, 3),
+                'segments_done': self.segments_done,
+                'segments_total': self.segments_total,
+                'partial_transcript': self.partial_transcript,
+                'result': self.result,
+                'error': self.error,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+            }
+
+
+class TranscriptionJobQueue:
+    """
+    Bounded queue of transcription jobs processed by a fixed worker pool.
+
+    Jobs are accepted until ``max_queue`` are waiting; ``workers`` of them
+    run at a time, each in a thread via the fetcher. A request for a video
+    that is already queued or running returns the existing job. Finished
+    jobs are kept for ``retention`` seconds so their results can be polled.
+    """
+
+    def __init__(
+        self,
+        fetcher: YouTubeContentFetcher,
+        workers: int,
+        max_queue: int,
+        retention: float
+    ):
+        """
+        Initialize the queue; workers start with the first submitted job.
+
+        Args:
+            fetcher: Fetcher producing the transcripts
+            workers: Number of jobs processed concurrently
+            max_queue: Maximum number of jobs waiting to start
+            retention: Seconds finished jobs remain available
+        """
+        self.fetcher = fetcher
+        self.workers = max(workers, 1)
+        self.max_queue = max(max_queue, 1)
+        self.retention = retention
+        self._jobs: "OrderedDict[str, TranscriptionJob]" = OrderedDict()
+        self._active: Dict[tuple, TranscriptionJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    def _ensure_workers(self) -> None:
+        """Create the queue and start the workers on the running event loop."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker_tasks = [task for task in self._worker_tasks if not task.done()]
+        while len(self._worker_tasks) < self.workers:
+            # Workers outlive the request that started them, so they must not inherit its context
+            self._worker_tasks.append(asyncio.create_task(self._worker(), context=contextvars.Context()))
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention period."""
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in _FINISHED and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, video_input: str, use_cache: bool = True) -> TranscriptionJob:
+        """
+        Queue a transcription, or return the matching job already in progress.
+
+        Must be called from the event loop.
+
+        Args:
+            video_input: YouTube URL or video ID
+            use_cache: Whether the job may use the transcript cache
+
+        Returns:
+            The queued or existing job
+
+        Raises:
+            SearchException: If the queue is full
+        """
+        self._ensure_workers()
+        self._prune()
+
+        # Different URLs for one video share a job
+        key = (parse_video_id(video_input) or video_input, use_cache)
+        existing = self._active.get(key)
+        if existing is not None:
+            return existing
+
+        if self._queue.full():
+            raise SearchException(
+                f"Transcription queue is full ({self.max_queue} jobs waiting), try again later"
+            )
+
+        job = TranscriptionJob(video_input, use_cache, key)
+        self._jobs[job.job_id] = job
+        self._active[key] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[TranscriptionJob]:
+        """Return a job by ID, or None if it is unknown or expired."""
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def queue_position(self, job: TranscriptionJob) -> int:
+        """Return how many queued jobs are ahead of a job (0 if it is not queued)."""
+        if job.status != QUEUED:
+            return 0
+        return sum(1 for other in self._jobs.values() if other.status == QUEUED and other.sequence < job.sequence)
+
+    def queue_depth(self) -> int:
+        """Return the number of jobs waiting to start."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def running_count(self) -> int:
+        """Return the number of jobs currently being transcribed."""
+        return sum(1 for job in self._active.values() if job.status == RUNNING)
+
+    async def _worker(self) -> None:
+        """Process queued jobs until cancelled."""
+        while True:
+            job = await self._queue.get()
+            try:
+                await asyncio.create_task(self._run(job), context=job.context)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: TranscriptionJob) -> None:
+        """Run one job in its submitter's context and record its outcome."""
+        job.mark_running()
+        try:
+            with span('TranscriptionJobQueue.job', {'transcription.job_id': job.job_id}):
+                result = await asyncio.to_thread(
+                    self.fetcher.fetch_transcript,
+                    job.video_input,
+                    use_cache=job.use_cache,
+                    progress=job.update_progress
+                )
+            job.mark_completed(result)
+        except SearchException as e:
+            job.mark_failed(str(e))
+        except Exception as e:
+            logger.exception(f"Transcription job {job.job_id} failed")
+            job.mark_failed(f"Unexpected error: {str(e)}")
+        finally:
+            self._active.pop(job.key, None)
+
+    async def aclose(self) -> None:
+        """Stop the workers; running transcriptions finish in their threads."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
@@ -2,19 +2,127 @@
 Web content fetching functionality
 """
 
-import re
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, List, Optional, Union
+from urllib.parse import urlparse
 import httpx
-from bs4 import BeautifulSoup
+from .cache import TTLCache
 from .config import SearchConfig, SearchException
+from .content_store import ContentStore
+from .html_extractor import extract_text
+from .metrics import BYTES_DOWNLOADED, track_upstream
+from .models import FetchedDocument, PdfDocument, StoredDocument
+from .pdf_extractor import PdfNotLoaded, count_pages, extract_pages, pdf_available
+from .singleflight import SingleFlight
+from .tracing import current_span, http_trace, span, traced
+
+
+logger = logging.getLogger(__name__)
+
+# Routes chosen from the response headers and first bytes
+ROUTE_HTML = 'html'
+ROUTE_PDF = 'pdf'
+ROUTE_UNSUPPORTED = 'unsupported'
+
+# Number of leading body bytes inspected before choosing a route
+SNIFF_BYTES = 512
+
+# Offsets reserved for each PDF page: a PDF offset is the page index times
+# this plus a character position within the page
+PDF_OFFSETS_PER_PAGE = 1_000_000
+
+# Magic numbers of common binary formats that cannot be parsed as text
+BINARY_SIGNATURES = (
+    b'\x89PNG', b'\xff\xd8\xff', b'GIF87a', b'GIF89a', b'RIFF', b'PK\x03\x04',
+    b'\x1f\x8b', b'7z\xbc\xaf', b'Rar!', b'OggS', b'fLaC', b'ID3', b'\x1a\x45\xdf\xa3',
+)
         
 
 class WebContentFetcher:
     """Handles fetching and parsing web content."""
     
-    def __init__(self):
+    def __init__(self, document_cache: TTLCache = None, content_store: ContentStore = None):
+        """
+        Initialize the fetcher.
+        
+        Args:
+            document_cache: Optional cache of (text, is_truncated) pairs keyed
+                by URL (built from config if not provided)
+            content_store: Optional persistent document store
+                (opened from CONTENT_STORE_DIR if not provided)
+        """
         self.headers = {
             "User-Agent": SearchConfig.USER_AGENT
         }
+        if document_cache is None and SearchConfig.DOCUMENT_CACHE_TTL > 0:
+            document_cache = TTLCache(
+                max_entries=SearchConfig.DOCUMENT_CACHE_MAX_ENTRIES,
+                ttl=SearchConfig.DOCUMENT_CACHE_TTL,
+                max_bytes=SearchConfig.DOCUMENT_CACHE_MAX_BYTES,
+                sizeof=lambda entry: sys.getsizeof(entry[0]),
+            )
+        self.document_cache = document_cache
+        
+        self.local_pdf = SearchConfig.PDF_LOCAL_EXTRACTION and pdf_available()
+        self.pdf_cache: Optional[TTLCache] = None
+        self.pdf_page_cache: Optional[TTLCache] = None
+        if self.local_pdf and SearchConfig.DOCUMENT_CACHE_TTL > 0:
+            self.pdf_cache = TTLCache(
+                max_entries=SearchConfig.DOCUMENT_CACHE_MAX_ENTRIES,
+                ttl=SearchConfig.DOCUMENT_CACHE_TTL,
+                max_bytes=SearchConfig.PDF_CACHE_MAX_BYTES,
+                sizeof=lambda pdf: len(pdf.data),
+            )
+            self.pdf_page_cache = TTLCache(
+                max_entries=SearchConfig.PDF_PAGE_CACHE_MAX_ENTRIES,
+                ttl=SearchConfig.DOCUMENT_CACHE_TTL,
+                max_bytes=SearchConfig.DOCUMENT_CACHE_MAX_BYTES,
+                sizeof=sys.getsizeof,
+            )
+        
+        if content_store is None and SearchConfig.CONTENT_STORE_DIR:
+            try:
+                content_store = ContentStore(
+                    SearchConfig.CONTENT_STORE_DIR,
+                    max_bytes=SearchConfig.CONTENT_STORE_MAX_BYTES,
+                )
+            except Exception as e:
+                logger.warning(f"Content store disabled, failed to open {SearchConfig.CONTENT_STORE_DIR}: {e}")
+        self.content_store = content_store
+        self._inflight = SingleFlight()
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._batch_semaphore = asyncio.Semaphore(SearchConfig.FETCH_MANY_CONCURRENCY)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_users: Dict[str, int] = {}
+    
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Return the parsing process pool, creating it on first use."""
+        if SearchConfig.PARSE_PROCESS_WORKERS <= 0:
+            return None
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=SearchConfig.PARSE_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._process_pool
+    
+    def close(self) -> None:
+        """Shut down the parsing process pool."""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Return document cache hit/miss counters (empty if caching is disabled)."""
+        return self.document_cache.stats() if self.document_cache is not None else {}
     
     def _is_pdf_url(self, url: str) -> bool:
         """Check if URL points to a PDF file based on URL patterns."""
@@ -38,36 +146,177 @@ class WebContentFetcher:
 
         return False
 
+    def _is_text_content(self, content_type: str) -> bool:
+        """Check if a Content-Type can be parsed as HTML or text."""
+        if not content_type:
+            # Unknown type, let the parser decide
+            return True
+
+        media_type = content_type.split(';', 1)[0].strip().lower()
+        return (
+            media_type.startswith('text/') or
+            media_type in ('application/xhtml+xml', 'application/xml', 'application/json') or
+            media_type.endswith('+xml') or
+            media_type.endswith('+json')
+        )
+
+    def _sniff_route(self, content_type: str, content_start: bytes) -> str:
+        """
+        Decide how to handle a response from its Content-Type and first bytes.
+        
+        Returns:
+            ROUTE_PDF, ROUTE_HTML or ROUTE_UNSUPPORTED
+        """
+        if self._is_pdf_content(content_type, content_start):
+            return ROUTE_PDF
+
+        # Binary payloads are rejected even when mislabelled as text
+        if content_start.startswith(BINARY_SIGNATURES) or content_start[4:8] == b'ftyp':
+            return ROUTE_UNSUPPORTED
+
+        if self._is_text_content(content_type):
+            return ROUTE_HTML
+
+        return ROUTE_UNSUPPORTED
+
+    async def _read_prefix(self, stream: AsyncIterator[bytes]) -> bytes:
+        """Read at least SNIFF_BYTES from a body stream (fewer if it ends first)."""
+        prefix = b''
+        async for chunk in stream:
+            prefix += chunk
+            if len(prefix) >= SNIFF_BYTES:
+                break
+        return prefix
+
+    async def _read_capped_body(
+        self,
+        response: httpx.Response,
+        stream: AsyncIterator[bytes],
+        prefix: bytes = b'',
+        max_bytes: Optional[int] = None
+    ) -> tuple[bytes, bool]:
+        """
+        Read the rest of a streamed response body up to a byte cap.
+        
+        Responses that declare a larger Content-Length are rejected before
+        the body is downloaded. Streams without a declared length are cut off
+        at the cap and the part read so far is returned.
+        
+        Args:
+            response: The streamed response
+            stream: Body iterator, possibly partially consumed
+            prefix: Bytes already read from the stream
+            max_bytes: Byte cap (default: MAX_FETCH_BYTES)
+        
+        Returns:
+            Tuple of (body, cut_off) where cut_off means the stream went on
+            past the cap
+        
+        Raises:
+            SearchException: If the declared body size exceeds the cap
+        """
+        max_bytes = max_bytes or SearchConfig.MAX_FETCH_BYTES
+        declared = response.headers.get('content-length', '')
+        if declared.isdigit() and int(declared) > max_bytes:
+            raise SearchException(f"Content too large: {declared} bytes exceeds the {max_bytes} byte limit")
+
+        chunks = [prefix]
+        received = len(prefix)
+        async for chunk in stream:
+            chunks.append(chunk)
+            received += len(chunk)
+            if received > max_bytes:
+                logger.info(f"Stopped reading {response.url} at the {max_bytes} byte limit")
+                break
+
+        return b''.join(chunks)[:max_bytes], received > max_bytes
+
+    async def _read_pdf_body(
+        self,
+        response: httpx.Response,
+        stream: AsyncIterator[bytes],
+        prefix: bytes = b''
+    ) -> Optional[bytes]:
+        """
+        Download a PDF body up to PDF_MAX_BYTES.
+        
+        Returns:
+            The complete body, or None if it exceeds the cap (a cut-off PDF
+            cannot be parsed)
+        """
+        max_bytes = SearchConfig.PDF_MAX_BYTES
+        try:
+            body, cut_off = await self._read_capped_body(response, stream, prefix, max_bytes)
+        except SearchException:
+            return None
+        return None if cut_off else body
+
     async def _fetch_via_jina(self, url: str) -> tuple[str, bool]:
-        """Fetch content using Jina Reader API."""
+        """
+        Fetch content using Jina Reader API.
+        
+        The full reader output (up to MAX_FETCH_BYTES) is returned; it is
+        cached with other documents, so pagination through a long document
+        costs one reader call. Concurrent requests for the same URL share
+        that call.
+        
+        Returns:
+            Tuple of (text, is_truncated) where is_truncated means the output
+            was cut off at the byte cap
+        """
+        return await self._inflight.do(('jina', url), lambda: self._read_via_jina(url))
+    
+    async def _read_via_jina(self, url: str) -> tuple[str, bool]:
+        """Download the reader output for a URL, stopping at MAX_FETCH_BYTES."""
         fallback_url = f"https://r.jina.ai/{url}"
+        max_bytes = SearchConfig.MAX_FETCH_BYTES
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
+            with span('fetch.reader', {'url.full': url}) as current, track_upstream('jina'):
+                async with httpx.AsyncClient() as client:
+                    async with client.stream(
+                        "GET",
                         fallback_url,
                         timeout=SearchConfig.FETCH_TIMEOUT,
-                    )
-                response.raise_for_status()
-
-                # Truncate if too long 
-                is_truncated = False
-                text = response.text
-                if len(text) > SearchConfig.MAX_CONTENT_LENGTH:
-                    text = text[:SearchConfig.MAX_CONTENT_LENGTH] + "... [content truncated]"
-                    is_truncated = True
-                
-                return text, is_truncated
+                        extensions={'trace': http_trace(current)},
+                    ) as response:
+                        response.raise_for_status()
+                        
+                        chunks = []
+                        received = 0
+                        is_truncated = False
+                        async for chunk in response.aiter_bytes():
+                            chunks.append(chunk)
+                            received += len(chunk)
+                            if received >= max_bytes:
+                                logger.info(f"Stopped reading reader output for {url} at the {max_bytes} byte limit")
+                                is_truncated = True
+                                break
+                        encoding = response.encoding or 'utf-8'
+                current.set_attributes({'http.response.body.size': received, 'fetch.truncated': is_truncated})
+            BYTES_DOWNLOADED.inc(received, upstream='jina')
+            
+            text = b''.join(chunks)[:max_bytes].decode(encoding, errors='replace')
+            return text, is_truncated
             
         except Exception as e:
             raise SearchException(f"Failed to fetch via Jina Reader: {e}")
 
-    def _apply_offset_and_chunk(self, content: str, offset: int) -> tuple[str, bool, int, int]:
+    def _apply_offset_and_chunk(
+        self,
+        content: str,
+        offset: int,
+        max_chars: Optional[int] = None,
+        cut_off: bool = False
+    ) -> tuple[str, bool, int, int]:
         """
         Apply offset and chunk the content.
         
         Args:
             content: Full content text
             offset: Starting position
+            max_chars: Chunk size (default: MAX_CONTENT_LENGTH)
+            cut_off: Whether the text itself was cut off at the download byte
+                cap, in which case its last chunk is reported as truncated
             
         Returns:
             Tuple of (content_chunk, is_truncated, next_offset, total_length)
@@ -78,57 +327,511 @@ class WebContentFetcher:
         if offset >= total_length:
             return "", False, total_length, total_length
         
-        # Calculate end position
-        end_pos = min(offset + SearchConfig.MAX_CONTENT_LENGTH, total_length)
+        end_pos, is_truncated, next_offset = self._chunk_bounds(offset, total_length, max_chars)
         
         # Extract chunk
         content_chunk = content[offset:end_pos]
         
+        return content_chunk, is_truncated or cut_off, next_offset, total_length
+    
+    def _chunk_bounds(self, offset: int, total_length: int, max_chars: Optional[int] = None) -> tuple[int, bool, int]:
+        """
+        Calculate where the chunk starting at offset ends.
+        
+        Returns:
+            Tuple of (end_pos, is_truncated, next_offset)
+        """
+        # Calculate end position
+        end_pos = min(offset + (max_chars or SearchConfig.MAX_CONTENT_LENGTH), total_length)
+        
         # Determine if truncated
         is_truncated = end_pos < total_length
         
         # Calculate next offset
         next_offset = end_pos if is_truncated else total_length
         
+        return end_pos, is_truncated, next_offset
+    
+    async def _chunk_stored_document(
+        self,
+        stored: StoredDocument,
+        offset: int,
+        max_chars: Optional[int] = None
+    ) -> tuple[str, bool, int, int]:
+        """Apply offset and chunking to a document held in the content store."""
+        total_length = stored.text_length
+        if offset >= total_length:
+            return "", False, total_length, total_length
+        
+        end_pos, is_truncated, next_offset = self._chunk_bounds(offset, total_length, max_chars)
+        content_chunk = await asyncio.to_thread(self.content_store.read_slice, stored, offset, end_pos)
+        
         return content_chunk, is_truncated, next_offset, total_length
     
+    async def _run_in_process_pool(self, func, *args):
+        """Run CPU-bound work in the process pool, or in a thread if the pool is disabled."""
+        pool = self._get_process_pool()
+        if pool is not None:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+            except BrokenProcessPool:
+                logger.warning("Parsing process pool broke, recreating it")
+                self._process_pool = None
+        return await asyncio.to_thread(func, *args)
+    
+    @traced('WebContentFetcher._parse_html_content')
     async def _parse_html_content(self, html_content: str) -> str:
-        """Parse HTML content and extract text."""
+        """
+        Parse HTML content and extract text off the event loop.
+        
+        Documents below PARSE_PROCESS_THRESHOLD characters are parsed in a
+        worker thread; larger ones go to the process pool so extraction of
+        big pages runs on other cores instead of holding the GIL.
+        """
+        in_process_pool = len(html_content) >= SearchConfig.PARSE_PROCESS_THRESHOLD
+        current_span().set_attributes({
+            'html.length': len(html_content),
+            'parse.executor': 'process' if in_process_pool else 'thread',
+        })
+        if in_process_pool:
+            text = await self._run_in_process_pool(extract_text, html_content)
+        else:
+            text = await asyncio.to_thread(extract_text, html_content)
+        current_span().set_attribute('text.length', len(text))
+        return text
+    
+    async def _open_pdf(self, url: str, data: bytes) -> Optional[PdfDocument]:
+        """
+        Parse a downloaded PDF and read its page count.
+        
+        The document is keyed by the SHA-256 of its contents. The worker that
+        parses it keeps the parsed document under that key, so later page
+        ranges usually need neither the file nor a new parse, and extracted
+        pages are cached per key, so pages of a changed file are never mixed
+        with those of the copy downloaded before.
+        
+        Returns:
+            The document, or None if it cannot be parsed locally
+        """
+        key = await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
         try:
-            soup = BeautifulSoup(html_content, "lxml")
+            page_count = await self._run_in_process_pool(count_pages, key, data)
         except Exception as e:
-            soup = BeautifulSoup(html_content, "html.parser")
+            logger.info(f"Local PDF extraction failed for {url}, using the reader: {e}")
+            return None
+        if page_count == 0:
+            return None
+        return PdfDocument(key=key, data=data, page_count=page_count)
+    
+    async def _extract_pdf_pages(self, pdf: PdfDocument, start: int, end: int) -> List[str]:
+        """
+        Extract pages [start, end) in a worker, sending the file only to a
+        worker that has not parsed it yet.
+        """
+        try:
+            return await self._run_in_process_pool(extract_pages, pdf.key, start, end)
+        except PdfNotLoaded:
+            return await self._run_in_process_pool(extract_pages, pdf.key, start, end, pdf.data)
+    
+    async def _pdf_pages(self, url: str, pdf: PdfDocument, start: int, end: int) -> List[str]:
+        """
+        Return the text of pages [start, end), extracting only uncached pages.
+        
+        Raises:
+            SearchException: If the pages cannot be extracted
+        """
+        cache = self.pdf_page_cache
+        pages = [cache.get((pdf.key, index)) if cache is not None else None for index in range(start, end)]
+        missing = [start + position for position, text in enumerate(pages) if text is None]
+        if missing:
+            first, last = missing[0], missing[-1] + 1
+            try:
+                with span('pdf.extract_pages', {'url.full': url, 'pdf.first_page': first, 'pdf.last_page': last}):
+                    extracted = await self._inflight.do(
+                        ('pdf', pdf.key, first, last),
+                        lambda: self._extract_pdf_pages(pdf, first, last)
+                    )
+            except Exception as e:
+                raise SearchException(f"Failed to extract PDF text: {e}")
+            for index, text in zip(range(first, last), extracted):
+                pages[index - start] = text
+                if cache is not None:
+                    cache.set((pdf.key, index), text)
+        return pages
+    
+    async def _chunk_pdf(
+        self,
+        url: str,
+        pdf: PdfDocument,
+        offset: int,
+        max_chars: Optional[int] = None
+    ) -> tuple[str, bool, int, int]:
+        """
+        Return the pages starting at a PDF offset that fit in one chunk.
+        
+        An offset is page * PDF_OFFSETS_PER_PAGE + position, and the total
+        length is the page count times PDF_OFFSETS_PER_PAGE, so any page can
+        be read without extracting the pages before it. Each page is headed
+        with its page number. A chunk holds whole pages, except that a page
+        longer than the chunk size is split: the chunk ends inside it and
+        next_offset points at the rest of the page.
+        
+        Returns:
+            Tuple of (content_chunk, is_truncated, next_offset, total_length)
+        """
+        limit = max_chars or SearchConfig.MAX_CONTENT_LENGTH
+        total_pages = pdf.page_count
+        total_length = total_pages * PDF_OFFSETS_PER_PAGE
+        page, position = divmod(offset, PDF_OFFSETS_PER_PAGE)
+        if page >= total_pages:
+            return "", False, total_length, total_length
+        
+        parts = []
+        length = 0
+        full = False
+        while page < total_pages and not full:
+            batch_end = min(page + max(SearchConfig.PDF_PAGES_PER_BATCH, 1), total_pages)
+            for text in await self._pdf_pages(url, pdf, page, batch_end):
+                text = text[:PDF_OFFSETS_PER_PAGE]
+                header = f"[Page {page + 1}/{total_pages}{', continued' if position else ''}]\n"
+                rest = text[position:]
+                added = len(header) + len(rest) + (2 if parts else 0)
+                if length + added <= limit:
+                    parts.append(header + rest)
+                    length += added
+                    page += 1
+                    position = 0
+                    continue
+                if not parts:
+                    # The page does not fit on its own: return its first part
+                    # and continue inside the page on the next call
+                    taken = max(limit - len(header), 1)
+                    parts.append(header + rest[:taken])
+                    position += taken
+                full = True
+                break
+        
+        next_offset = page * PDF_OFFSETS_PER_PAGE + position
+        return "\n\n".join(parts), next_offset < total_length, next_offset, total_length
 
-        # Remove script and style elements
-        # TODO: evaluate more comprehensive approach
-        unwanted_tags = [
-            "script", "style", "nav", "header", "footer", "aside",
-            "advertisement", "ads", "sidebar", "menu", "widget", "banner"
-        ]
-        for element in soup(unwanted_tags):
-            element.decompose()
+    def _direct_timeout(self) -> httpx.Timeout:
+        """
+        Timeouts for a direct fetch.
+        
+        The read timeout bounds the wait for the response headers (time to
+        first byte) and for each later body chunk; the total download is
+        bounded separately by FETCH_TIMEOUT.
+        """
+        return httpx.Timeout(
+            connect=SearchConfig.FETCH_CONNECT_TIMEOUT,
+            read=SearchConfig.FETCH_TTFB_TIMEOUT,
+            write=SearchConfig.FETCH_CONNECT_TIMEOUT,
+            pool=SearchConfig.FETCH_CONNECT_TIMEOUT,
+        )
+    
+    async def _fetch_via_reader(self, url: str) -> FetchedDocument:
+        """Read a URL through the Jina reader."""
+        content, is_truncated = await self._fetch_via_jina(url)
+        return FetchedDocument(text=content, is_truncated=is_truncated)
+    
+    async def _fetch_direct(
+        self,
+        url: str,
+        stored: Optional[StoredDocument],
+        headers_received: asyncio.Event,
+        serving_pdf: Optional[asyncio.Event] = None
+    ) -> Optional[Union[FetchedDocument, PdfDocument]]:
+        """
+        Download a webpage or PDF from its origin and extract its text.
+        
+        Args:
+            url: The webpage URL to fetch content from
+            stored: Previously stored copy whose validators are sent with the request
+            headers_received: Set as soon as the origin's response headers arrive
+            serving_pdf: Set when the response is a PDF to be extracted locally
+        
+        Returns:
+            The fetched document, the downloaded PDF, or None if the origin
+            answered 304 Not Modified
+        
+        Raises:
+            httpx.HTTPError: If the request fails or times out
+            TimeoutError: If the download exceeds FETCH_TIMEOUT
+            SearchException: If the content cannot be used
+        """
+        headers = dict(self.headers)
+        if stored is not None:
+            if stored.etag:
+                headers['If-None-Match'] = stored.etag
+            if stored.last_modified:
+                headers['If-Modified-Since'] = stored.last_modified
 
-        # Get the text content
-        # TODO: evaluate Readability integration
-        text = soup.get_text()
+        # Stream the response so the headers can be checked before the body is read
+        body = pdf_body = None
+        with span('fetch.direct', {'url.full': url}) as current, track_upstream('origin'):
+            async with asyncio.timeout(SearchConfig.FETCH_TIMEOUT), httpx.AsyncClient() as client:
+                async with client.stream(
+                    "GET",
+                    url,
+                    headers=headers,
+                    follow_redirects=True,
+                    timeout=self._direct_timeout(),
+                    extensions={'trace': http_trace(current)},
+                ) as response:
+                    headers_received.set()
+                    current.add_event('response_headers')
+                    current.set_attribute('http.response.status_code', response.status_code)
+                    if response.status_code == 304 and stored is not None:
+                        return None
+                    response.raise_for_status()
+                    
+                    # Route on the headers and first bytes, then either keep
+                    # consuming the same stream or close it right away
+                    content_type = response.headers.get('content-type', '')
+                    stream = response.aiter_bytes()
+                    content_start = b''
+                    if not self._is_pdf_content(content_type, b''):
+                        content_start = await self._read_prefix(stream)
+                    
+                    route = self._sniff_route(content_type, content_start)
+                    current.set_attributes({'http.response.content_type': content_type, 'fetch.content_route': route})
+                    if route == ROUTE_UNSUPPORTED:
+                        raise SearchException(f"Unsupported content type: {content_type or 'unknown'}")
+                    if route == ROUTE_PDF and self.local_pdf:
+                        if serving_pdf is not None:
+                            serving_pdf.set()
+                        pdf_body = await self._read_pdf_body(response, stream, content_start)
+                    if route == ROUTE_HTML:
+                        body, cut_off = await self._read_capped_body(response, stream, content_start)
+                        encoding = response.encoding or 'utf-8'
+                        etag = response.headers.get('etag')
+                        last_modified = response.headers.get('last-modified')
+            current.set_attribute('http.response.body.size', len(body or pdf_body or content_start))
+        BYTES_DOWNLOADED.inc(len(body or pdf_body or content_start), upstream='origin')
 
-        # Clean up the text
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split(" "))
-        text = " ".join(chunk for chunk in chunks if chunk)
+        # PDFs that cannot be extracted locally are handed to the reader
+        # without downloading the rest of the body
+        if route == ROUTE_PDF:
+            if pdf_body is not None:
+                pdf = await self._open_pdf(url, pdf_body)
+                if pdf is not None:
+                    return pdf
+            return await self._fetch_via_reader(url)
 
-        # Remove extra whitespace
-        text = re.sub(r"\s+", " ", text).strip()
+        # Parse as HTML
+        text = await self._parse_html_content(body.decode(encoding, errors='replace'))
+        return FetchedDocument(
+            text=text,
+            is_truncated=cut_off,
+            body=body,
+            etag=etag,
+            last_modified=last_modified,
+        )
 
-        return text
+    async def _headers_within_hedge_delay(self, direct: asyncio.Task, headers_received: asyncio.Event) -> bool:
+        """Wait up to FETCH_HEDGE_DELAY for the origin to answer; True if it did (or hedging is off)."""
+        if SearchConfig.FETCH_HEDGE_DELAY <= 0:
+            return True
+        waiter = asyncio.ensure_future(headers_received.wait())
+        try:
+            await asyncio.wait(
+                {direct, waiter},
+                timeout=SearchConfig.FETCH_HEDGE_DELAY,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            waiter.cancel()
+        return headers_received.is_set() or direct.done()
+
+    async def _race(self, direct: asyncio.Task, reader: asyncio.Task, serving_pdf: asyncio.Event):
+        """
+        Return the first successful result of a direct fetch and a reader fetch.
+        
+        A direct fetch that fails to connect or times out leaves the reader
+        to answer; any other direct outcome is final. A failed reader leaves
+        the direct fetch to answer, and its error is raised if both fail.
+        Once the origin answers with a PDF for local extraction, the reader
+        is cancelled and only the direct result is used, so the URL keeps
+        page offsets.
+        
+        Raises:
+            SearchException: If the reader fails, or the origin's PDF cannot
+                be downloaded
+        """
+        reader_error = None
+        pending = {direct, reader}
+        pdf_waiter = asyncio.ensure_future(serving_pdf.wait())
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending | {pdf_waiter}, return_when=asyncio.FIRST_COMPLETED)
+                pending.discard(pdf_waiter)
+                if serving_pdf.is_set():
+                    reader.cancel()
+                    try:
+                        return await direct
+                    except (httpx.HTTPError, TimeoutError) as e:
+                        raise SearchException(f"Failed to download PDF: {e}")
+                if direct in done:
+                    try:
+                        return direct.result()
+                    except (httpx.HTTPError, TimeoutError):
+                        if reader_error is not None:
+                            raise reader_error
+                if reader in done:
+                    try:
+                        return reader.result()
+                    except SearchException as e:
+                        if direct.done():
+                            raise
+                        reader_error = e
+        finally:
+            pdf_waiter.cancel()
 
-    async def fetch_and_parse(self, url: str, offset: int = 0) -> tuple[str, bool, int, int]:
+    @traced('WebContentFetcher._fetch_document')
+    async def _fetch_document(
+        self,
+        url: str,
+        stored: Optional[StoredDocument] = None
+    ) -> Optional[Union[FetchedDocument, PdfDocument]]:
+        """
+        Download a webpage or PDF and extract its full text.
+        
+        PDFs are downloaded and returned unparsed for page-wise extraction
+        when local extraction is available, and otherwise read through the
+        Jina reader.
+        
+        The origin is fetched first. If it fails, or has not sent its
+        response headers within FETCH_HEDGE_DELAY, the Jina reader is started
+        as well and whichever of the two succeeds first is used; the other
+        request is cancelled. PDFs extracted locally are not answered by the
+        reader, since its text is paginated by character rather than by page
+        and the offsets for the URL would depend on which request won: PDF
+        URLs are not hedged, and a hedge is dropped once the origin's
+        response turns out to be a PDF.
+        
+        Args:
+            url: The webpage URL to fetch content from
+            stored: Previously stored copy whose validators are sent with the request
+            
+        Returns:
+            The fetched document, the downloaded PDF, or None if the origin
+            answered 304 Not Modified
+            
+        Raises:
+            SearchException: If fetching or parsing fails
+        """
+        try:
+            # Check if url is a PDF
+            if self._is_pdf_url(url) and not self.local_pdf:
+                current_span().set_attribute('fetch.route', 'reader')
+                return await self._fetch_via_reader(url)
+
+            hedge = not (self.local_pdf and self._is_pdf_url(url))
+            headers_received = asyncio.Event()
+            serving_pdf = asyncio.Event()
+            direct = asyncio.create_task(self._fetch_direct(url, stored, headers_received, serving_pdf))
+            reader = None
+            try:
+                if hedge and not await self._headers_within_hedge_delay(direct, headers_received):
+                    logger.debug(f"No response from {url} within {SearchConfig.FETCH_HEDGE_DELAY}s, hedging with the reader")
+                    current_span().set_attribute('fetch.route', 'hedged')
+                    reader = asyncio.create_task(self._fetch_via_reader(url))
+                    return await self._race(direct, reader, serving_pdf)
+                try:
+                    current_span().set_attribute('fetch.route', 'direct')
+                    return await direct
+                except (httpx.HTTPError, TimeoutError):
+                    # Fallback to Jina Reader API for timeouts and HTTP errors
+                    current_span().set_attribute('fetch.route', 'reader_fallback')
+                    return await self._fetch_via_reader(url)
+            finally:
+                for task in (direct, reader):
+                    if task is not None and not task.done():
+                        task.cancel()
+                
+        except SearchException:
+            raise
+        except Exception as e:
+            raise SearchException(f"Unexpected error while fetching content: {str(e)}")
+
+    async def _store_document(self, url: str, document: FetchedDocument) -> None:
+        """Persist a fetched document, logging rather than failing on store errors."""
+        try:
+            await asyncio.to_thread(
+                self.content_store.put,
+                url,
+                document.text,
+                document.body,
+                document.etag,
+                document.last_modified,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to persist {url} to content store: {e}")
+
+    async def _load_document(self, url: str) -> Union[FetchedDocument, StoredDocument, PdfDocument]:
+        """
+        Obtain the full text of a document from the store or the network.
+        
+        Returns:
+            The fetched document, the stored document to slice from disk, or
+            the downloaded PDF to extract pages from
+        """
+        stored = None
+        if self.content_store is not None:
+            stored = await asyncio.to_thread(self.content_store.get, url)
+            if stored is not None and time.time() - stored.stored_at < SearchConfig.CONTENT_STORE_FRESH_TTL:
+                current_span().set_attribute('fetch.source', 'content_store')
+                await asyncio.to_thread(self.content_store.touch, url)
+                return stored
+        
+        document = await self._fetch_document(url, stored)
+        if document is None:
+            # Origin confirmed the stored copy is still current
+            current_span().set_attribute('fetch.source', 'revalidated')
+            await asyncio.to_thread(self.content_store.touch, url, True)
+            return stored
+        
+        if isinstance(document, PdfDocument):
+            if self.pdf_cache is not None:
+                self.pdf_cache.set(url, document)
+            return document
+        
+        if self.document_cache is not None:
+            self.document_cache.set(url, (document.text, document.is_truncated))
+        # The store cannot record that a text was cut off, so such texts are only cached
+        if self.content_store is not None and not document.is_truncated:
+            await self._store_document(url, document)
+        
+        return document
+
+    @traced('WebContentFetcher.fetch_and_parse')
+    async def fetch_and_parse(
+        self,
+        url: str,
+        offset: int = 0,
+        max_chars: Optional[int] = None
+    ) -> tuple[str, bool, int, int]:
         """
         Fetch and parse content from a webpage or PDF.
+        
+        The extracted text is cached per URL, so requests for later offsets
+        slice the cached document instead of downloading and parsing it again.
+        When a content store is configured, stored documents are served from
+        disk while fresh and revalidated with ETag/Last-Modified afterwards.
+        Concurrent requests for the same URL share one download.
+        
+        PDFs extracted locally are paginated by page: offset is the page
+        index times PDF_OFFSETS_PER_PAGE (plus a position within the page
+        when a long page spans chunks), total_length is the page count times
+        PDF_OFFSETS_PER_PAGE, and only the requested pages are extracted.
+        
+        Text cut off at the download byte cap reports is_truncated on its
+        last chunk as well, with next_offset equal to total_length.
 
         Args:
             url: The webpage URL to fetch content from
             offset: Starting position for content retrieval (default: 0)
+            max_chars: Chunk size (default: MAX_CONTENT_LENGTH)
             
         Returns:
             Tuple of (parsed_text, is_truncated, next_offset, total_length)
@@ -136,48 +839,98 @@ class WebContentFetcher:
         Raises:
             SearchException: If fetching or parsing fails
         """
+        # Validate offset
+        if offset < 0:
+            offset = 0
+        current_span().set_attributes({'url.full': url, 'fetch.offset': offset})
+        
+        if self.document_cache is not None:
+            cached = self.document_cache.get(url)
+            if cached is not None:
+                current_span().set_attribute('fetch.source', 'document_cache')
+                content, cut_off = cached
+                return self._apply_offset_and_chunk(content, offset, max_chars, cut_off)
+        
+        if self.pdf_cache is not None:
+            pdf = self.pdf_cache.get(url)
+            if pdf is not None:
+                current_span().set_attribute('fetch.source', 'pdf_cache')
+                return await self._chunk_pdf(url, pdf, offset, max_chars)
+        
+        current_span().set_attribute('fetch.source', 'network')
+        document = await self._inflight.do(url, lambda: self._load_document(url))
+        if isinstance(document, StoredDocument):
+            return await self._chunk_stored_document(document, offset, max_chars)
+        if isinstance(document, PdfDocument):
+            return await self._chunk_pdf(url, document, offset, max_chars)
+        
+        # Apply offset and chunking
+        return self._apply_offset_and_chunk(document.text, offset, max_chars, document.is_truncated)
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str):
+        """
+        Hold one of the URL host's FETCH_MANY_PER_HOST fetch slots.
+        
+        A host's limiter is dropped once no fetch holds or waits for it, so
+        the table only holds hosts with fetches in progress.
+        """
+        host = (urlparse(url).hostname or '').lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(SearchConfig.FETCH_MANY_PER_HOST)
+            self._host_semaphores[host] = semaphore
+        self._host_users[host] = self._host_users.get(host, 0) + 1
         try:
-            # Validate offset
-            if offset < 0:
-                offset = 0
-            
-            # Check if url is a PDF
-            if self._is_pdf_url(url):
-                content, was_truncated = await self._fetch_via_jina(url)
-                return self._apply_offset_and_chunk(content, offset)
+            async with semaphore:
+                yield
+        finally:
+            self._host_users[host] -= 1
+            if self._host_users[host] == 0:
+                del self._host_users[host]
+                del self._host_semaphores[host]
 
-            # request
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers=self.headers,
-                    follow_redirects=True,
-                    timeout=SearchConfig.FETCH_TIMEOUT,
-                )
-                response.raise_for_status()
-                
-                # Check if the response is a PDF
-                content_type = response.headers.get('content-type', '')
-                content_start = response.content[:8] if response.content else b''
+    async def fetch_with_limits(
+        self,
+        url: str,
+        offset: int = 0,
+        max_chars: Optional[int] = None
+    ) -> Union[tuple[str, bool, int, int], SearchException]:
+        """
+        Fetch and parse one URL under the shared batch concurrency limits.
+        
+        At most FETCH_MANY_CONCURRENCY such fetches run at once overall and
+        at most FETCH_MANY_PER_HOST against any single host.
 
-                if self._is_pdf_content(content_type, content_start):
-                    content, was_truncated = await self._fetch_via_jina(url)
-                    return self._apply_offset_and_chunk(content, offset)
+        Returns:
+            The fetch_and_parse tuple on success, or the SearchException
+            describing the failure
+        """
+        try:
+            # Wait for a host slot before taking a global one so a busy host
+            # does not hold global slots other hosts could use
+            async with self._host_slot(url):
+                async with self._batch_semaphore:
+                    return await self.fetch_and_parse(url, offset, max_chars)
+        except SearchException as e:
+            return e
+        except Exception as e:
+            return SearchException(f"Unexpected error while fetching content: {str(e)}")
 
-                # Parse as HTML
-                text = await self._parse_html_content(response.text)
+    async def fetch_many(
+        self,
+        urls: List[str],
+        offset: int = 0
+    ) -> List[Union[tuple[str, bool, int, int], SearchException]]:
+        """
+        Fetch and parse several URLs concurrently under the batch limits.
 
-                # Apply offset and chunking
-                return self._apply_offset_and_chunk(text, offset)
-                
-        except httpx.TimeoutException:
-            # Fallback to Jina Reader API for any timeout
-            content, was_truncated = await self._fetch_via_jina(url)
-            return self._apply_offset_and_chunk(content, offset)
-
-        except httpx.HTTPError as e:
-            # Fallback to Jina Reader API for HTTP errors
-            content, was_truncated = await self._fetch_via_jina(url)
-            return self._apply_offset_and_chunk(content, offset)
-        except Exception as e:
-            raise SearchException(f"Unexpected error while fetching content: {str(e)}")
+        Args:
+            urls: The webpage URLs to fetch
+            offset: Starting position applied to every document (default: 0)
+            
+        Returns:
+            One entry per URL, in order: the fetch_and_parse tuple on success
+            or the SearchException describing the failure
+        """
+        return await asyncio.gather(*(self.fetch_with_limits(url, offset) for url in urls))
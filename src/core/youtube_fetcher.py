@@ -2,25 +2,174 @@
 YouTube content fetching functionality using yt-dlp and STT
 """
 
+import contextvars
 import logging
+import re
+import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
 import uuid
+import httpx
 import yt_dlp
-from openai import OpenAI
+from openai import APIStatusError, OpenAI
 
+from .audio_segments import (
+    MIN_TAIL_FRACTION,
+    build_preprocess_filter,
+    detect_silences,
+    extract_segment,
+    ffmpeg_available,
+    plan_segments,
+    preprocess_audio,
+    probe_duration,
+    stitch_transcripts,
+)
+from .captions import parse_captions, select_caption_track
 from .config import SearchConfig, SearchException
+from .metrics import BYTES_DOWNLOADED, track_upstream
+from .models import AudioTranscript, YouTubeTranscript
+from .tracing import current_span, span, traced
+from .transcript_cache import TranscriptCache
+
+
+# Transcript sources reported to callers
+SOURCE_CAPTIONS = 'captions'
+SOURCE_STT = 'stt'
+
+# Progress stages reported while a transcript is produced
+STAGE_RESOLVING = 'resolving'
+STAGE_CAPTIONS = 'captions'
+STAGE_DOWNLOADING = 'downloading'
+STAGE_PREPROCESSING = 'preprocessing'
+STAGE_TRANSCRIBING = 'transcribing'
+
+# Called as progress(stage, segments_done, segments_total, partial_transcript)
+ProgressCallback = Callable[[str, int, int, Optional[str]], None]
+
+
+def _no_progress(stage: str, segments_done: int = 0, segments_total: int = 0,
+                 partial_transcript: Optional[str] = None) -> None:
+    """Default progress callback that discards updates."""
+
+
+# Byte range requested per chunk when downloading a native audio stream;
+# YouTube throttles unranged downloads of DASH formats
+NATIVE_CHUNK_BYTES = 10 * 1024 * 1024
+
+# STT response codes meaning the server rejected the audio format
+_UNSUPPORTED_AUDIO_STATUS = (400, 415, 422)
+
+_YDL_HTTP_OPTIONS = {
+    'http_headers': {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-us,en;q=0.5',
+        'Sec-Fetch-Mode': 'navigate',
+    },
+    'nocheckcertificate': True,
+}
+
+
+_VIDEO_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+# Hosts serving YouTube video pages (after stripping a leading "www.")
+_YOUTUBE_HOSTS = frozenset([
+    'youtube.com', 'm.youtube.com', 'music.youtube.com', 'gaming.youtube.com',
+    'youtube-nocookie.com',
+])
+
+# Path prefixes followed directly by the video ID, e.g. /shorts/<id>
+_ID_PATH_PREFIXES = frozenset(['embed', 'shorts', 'live', 'v', 'e', 'watch'])
+
+
+def parse_video_id(video_input: str) -> Optional[str]:
+    """
+    Extract a video ID from a YouTube URL or bare ID without network access.
+    
+    Recognizes bare IDs, watch URLs (any query parameter order),
+    youtu.be short links, shorts, embed, live, music, mobile and
+    youtube-nocookie URLs, with or without a scheme.
+    
+    Args:
+        video_input: YouTube URL or video ID
+        
+    Returns:
+        The 11-character video ID, or None if the input is not recognized
+    """
+    value = video_input.strip()
+    if _VIDEO_ID.match(value):
+        return value
+    
+    if '://' not in value:
+        value = f"https://{value}"
+    try:
+        parts = urlsplit(value)
+        host = (parts.hostname or '').lower()
+    except ValueError:
+        return None
+    if host.startswith('www.'):
+        host = host[4:]
+    
+    segments = [segment for segment in parts.path.split('/') if segment]
+    query = parse_qs(parts.query)
+    candidate = None
+    
+    if host == 'youtu.be':
+        candidate = segments[0] if segments else None
+    elif host in _YOUTUBE_HOSTS:
+        if segments == ['watch']:
+            candidate = query.get('v', [None])[0]
+        elif len(segments) >= 2 and segments[0] in _ID_PATH_PREFIXES:
+            candidate = segments[1]
+        elif segments == ['attribution_link'] and 'u' in query:
+            # /attribution_link?u=/watch%3Fv%3D<id>
+            return parse_video_id(f"https://youtube.com{query['u'][0]}")
+    
+    if candidate and _VIDEO_ID.match(candidate):
+        return candidate
+    return None
+
+
+class _NativeAudioUnavailable(Exception):
+    """The native audio fast path cannot be used; transcode instead."""
 
 
 class YouTubeContentFetcher:
     """Handles fetching and transcribing YouTube video content."""
     
-    def __init__(self):
+    def __init__(self, transcript_cache: Optional[TranscriptCache] = None):
+        """
+        Initialize the fetcher.
+        
+        Args:
+            transcript_cache: Optional transcript cache (opened from
+                TRANSCRIPT_CACHE_DIR if not provided and caching is enabled)
+        """
         self.stt_endpoint = SearchConfig.STT_ENDPOINT
         self.stt_model = SearchConfig.STT_MODEL
         self.stt_api_key = SearchConfig.STT_API_KEY
+        self.native_audio = SearchConfig.STT_NATIVE_AUDIO
+        self.native_formats = [ext.strip() for ext in SearchConfig.STT_NATIVE_FORMATS.split(',') if ext.strip()]
+        self.captions = SearchConfig.YOUTUBE_CAPTIONS_ENABLED
+        self.caption_languages = [
+            lang.strip() for lang in SearchConfig.YOUTUBE_CAPTION_LANGUAGES.split(',') if lang.strip()
+        ]
+        self.automatic_captions = SearchConfig.YOUTUBE_AUTOMATIC_CAPTIONS
         self.logger = logging.getLogger(__name__)
+        
+        if transcript_cache is None and SearchConfig.TRANSCRIPT_CACHE_ENABLED:
+            try:
+                transcript_cache = TranscriptCache(
+                    SearchConfig.TRANSCRIPT_CACHE_DIR,
+                    max_bytes=SearchConfig.TRANSCRIPT_CACHE_MAX_BYTES,
+                    max_age=SearchConfig.TRANSCRIPT_CACHE_MAX_AGE,
+                )
+            except Exception as e:
+                self.logger.warning(f"Transcript cache disabled, failed to open {SearchConfig.TRANSCRIPT_CACHE_DIR}: {e}")
+        self.transcript_cache = transcript_cache
     
     def _extract_video_id(self, video_input: str) -> str:
         """
@@ -35,24 +184,31 @@ class YouTubeContentFetcher:
         Raises:
             SearchException: If video ID extraction fails
         """
-        # If it looks like a video ID (11 chars, alphanumeric), return as-is
-        if len(video_input) == 11 and video_input.replace('-', '').replace('_', '').isalnum():
-            return video_input
+        # Bare IDs and known YouTube URL shapes are parsed locally
+        video_id = parse_video_id(video_input)
+        if video_id is not None:
+            return video_id
         
-        # Otherwise, extract from URL using yt-dlp
+        # Otherwise, resolve the input with yt-dlp
         try:
-            with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
+            with (
+                span('ytdlp.extract_info', {'url.full': video_input}),
+                track_upstream('ytdlp'),
+                yt_dlp.YoutubeDL({'quiet': True}) as ydl,
+            ):
                 info = ydl.extract_info(video_input, download=False)
                 return info['id']
         except Exception as e:
             raise SearchException(f"Failed to extract video ID from {video_input}: {str(e)}")
     
-    def fetch_and_transcribe(self, video_input: str) -> Tuple[str, str]:
+    def fetch_and_transcribe(self, video_input: str, use_cache: bool = True) -> Tuple[str, str]:
         """
-        Download YouTube audio and transcribe it using STT.
+        Fetch the transcript of a YouTube video.
         
         Args:
             video_input: YouTube URL or video ID
+            use_cache: Whether a cached transcript may be returned; a new
+                transcript is cached either way
             
         Returns:
             Tuple of (video_id, transcript_text)
@@ -60,9 +216,300 @@ class YouTubeContentFetcher:
         Raises:
             SearchException: If download or transcription fails
         """
+        result = self.fetch_transcript(video_input, use_cache=use_cache)
+        return result.video_id, result.transcript
+    
+    @traced('YouTubeContentFetcher.fetch_transcript')
+    def fetch_transcript(
+        self,
+        video_input: str,
+        use_cache: bool = True,
+        progress: Optional[ProgressCallback] = None
+    ) -> YouTubeTranscript:
+        """
+        Fetch the transcript of a YouTube video, from captions when possible.
+        
+        A manual or original-language automatic caption track is used when
+        the video has one; otherwise the audio is downloaded and transcribed
+        with STT. Transcripts are cached per (video_id, source), with STT
+        transcripts keyed by model, so repeat requests skip the work entirely.
+        
+        Args:
+            video_input: YouTube URL or video ID
+            use_cache: Whether a cached transcript may be returned; a new
+                transcript is cached either way
+            progress: Optional callback receiving stage changes and, for
+                segmented transcription, completed segments with the
+                transcript so far (called from worker threads)
+            
+        Returns:
+            YouTubeTranscript with the video ID, transcript and its source
+            
+        Raises:
+            SearchException: If download or transcription fails
+        """
+        progress = progress or _no_progress
+        
         # Extract video ID from input
+        progress(STAGE_RESOLVING)
         video_id = self._extract_video_id(video_input)
-
+        current_span().set_attribute('youtube.video_id', video_id)
+        
+        cache = self.transcript_cache
+        cache_keys = ([(SOURCE_CAPTIONS, SOURCE_CAPTIONS)] if self.captions else []) + [(SOURCE_STT, self.stt_model)]
+        # A forced refresh skips the lookup but still replaces the cached transcript
+        if cache is not None and use_cache:
+            try:
+                for source, cache_model in cache_keys:
+                    transcript = cache.get(video_id, cache_model)
+                    if transcript is not None:
+                        self.logger.debug(f"Transcript cache hit for {video_id} ({source})")
+                        current_span().set_attributes({'transcript.source': source, 'transcript.cached': True})
+                        return YouTubeTranscript(video_id=video_id, transcript=transcript, source=source)
+            except Exception as e:
+                self.logger.warning(f"Transcript cache lookup failed for {video_id}: {e}")
+        
+        info = self._extract_media_info(video_input) if self.captions else None
+        transcript = None
+        audio = AudioTranscript(transcript='')
+        if info is not None:
+            progress(STAGE_CAPTIONS)
+            transcript = self._fetch_captions(info)
+        if transcript is not None:
+            source, cache_model = SOURCE_CAPTIONS, SOURCE_CAPTIONS
+        else:
+            audio = self._download_and_transcribe(video_input, info, progress)
+            transcript = audio.transcript
+            source, cache_model = SOURCE_STT, self.stt_model
+        
+        current_span().set_attributes({'transcript.source': source, 'transcript.length': len(transcript)})
+        if cache is not None:
+            try:
+                cache.put(video_id, cache_model, transcript)
+            except Exception as e:
+                self.logger.warning(f"Failed to cache transcript for {video_id}: {e}")
+        
+        return YouTubeTranscript(
+            video_id=video_id,
+            transcript=transcript,
+            source=source,
+            audio_duration=audio.audio_duration,
+            processed_duration=audio.processed_duration,
+        )
+    
+    def _extract_media_info(self, video_input: str) -> Optional[dict]:
+        """
+        Fetch video metadata (caption tracks and audio formats) with one yt-dlp call.
+        
+        When the native audio path is enabled, the selected format is the
+        smallest native audio stream, falling back to any audio so the
+        call still succeeds for videos without one.
+        
+        Returns:
+            The yt-dlp info dict, or None if extraction failed
+        """
+        options = {'quiet': True, **_YDL_HTTP_OPTIONS}
+        if self.native_audio and self.native_formats:
+            native = '/'.join(f'worstaudio[ext={ext}]' for ext in self.native_formats)
+            options['format'] = f'{native}/bestaudio/best'
+        try:
+            with (
+                span('ytdlp.extract_info', {'url.full': video_input}),
+                track_upstream('ytdlp'),
+                yt_dlp.YoutubeDL(options) as ydl,
+            ):
+                return ydl.extract_info(video_input, download=False)
+        except Exception as e:
+            self.logger.info(f"Metadata extraction failed for {video_input}: {e}")
+            return None
+    
+    def _fetch_captions(self, info: dict) -> Optional[str]:
+        """
+        Download and parse the best caption track of a video.
+        
+        Returns:
+            The caption text, or None if no usable track exists or it
+            could not be fetched
+        """
+        track = select_caption_track(info, self.caption_languages, allow_automatic=self.automatic_captions)
+        if track is None:
+            return None
+        
+        lang, kind, entry = track
+        try:
+            with (
+                span('youtube.captions', {'captions.language': lang, 'captions.kind': kind}) as current,
+                track_upstream('captions'),
+                httpx.Client(
+                    headers=_YDL_HTTP_OPTIONS['http_headers'],
+                    timeout=SearchConfig.FETCH_TIMEOUT,
+                    follow_redirects=True,
+                ) as http_client,
+            ):
+                response = http_client.get(entry['url'])
+                current.set_attribute('http.response.body.size', len(response.content))
+                response.raise_for_status()
+            BYTES_DOWNLOADED.inc(len(response.content), upstream='captions')
+            text = parse_captions(response.text, entry.get('ext'))
+        except Exception as e:
+            self.logger.warning(f"Failed to fetch {kind} captions ({lang}) for {info.get('id')}: {e}")
+            return None
+        
+        if not text.strip():
+            return None
+        self.logger.debug(f"Using {kind} captions ({lang}) for {info.get('id')}")
+        return text
+    
+    def _download_and_transcribe(
+        self,
+        video_input: str,
+        info: Optional[dict] = None,
+        progress: ProgressCallback = _no_progress
+    ) -> AudioTranscript:
+        """
+        Download the audio of a video and run it through STT.
+        
+        The native audio stream is uploaded as-is when possible; the
+        re-encoding path runs only if that fails.
+        
+        Args:
+            video_input: YouTube URL or video ID
+            info: yt-dlp info dict from _extract_media_info, if already fetched
+            progress: Progress callback
+            
+        Returns:
+            AudioTranscript with the transcript and audio durations
+            
+        Raises:
+            SearchException: If download or transcription fails
+        """
+        if self.native_audio and self.native_formats:
+            if info is None:
+                info = self._extract_media_info(video_input)
+            try:
+                if info is None:
+                    raise _NativeAudioUnavailable("metadata extraction failed")
+                return self._transcribe_native_audio(info, progress)
+            except _NativeAudioUnavailable as e:
+                self.logger.info(f"Native audio unavailable for {video_input}, transcoding instead: {e}")
+        
+        return self._transcode_and_transcribe(video_input, progress)
+    
+    def _transcribe_native_audio(self, info: dict, progress: ProgressCallback = _no_progress) -> AudioTranscript:
+        """
+        Transcribe the video's own audio stream without re-encoding it.
+        
+        Short audio is downloaded into memory and uploaded straight to the
+        STT endpoint; audio that is preprocessed or long enough to be split
+        is written to a temporary file for ffmpeg.
+        
+        Args:
+            info: yt-dlp info dict with the selected audio format
+            progress: Progress callback
+            
+        Raises:
+            _NativeAudioUnavailable: If no accepted format was selected, the
+                download fails, or the STT server rejects the format
+            SearchException: If transcription fails for another reason
+        """
+        if info.get('ext') not in self.native_formats or info.get('vcodec') not in (None, 'none'):
+            raise _NativeAudioUnavailable(f"no native audio format (selected {info.get('format_id')})")
+        if not info.get('url') or info.get('protocol') not in ('http', 'https'):
+            raise _NativeAudioUnavailable(f"no direct audio stream (protocol {info.get('protocol')})")
+        
+        ext = info['ext']
+        duration = info.get('duration') or 0
+        client = OpenAI(base_url=self.stt_endpoint, api_key=self.stt_api_key)
+        
+        try:
+            progress(STAGE_DOWNLOADING)
+            long_audio = duration > SearchConfig.STT_SEGMENT_SECONDS * (1 + MIN_TAIL_FRACTION)
+            if self._preprocess_filter() or (self._segmentation_enabled() and long_audio):
+                temp_dir = Path(tempfile.mkdtemp(prefix='youtube_audio_'))
+                try:
+                    audio_path = temp_dir / f"audio_{uuid.uuid4().hex}.{ext}"
+                    with open(audio_path, 'wb') as f:
+                        self._download_native_audio(info, f)
+                    return self._transcribe_audio(client, audio_path, progress)
+                finally:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+            
+            with tempfile.SpooledTemporaryFile(max_size=SearchConfig.STT_IN_MEMORY_AUDIO_BYTES) as buffer:
+                audio_size = self._download_native_audio(info, buffer)
+                if audio_size == 0:
+                    raise _NativeAudioUnavailable("downloaded audio stream is empty")
+                buffer.seek(0)
+                progress(STAGE_TRANSCRIBING, 0, 1)
+                with span('stt.transcribe', {'stt.model': self.stt_model, 'audio.size': audio_size}), track_upstream('stt'):
+                    transcript = client.audio.transcriptions.create(
+                        model=self.stt_model,
+                        file=(f"{info.get('id', 'audio')}.{ext}", buffer),
+                        response_format="text"
+                    )
+                return AudioTranscript(transcript=transcript, audio_duration=info.get('duration'))
+        except _NativeAudioUnavailable:
+            raise
+        except httpx.HTTPError as e:
+            raise _NativeAudioUnavailable(f"audio download failed: {e}")
+        except APIStatusError as e:
+            if e.status_code in _UNSUPPORTED_AUDIO_STATUS:
+                raise _NativeAudioUnavailable(f"STT rejected {ext} audio: {e}")
+            raise SearchException(f"Failed to fetch/transcribe YouTube content: {str(e)}")
+        except Exception as e:
+            raise SearchException(f"Failed to fetch/transcribe YouTube content: {str(e)}")
+    
+    def _download_native_audio(self, info: dict, destination) -> int:
+        """
+        Stream the selected audio format into a file object in ranged chunks.
+        
+        Returns:
+            Number of bytes written
+        """
+        written = 0
+        with (
+            span('youtube.audio_download', {'audio.format': info.get('ext')}) as current,
+            track_upstream('ytdlp'),
+            httpx.Client(
+                headers=info.get('http_headers') or _YDL_HTTP_OPTIONS['http_headers'],
+                timeout=SearchConfig.FETCH_TIMEOUT,
+                follow_redirects=True,
+            ) as http_client,
+        ):
+            while True:
+                range_header = {'Range': f'bytes={written}-{written + NATIVE_CHUNK_BYTES - 1}'}
+                with http_client.stream('GET', info['url'], headers=range_header) as response:
+                    # A range starting at the end of the stream: the previous chunk was the last one
+                    if response.status_code == 416 and written > 0:
+                        break
+                    response.raise_for_status()
+                    # Content-Range: bytes <first>-<last>/<total>, where total may be '*'
+                    total = response.headers.get('content-range', '').rpartition('/')[2]
+                    received = 0
+                    for chunk in response.iter_bytes():
+                        destination.write(chunk)
+                        received += len(chunk)
+                written += received
+                BYTES_DOWNLOADED.inc(received, upstream='ytdlp')
+                # A full 200 response, a short range or the advertised length reached means the stream is complete
+                if response.status_code != 206 or received < NATIVE_CHUNK_BYTES or (total.isdigit() and written >= int(total)):
+                    break
+            current.set_attribute('http.response.body.size', written)
+            return written
+    
+    def _transcode_and_transcribe(self, video_input: str, progress: ProgressCallback = _no_progress) -> AudioTranscript:
+        """
+        Download audio through yt-dlp, re-encode it to opus and transcribe it.
+        
+        Args:
+            video_input: YouTube URL or video ID
+            progress: Progress callback
+            
+        Returns:
+            AudioTranscript with the transcript and audio durations
+            
+        Raises:
+            SearchException: If download or transcription fails
+        """
         # Create portable temp directory that works everywhere
         temp_dir = Path(tempfile.mkdtemp(prefix='youtube_audio_'))
         unique_id = uuid.uuid4().hex
@@ -73,17 +520,16 @@ class YouTubeContentFetcher:
                 'format': 'worstaudio/worst',  # Fallback if worstaudio fails
                 'outtmpl': str(audio_path.with_suffix('')),
                 'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'opus'}],
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-us,en;q=0.5',
-                    'Sec-Fetch-Mode': 'navigate',
-                },
-                'nocheckcertificate': True,
+                **_YDL_HTTP_OPTIONS,
             }
 
             # Download
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            progress(STAGE_DOWNLOADING)
+            with (
+                span('ytdlp.download', {'url.full': video_input}),
+                track_upstream('ytdlp'),
+                yt_dlp.YoutubeDL(ydl_opts) as ydl,
+            ):
                 ydl.download([video_input])
             
             if not audio_path.exists():
@@ -94,14 +540,7 @@ class YouTubeContentFetcher:
 
             # Transcribe
             client = OpenAI(base_url=self.stt_endpoint, api_key=self.stt_api_key)
-            with open(audio_path, 'rb') as f:
-                transcription = client.audio.transcriptions.create(
-                    model=self.stt_model,
-                    file=f,
-                    response_format="text"
-                )
-
-            return video_id, transcription
+            return self._transcribe_audio(client, audio_path, progress)
         
         except Exception as e:
             raise SearchException(f"Failed to fetch/transcribe YouTube content: {str(e)}")
@@ -119,5 +558,145 @@ class YouTubeContentFetcher:
                     temp_dir.rmdir()
                 except OSError:
                     # Directory not empty, use shutil for safety
-                    import shutil
                     shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def _transcribe_file(self, client: OpenAI, audio_path: Path) -> str:
+        """Upload one audio file to the STT endpoint and return its transcript."""
+        with (
+            span('stt.transcribe', {'stt.model': self.stt_model, 'audio.file': audio_path.name}),
+            track_upstream('stt'),
+            open(audio_path, 'rb') as f,
+        ):
+            return client.audio.transcriptions.create(
+                model=self.stt_model,
+                file=f,
+                response_format="text"
+            )
+    
+    def _preprocess_filter(self) -> Optional[str]:
+        """Return the configured preprocessing filter chain, or None if preprocessing is off."""
+        if not (SearchConfig.STT_TRIM_SILENCE or SearchConfig.STT_TEMPO != 1.0) or not ffmpeg_available():
+            return None
+        return build_preprocess_filter(SearchConfig.STT_TRIM_SILENCE, SearchConfig.STT_TEMPO)
+    
+    def _segmentation_enabled(self) -> bool:
+        """Check whether long audio may be split for parallel transcription."""
+        return SearchConfig.STT_SEGMENT_SECONDS > 0 and SearchConfig.STT_CONCURRENCY > 1 and ffmpeg_available()
+    
+    def _plan_audio_segments(self, audio_path: Path) -> List[Tuple[float, float]]:
+        """
+        Decide how to split an audio file for parallel transcription.
+        
+        Returns:
+            The (start, end) segments, or an empty list to transcribe the
+            file in one request (short audio, splitting disabled, or ffmpeg
+            unavailable)
+        """
+        if not self._segmentation_enabled():
+            return []
+        
+        segment_seconds = SearchConfig.STT_SEGMENT_SECONDS
+        
+        try:
+            duration = probe_duration(audio_path)
+            if duration <= segment_seconds * (1 + MIN_TAIL_FRACTION):
+                return []
+            silences = detect_silences(audio_path)
+        except SearchException as e:
+            self.logger.warning(f"Transcribing without splitting, audio analysis failed: {e}")
+            return []
+        
+        return plan_segments(duration, silences, segment_seconds, SearchConfig.STT_SEGMENT_OVERLAP)
+    
+    def _transcribe_audio(
+        self,
+        client: OpenAI,
+        audio_path: Path,
+        progress: ProgressCallback = _no_progress
+    ) -> AudioTranscript:
+        """
+        Preprocess an audio file if configured, then transcribe it.
+        
+        Preprocessing shortens long silences and speeds the audio up so the
+        STT server has less audio to process; the durations before and
+        after are returned with the transcript. If ffmpeg fails the original
+        audio is transcribed instead.
+        """
+        audio_filter = self._preprocess_filter()
+        if audio_filter is None:
+            return AudioTranscript(transcript=self._transcribe_segments(client, audio_path, progress))
+        
+        progress(STAGE_PREPROCESSING)
+        processed_path = audio_path.with_name(f"{audio_path.stem}_processed.opus")
+        try:
+            with span('audio.preprocess', {'audio.filter': audio_filter}) as current:
+                audio_duration = probe_duration(audio_path)
+                preprocess_audio(audio_path, processed_path, audio_filter)
+                processed_duration = probe_duration(processed_path)
+                current.set_attributes({'audio.duration': audio_duration, 'audio.processed_duration': processed_duration})
+        except SearchException as e:
+            self.logger.warning(f"Transcribing unprocessed audio, preprocessing failed: {e}")
+            processed_path.unlink(missing_ok=True)
+            return AudioTranscript(transcript=self._transcribe_segments(client, audio_path, progress))
+        
+        self.logger.debug(f"Preprocessed {audio_path.name}: {audio_duration:.1f}s -> {processed_duration:.1f}s")
+        try:
+            transcript = self._transcribe_segments(client, processed_path, progress)
+        finally:
+            processed_path.unlink(missing_ok=True)
+        return AudioTranscript(
+            transcript=transcript,
+            audio_duration=round(audio_duration, 3),
+            processed_duration=round(processed_duration, 3),
+        )
+    
+    def _transcribe_segments(
+        self,
+        client: OpenAI,
+        audio_path: Path,
+        progress: ProgressCallback = _no_progress
+    ) -> str:
+        """
+        Transcribe an audio file, splitting long audio into segments.
+        
+        Segments are cut at silences, transcribed concurrently with at most
+        STT_CONCURRENCY requests in flight, and stitched back together in
+        order with the text repeated by their overlap removed. Progress is
+        reported whenever the next segment in order completes, together
+        with the transcript of all segments up to it.
+        """
+        segments = self._plan_audio_segments(audio_path)
+        if len(segments) <= 1:
+            progress(STAGE_TRANSCRIBING, 0, 1)
+            return self._transcribe_file(client, audio_path)
+        
+        self.logger.debug(f"Transcribing {audio_path.name} in {len(segments)} segments")
+        
+        def transcribe_segment(index: int, start: float, end: float) -> str:
+            segment_path = audio_path.with_name(f"{audio_path.stem}_part{index:03d}{audio_path.suffix}")
+            try:
+                extract_segment(audio_path, start, end, segment_path)
+                return self._transcribe_file(client, segment_path)
+            finally:
+                segment_path.unlink(missing_ok=True)
+        
+        executor = ThreadPoolExecutor(
+            max_workers=min(SearchConfig.STT_CONCURRENCY, len(segments)),
+            thread_name_prefix='stt-segment'
+        )
+        try:
+            # Each segment runs in a copy of this context so its spans nest under this stage
+            futures = [
+                executor.submit(contextvars.copy_context().run, transcribe_segment, index, start, end)
+                for index, (start, end) in enumerate(segments)
+            ]
+            progress(STAGE_TRANSCRIBING, 0, len(segments))
+            parts = []
+            for future in futures:
+                parts.append(future.result())
+                progress(STAGE_TRANSCRIBING, len(parts), len(segments), stitch_transcripts(parts))
+        finally:
+            # Stop queued segments early if one of them failed
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        return stitch_transcripts(parts)
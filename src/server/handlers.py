@@ -2,13 +2,30 @@
 MCP tool handlers for search functionality
 """
 
+import asyncio
+import time
 from typing import List, Dict, Any
 from fastmcp.exceptions import ToolError
 from ..core.search import SearxngClient
 from ..core.web_fetcher import WebContentFetcher
-from ..core.youtube_fetcher import YouTubeContentFetcher
+from ..core.youtube_fetcher import YouTubeContentFetcher, parse_video_id
 from ..core.config import SearchConfig, SearchException
-from ..core.models import SearchResultOutput, VideoSearchResultOutput, FetchContentOutput, YouTubeContentOutput
+from ..core.metrics import CHARS_RETURNED, MetricFamily, track_tool
+from ..core.tracing import current_span, traced
+from ..core.singleflight import SingleFlight
+from ..core.transcription_jobs import TranscriptionJobQueue
+from ..core.models import (
+    SearchResultOutput,
+    BatchSearchResultOutput,
+    SearchBatchOutput,
+    VideoSearchResultOutput,
+    FetchContentOutput,
+    FetchManyItemOutput,
+    SearchAndFetchResultOutput,
+    YouTubeContentOutput,
+    TranscriptionJobOutput,
+    TranscriptionJobStatusOutput,
+)
 
 
 class SearchHandlers:
@@ -18,8 +35,17 @@ class SearchHandlers:
         self.client = SearxngClient()
         self.fetcher = WebContentFetcher()
         self.youtube_fetcher = YouTubeContentFetcher()
+        self.youtube_inflight = SingleFlight()
+        self.transcription_jobs = TranscriptionJobQueue(
+            self.youtube_fetcher,
+            workers=SearchConfig.TRANSCRIPTION_WORKERS,
+            max_queue=SearchConfig.TRANSCRIPTION_QUEUE_SIZE,
+            retention=SearchConfig.TRANSCRIPTION_JOB_RETENTION,
+        )
     
-    def search(self, query: str, max_results: int = 10) -> List[SearchResultOutput]:
+    @track_tool('search')
+    @traced('SearchHandlers.search')
+    async def search(self, query: str, max_results: int = 10) -> List[SearchResultOutput]:
         """
         Perform a general web search using SearxNG.
         
@@ -42,7 +68,7 @@ class SearchHandlers:
         
         try:
             # Call the search function
-            results = self.client.search_general(query, max_results=max_results)
+            results = await self.client.search_general(query, max_results=max_results)
             
             # Convert to output models
             return [
@@ -59,7 +85,58 @@ class SearchHandlers:
         except Exception as e:
             raise ToolError(f"Unexpected error: {str(e)}")
     
-    def search_videos(self, query: str, max_results: int = 10) -> List[VideoSearchResultOutput]:
+    @track_tool('search_batch')
+    @traced('SearchHandlers.search_batch')
+    async def search_batch(self, queries: List[str], max_results: int = 10) -> SearchBatchOutput:
+        """
+        Run several web searches concurrently and merge their results.
+        
+        Args:
+            queries: The search queries to execute (max: 10)
+            max_results: Maximum number of results per query (default: 10, max: 25)
+            
+        Returns:
+            Deduplicated results tagged with the queries that found them,
+            plus the error of every query that failed
+        """
+        # Validate queries
+        if not queries:
+            raise ToolError("At least one search query is required")
+        if len(queries) > SearchConfig.SEARCH_BATCH_MAX_QUERIES:
+            raise ToolError(f"Too many queries (max: {SearchConfig.SEARCH_BATCH_MAX_QUERIES})")
+        if any(not query or not query.strip() for query in queries):
+            raise ToolError("Search queries cannot be empty")
+        
+        # Validate max_results
+        if max_results > SearchConfig.MAX_GENERAL_RESULTS:
+            max_results = SearchConfig.MAX_GENERAL_RESULTS
+        elif max_results < 1:
+            max_results = 1
+        
+        try:
+            response = await self.client.search_batch(queries, max_results=max_results)
+            
+            return SearchBatchOutput(
+                results=[
+                    BatchSearchResultOutput(
+                        title=result.title,
+                        url=result.url,
+                        content=result.content,
+                        score=result.score or 0.0,
+                        queries=result.queries,
+                    )
+                    for result in response.results
+                ],
+                failed_queries=response.failed_queries,
+            )
+        except SearchException as e:
+            raise ToolError(f"Search failed: {str(e)}")
+        except Exception as e:
+            raise ToolError(f"Unexpected error: {str(e)}")
+    
+    @track_tool('search_videos')
+    @traced('SearchHandlers.search_videos')
+    async def search_videos(self, query: str, max_results: int = 10) -> List[VideoSearchResultOutput]:
         """
         Search for YouTube videos using SearxNG.
         
@@ -82,7 +159,7 @@ class SearchHandlers:
         
         try:
             # Call the video search function (YouTube only)
-            results = self.client.search_videos(query, engines='youtube', max_results=max_results)
+            results = await self.client.search_videos(query, engines='youtube', max_results=max_results)
             
             # Convert to output models
             return [
@@ -100,6 +177,8 @@ class SearchHandlers:
         except Exception as e:
             raise ToolError(f"Unexpected error: {str(e)}")
     
+    @track_tool('fetch_content')
+    @traced('SearchHandlers.fetch_content')
     async def fetch_content(self, url: str, offset: int = 0) -> FetchContentOutput:
         """
         Fetch and parse content from a webpage URL with pagination support.
@@ -117,6 +196,8 @@ class SearchHandlers:
         
         try:
             content, is_truncated, next_offset, total_length = await self.fetcher.fetch_and_parse(url, offset)
+            CHARS_RETURNED.inc(len(content), tool='fetch_content')
+            current_span().set_attributes({'url.full': url, 'content.length': len(content)})
             return FetchContentOutput(
                 content=content,
                 content_length=len(content),
@@ -131,12 +212,154 @@ class SearchHandlers:
         except Exception as e:
             raise ToolError(f"Unexpected error: {str(e)}")
     
-    def fetch_youtube_content(self, video_id: str) -> YouTubeContentOutput:
+    @track_tool('fetch_many')
+    @traced('SearchHandlers.fetch_many')
+    async def fetch_many(self, urls: List[str], offset: int = 0) -> List[FetchManyItemOutput]:
+        """
+        Fetch and parse several webpage URLs concurrently.
+        
+        Args:
+            urls: The webpage URLs to fetch content from
+            offset: Starting position for content retrieval, applied to every URL
+            
+        Returns:
+            One FetchManyItemOutput per URL, in request order, carrying either
+            the content and pagination metadata or the error for that URL
+        """
+        # Validate URLs
+        if not urls:
+            raise ToolError("At least one URL is required")
+        if len(urls) > SearchConfig.FETCH_MANY_MAX_URLS:
+            raise ToolError(f"At most {SearchConfig.FETCH_MANY_MAX_URLS} URLs can be fetched at once")
+        if any(not url or not url.strip() for url in urls):
+            raise ToolError("URL cannot be empty")
+        
+        current_span().set_attribute('fetch.url_count', len(urls))
+        try:
+            results = await self.fetcher.fetch_many(urls, offset)
+        except Exception as e:
+            raise ToolError(f"Unexpected error: {str(e)}")
+        
+        outputs = []
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                outputs.append(FetchManyItemOutput(
+                    url=url,
+                    success=False,
+                    offset=offset,
+                    error=f"Failed to fetch content: {str(result)}"
+                ))
+                continue
+            
+            content, is_truncated, next_offset, total_length = result
+            CHARS_RETURNED.inc(len(content), tool='fetch_many')
+            outputs.append(FetchManyItemOutput(
+                url=url,
+                success=True,
+                content=content,
+                content_length=len(content),
+                is_truncated=is_truncated,
+                offset=offset,
+                next_offset=next_offset if is_truncated else None,
+                total_length=total_length
+            ))
+        return outputs
+    
+    @track_tool('search_and_fetch')
+    @traced('SearchHandlers.search_and_fetch')
+    async def search_and_fetch(
+        self,
+        query: str,
+        max_pages: int = SearchConfig.DEFAULT_PIPELINE_PAGES,
+        max_chars_per_page: int = SearchConfig.DEFAULT_PIPELINE_PAGE_CHARS,
+        deadline: float = SearchConfig.DEFAULT_PIPELINE_DEADLINE
+    ) -> List[SearchAndFetchResultOutput]:
+        """
+        Search with SearxNG and fetch the top result pages concurrently.
+        
+        Args:
+            query: The search query to execute
+            max_pages: Number of top results to fetch (default: 3, max: 10)
+            max_chars_per_page: Character budget for each page's content (default: 5000, max: 30000)
+            deadline: Overall time budget in seconds for search and fetches (default: 20, max: 60)
+            
+        Returns:
+            Search results with the page content attached, or a per-result
+            error for pages that failed or missed the deadline
+        """
+        # Validate query
+        if not query or not query.strip():
+            raise ToolError("Search query cannot be empty")
+        
+        # Validate limits
+        max_pages = min(max(max_pages, 1), SearchConfig.MAX_PIPELINE_PAGES)
+        max_chars_per_page = min(max(max_chars_per_page, 1), SearchConfig.MAX_CONTENT_LENGTH)
+        deadline = min(max(deadline, 1.0), SearchConfig.MAX_PIPELINE_DEADLINE)
+        
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + deadline
+        current_span().set_attributes({'search.query': query, 'search.max_pages': max_pages})
+        
+        try:
+            results = await asyncio.wait_for(
+                self.client.search_general(query, max_results=max_pages),
+                timeout=deadline
+            )
+        except asyncio.TimeoutError:
+            raise ToolError(f"Search did not complete within the {deadline:g}s deadline")
+        except SearchException as e:
+            raise ToolError(f"Search failed: {str(e)}")
+        except Exception as e:
+            raise ToolError(f"Unexpected error: {str(e)}")
+        
+        # Fetch every result page in parallel within what is left of the deadline
+        tasks = [
+            asyncio.create_task(self.fetcher.fetch_with_limits(result.url, max_chars=max_chars_per_page))
+            for result in results
+        ]
+        if tasks:
+            await asyncio.wait(tasks, timeout=max(deadline_at - loop.time(), 0))
+        
+        outputs = []
+        for result, task in zip(results, tasks):
+            page = {}
+            if not task.done():
+                task.cancel()
+                page['error'] = "Page fetch did not finish before the deadline"
+            elif isinstance(task.result(), Exception):
+                page['error'] = f"Failed to fetch content: {str(task.result())}"
+            else:
+                content, is_truncated, next_offset, total_length = task.result()
+                CHARS_RETURNED.inc(len(content), tool='search_and_fetch')
+                page = {
+                    'page_content': content,
+                    'page_content_length': len(content),
+                    'is_truncated': is_truncated,
+                    'next_offset': next_offset if is_truncated else None,
+                    'total_length': total_length,
+                }
+            
+            outputs.append(SearchAndFetchResultOutput(
+                title=result.title,
+                url=result.url,
+                snippet=result.content,
+                score=result.score or 0.0,
+                **page
+            ))
+        return outputs
+    
+    @track_tool('fetch_youtube_content')
+    @traced('SearchHandlers.fetch_youtube_content')
+    async def fetch_youtube_content(self, video_id: str, use_cache: bool = True) -> YouTubeContentOutput:
         """
         Fetch and transcribe YouTube video content.
         
+        Concurrent requests for the same video share one download and
+        transcription, which runs in a worker thread.
+        
         Args:
             video_id: YouTube video ID or full URL
+            use_cache: Whether a previously cached transcript may be returned
             
         Returns:
             YouTubeContentOutput containing the video ID and transcript
@@ -146,14 +369,159 @@ class SearchHandlers:
             raise ToolError("Video ID or URL cannot be empty")
         
         try:
-            vid_id, transcript = self.youtube_fetcher.fetch_and_transcribe(video_id)
+            video_input = video_id.strip()
+            result = await self.youtube_inflight.do(
+                (parse_video_id(video_input) or video_input, use_cache),
+                lambda: asyncio.to_thread(
+                    self.youtube_fetcher.fetch_transcript, video_input, use_cache=use_cache
+                )
+            )
+            CHARS_RETURNED.inc(len(result.transcript), tool='fetch_youtube_content')
+            current_span().set_attributes({'youtube.video_id': result.video_id, 'transcript.source': result.source})
             return YouTubeContentOutput(
-                video_id=vid_id,
-                transcript=transcript,
-                transcript_length=len(transcript),
+                video_id=result.video_id,
+                transcript=result.transcript,
+                transcript_length=len(result.transcript),
+                source=result.source,
+                audio_duration=result.audio_duration,
+                processed_duration=result.processed_duration,
                 success=True
             )
         except SearchException as e:
             raise ToolError(f"Failed to fetch YouTube content: {str(e)}")
         except Exception as e:
             raise ToolError(f"Unexpected error: {str(e)}")
+    
+    @track_tool('start_youtube_transcription')
+    @traced('SearchHandlers.start_youtube_transcription')
+    async def start_youtube_transcription(self, video_id: str, use_cache: bool = True) -> TranscriptionJobOutput:
+        """
+        Queue a YouTube transcription and return its job ID immediately.
+        
+        Args:
+            video_id: YouTube video ID or full URL
+            use_cache: Whether a previously cached transcript may be returned
+            
+        Returns:
+            TranscriptionJobOutput with the job ID, status and queue position
+        """
+        # Validate video_id
+        if not video_id or not video_id.strip():
+            raise ToolError("Video ID or URL cannot be empty")
+        
+        try:
+            job = self.transcription_jobs.submit(video_id.strip(), use_cache=use_cache)
+        except SearchException as e:
+            raise ToolError(f"Failed to start transcription: {str(e)}")
+        
+        return TranscriptionJobOutput(
+            job_id=job.job_id,
+            status=job.status,
+            queue_position=self.transcription_jobs.queue_position(job)
+        )
+    
+    @track_tool('get_transcription_status')
+    @traced('SearchHandlers.get_transcription_status')
+    async def get_transcription_status(self, job_id: str) -> TranscriptionJobStatusOutput:
+        """
+        Report the progress or result of a transcription job.
+        
+        Args:
+            job_id: ID returned by start_youtube_transcription
+            
+        Returns:
+            TranscriptionJobStatusOutput with progress, the partial transcript
+            while segments complete, and the final transcript or error
+        """
+        if not job_id or not job_id.strip():
+            raise ToolError("Job ID cannot be empty")
+        
+        job = self.transcription_jobs.get(job_id.strip())
+        if job is None:
+            raise ToolError(f"Unknown or expired transcription job: {job_id}")
+        
+        state = job.snapshot()
+        result = state['result']
+        end = state['finished_at'] or time.time()
+        return TranscriptionJobStatusOutput(
+            job_id=state['job_id'],
+            video_input=state['video_input'],
+            status=state['status'],
+            stage=state['stage'],
+            progress=state['progress'],
+            segments_done=state['segments_done'],
+            segments_total=state['segments_total'],
+            queue_position=self.transcription_jobs.queue_position(job),
+            partial_transcript=state['partial_transcript'],
+            video_id=result.video_id if result else None,
+            transcript=result.transcript if result else None,
+            transcript_length=len(result.transcript) if result else 0,
+            source=result.source if result else None,
+            audio_duration=result.audio_duration if result else None,
+            processed_duration=result.processed_duration if result else None,
+            error=state['error'],
+            elapsed_seconds=round(end - state['created_at'], 3)
+        )
+    
+    def collect_metrics(self) -> List[MetricFamily]:
+        """
+        Read cache, SearxNG backend and transcription queue state for a metrics scrape.
+        
+        Returns:
+            Metric families to render alongside the request metrics
+        """
+        caches = {
+            'search': self.client.cache,
+            'document': self.fetcher.document_cache,
+            'pdf': self.fetcher.pdf_cache,
+            'pdf_pages': self.fetcher.pdf_page_cache,
+        }
+        cache_stats = {name: cache.stats() for name, cache in caches.items() if cache is not None}
+        families: List[MetricFamily] = [
+            (
+                f'webintel_cache_{field}_total' if counter else f'webintel_cache_{field}',
+                'counter' if counter else 'gauge',
+                documentation,
+                [({'cache': name}, stats[field]) for name, stats in cache_stats.items()]
+            )
+            for field, counter, documentation in (
+                ('hits', True, 'Cache lookups answered from the cache.'),
+                ('stale_hits', True, 'Cache lookups answered with a stale entry.'),
+                ('misses', True, 'Cache lookups that missed.'),
+                ('evictions', True, 'Entries evicted to stay within cache limits.'),
+                ('entries', False, 'Entries currently cached.'),
+                ('bytes', False, 'Estimated size of the cached entries.'),
+            )
+        ]
+        
+        backends = self.client.backend_stats()
+        families += [
+            (
+                'webintel_searxng_latency_seconds', 'gauge', 'Moving average latency of each SearxNG backend.',
+                [({'backend': b['url']}, b['latency_ms'] / 1000) for b in backends if b['latency_ms'] is not None]
+            ),
+            (
+                'webintel_searxng_outstanding', 'gauge', 'Requests in flight to each SearxNG backend.',
+                [({'backend': b['url']}, b['outstanding']) for b in backends]
+            ),
+            (
+                'webintel_searxng_ejected', 'gauge', 'Whether each SearxNG backend is ejected (1) or healthy (0).',
+                [({'backend': b['url']}, int(b['ejected'])) for b in backends]
+            ),
+            (
+                'webintel_searxng_requests_total', 'counter', 'Requests sent to each SearxNG backend.',
+                [({'backend': b['url']}, b['requests']) for b in backends]
+            ),
+            (
+                'webintel_searxng_errors_total', 'counter', 'Failed requests and probes per SearxNG backend.',
+                [({'backend': b['url']}, b['errors']) for b in backends]
+            ),
+            (
+                'webintel_transcription_jobs', 'gauge', 'Transcription jobs waiting or running.',
+                [
+                    ({'state': 'queued'}, self.transcription_jobs.queue_depth()),
+                    ({'state': 'running'}, self.transcription_jobs.running_count()),
+                ]
+            ),
+        ]
+        return families
@@ -5,16 +5,43 @@ Provides general web search capabilities via SearxNG
 
 import argparse
 import sys
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 from pydantic import Field
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 from .handlers import SearchHandlers
-from ..core.models import SearchResultOutput, VideoSearchResultOutput, FetchContentOutput, YouTubeContentOutput
+from ..core.metrics import REGISTRY
+from ..core.models import (
+    SearchResultOutput,
+    SearchBatchOutput,
+    VideoSearchResultOutput,
+    FetchContentOutput,
+    FetchManyItemOutput,
+    SearchAndFetchResultOutput,
+    YouTubeContentOutput,
+    TranscriptionJobOutput,
+    TranscriptionJobStatusOutput,
+)
 
 
 # Create the MCP server
 mcp = FastMCP("WebIntel MCP")
-handlers = SearchHandlers()
+_handlers: Optional[SearchHandlers] = None
+
+
+def get_handlers() -> SearchHandlers:
+    """
+    Return the shared handlers, creating them on first use.
+    
+    They are not created at import time: parsing workers are spawned
+    processes that re-import the main module, and must not open their own
+    HTTP clients, caches, content store and job queue.
+    """
+    global _handlers
+    if _handlers is None:
+        _handlers = SearchHandlers()
+    return _handlers
 
 
 @mcp.tool(
@@ -26,7 +53,7 @@ handlers = SearchHandlers()
         "idempotentHint": True
     }
 )
-def search(
+async def search(
     query: Annotated[str, Field(
         description="The search query to execute",
         min_length=1,
@@ -44,7 +71,43 @@ def search(
     Returns:
         List of search results with title, url, content, score
     """
-    return handlers.search(query, max_results)
+    return await get_handlers().search(query, max_results)
+
+
+@mcp.tool(
+    name="search_batch",
+    tags={"search", "web", "batch"},
+    annotations={
+        "title": "Batch Web Search",
+        "readOnlyHint": True,
+        "openWorldHint": True,
+        "idempotentHint": True
+    }
+)
+async def search_batch(
+    queries: Annotated[List[Annotated[str, Field(min_length=1, max_length=500)]], Field(
+        description="Search queries to run concurrently, e.g. reformulations of one question (max: 10)",
+        min_length=1,
+        max_length=10
+    )],
+    max_results: Annotated[int, Field(
+        description="Maximum number of results per query (default: 10, min: 1, max: 25)",
+        ge=1,
+        le=25
+    )] = 10
+) -> SearchBatchOutput:
+    """
+    Run several web searches at once and merge the results.
+    
+    Faster than separate search calls: all queries are sent to SearxNG
+    concurrently. Results are deduplicated by URL and interleaved by rank;
+    each result lists the queries that found it. Queries that fail are
+    reported in 'failed_queries' without affecting the others.
+    
+    Returns:
+        Merged results with title, url, content, score and queries
+    """
+    return await get_handlers().search_batch(queries, max_results)
 
 
 @mcp.tool(
@@ -56,7 +119,7 @@ def search(
         "idempotentHint": True
     }
 )
-def search_videos(
+async def search_videos(
     query: Annotated[str, Field(
         description="The video search query to execute",
         min_length=1,
@@ -74,7 +137,7 @@ def search_videos(
     Returns:
         List of video results with url, title, author, content, and length
     """
-    return handlers.search_videos(query, max_results)
+    return await get_handlers().search_videos(query, max_results)
 
 
 @mcp.tool(
@@ -103,10 +166,105 @@ async def fetch_content(
     Content is retrieved in chunks of 30,000 characters. If content is truncated,
     use the returned 'next_offset' value in a subsequent call to retrieve the next chunk.
     
+    PDFs are paginated by page: each chunk holds whole pages headed
+    '[Page N/M]', and page N (from 0) starts at offset N * 1,000,000, so any
+    page can be requested directly; 'total_length' is the page count times
+    1,000,000. A page longer than a chunk continues in the next chunk.
+    
     Returns:
         FetchContentOutput with parsed content and pagination metadata
     """
-    return await handlers.fetch_content(url, offset)
+    return await get_handlers().fetch_content(url, offset)
+
+
+@mcp.tool(
+    name="fetch_many",
+    tags={"web", "fetch", "content", "batch"},
+    annotations={
+        "title": "Fetch Multiple Web Pages",
+        "readOnlyHint": True,
+        "openWorldHint": True,
+        "idempotentHint": False
+    }
+)
+async def fetch_many(
+    urls: Annotated[List[str], Field(
+        description="The webpage URLs to fetch content from (max: 20)",
+        min_length=1,
+        max_length=20
+    )],
+    offset: Annotated[int, Field(
+        description="Starting position for content retrieval, applied to every URL (default: 0, min: 0)",
+        ge=0
+    )] = 0
+) -> List[FetchManyItemOutput]:
+    """
+    Fetch and parse several webpage URLs concurrently in one call.
+    
+    Each URL returns its own 30,000 character chunk with the same pagination
+    metadata as fetch_content, or an error if that URL failed. Failures do not
+    affect the other URLs. Use fetch_content with 'next_offset' to continue
+    reading a truncated page.
+    
+    PDFs are paginated by page as in fetch_content: page N (from 0) starts at
+    offset N * 1,000,000 and 'total_length' is the page count times 1,000,000,
+    so an offset applied to every URL means a page for PDFs and a character
+    position for other pages.
+    
+    Returns:
+        List of per-URL results in request order
+    """
+    return await get_handlers().fetch_many(urls, offset)
+
+
+@mcp.tool(
+    name="search_and_fetch",
+    tags={"search", "web", "fetch", "content"},
+    annotations={
+        "title": "Search and Read Top Results",
+        "readOnlyHint": True,
+        "openWorldHint": True,
+        "idempotentHint": False
+    }
+)
+async def search_and_fetch(
+    query: Annotated[str, Field(
+        description="The search query to execute",
+        min_length=1,
+        max_length=500
+    )],
+    max_pages: Annotated[int, Field(
+        description="Number of top results to fetch and read (default: 3, min: 1, max: 10)",
+        ge=1,
+        le=10
+    )] = 3,
+    max_chars_per_page: Annotated[int, Field(
+        description="Maximum characters of content returned per page (default: 5000, min: 1, max: 30000)",
+        ge=1,
+        le=30000
+    )] = 5000,
+    deadline: Annotated[float, Field(
+        description="Overall time budget in seconds; pages not fetched in time are reported as errors (default: 20, min: 1, max: 60)",
+        ge=1,
+        le=60
+    )] = 20.0
+) -> List[SearchAndFetchResultOutput]:
+    """
+    Search the web and read the top results in one call.
+    
+    Runs a web search, then fetches and extracts the top result pages in
+    parallel. Each result carries its search snippet plus up to
+    'max_chars_per_page' characters of page content. Use fetch_content with
+    the result URL and 'next_offset' to keep reading a truncated page.
+    
+    PDF results are paginated by page as in fetch_content: their
+    'next_offset' is a page offset (page N starts at N * 1,000,000) and
+    'total_length' is the page count times 1,000,000.
+    
+    Returns:
+        List of search results with page content or a per-page error
+    """
+    return await get_handlers().search_and_fetch(query, max_pages, max_chars_per_page, deadline)
 
 
 @mcp.tool(
@@ -119,23 +277,104 @@ async def fetch_content(
         "idempotentHint": False
     }
 )
-def fetch_youtube_content(
+async def fetch_youtube_content(
     video_id: Annotated[str, Field(
         description="YouTube video ID or full URL (e.g., 'dQw4w9WgXcQ' or 'https://www.youtube.com/watch?v=dQw4w9WgXcQ')",
         min_length=1,
         max_length=200
-    )]
+    )],
+    use_cache: Annotated[bool, Field(
+        description="Return a previously cached transcript if available (default: true). Set false to force a fresh transcription"
+    )] = True
 ) -> YouTubeContentOutput:
     """
-    Fetch and transcribe YouTube video content using STT.
+    Fetch the transcript of a YouTube video.
     
-    Downloads the audio from a YouTube video and transcribes it using a
-    speech-to-text service. Accepts either a video ID or full YouTube URL.
+    Uses the video's caption track when one exists; otherwise downloads the
+    audio and transcribes it using a speech-to-text service. Accepts either
+    a video ID or full YouTube URL. Transcripts are cached, so repeat
+    requests for a video return immediately.
     
     Returns:
-        YouTubeContentOutput with video_id, transcript, and metadata
+        YouTubeContentOutput with video_id, transcript, source ('captions'
+        or 'stt'), and metadata
     """
-    return handlers.fetch_youtube_content(video_id)
+    return await get_handlers().fetch_youtube_content(video_id, use_cache)
+
+
+@mcp.tool(
+    name="start_youtube_transcription",
+    tags={"youtube", "transcript", "content", "jobs"},
+    annotations={
+        "title": "Start YouTube Transcription Job",
+        "readOnlyHint": False,
+        "openWorldHint": True,
+        "idempotentHint": False
+    }
+)
+async def start_youtube_transcription(
+    video_id: Annotated[str, Field(
+        description="YouTube video ID or full URL (e.g., 'dQw4w9WgXcQ' or 'https://www.youtube.com/watch?v=dQw4w9WgXcQ')",
+        min_length=1,
+        max_length=200
+    )],
+    use_cache: Annotated[bool, Field(
+        description="Return a previously cached transcript if available (default: true). Set false to force a fresh transcription"
+    )] = True
+) -> TranscriptionJobOutput:
+    """
+    Start transcribing a YouTube video in the background.
+    
+    Returns a job ID right away instead of holding the request open, which
+    suits long videos. Poll get_transcription_status with the job ID for
+    progress, partial text and the final transcript. Starting a job for a
+    video that is already being transcribed returns the existing job.
+    
+    Returns:
+        TranscriptionJobOutput with job_id, status and queue_position
+    """
+    return await get_handlers().start_youtube_transcription(video_id, use_cache)
+
+
+@mcp.tool(
+    name="get_transcription_status",
+    tags={"youtube", "transcript", "jobs"},
+    annotations={
+        "title": "Get YouTube Transcription Status",
+        "readOnlyHint": True,
+        "openWorldHint": False,
+        "idempotentHint": True
+    }
+)
+async def get_transcription_status(
+    job_id: Annotated[str, Field(
+        description="Job ID returned by start_youtube_transcription",
+        min_length=1,
+        max_length=100
+    )]
+) -> TranscriptionJobStatusOutput:
+    """
+    Get the progress or result of a transcription job.
+    
+    Status is 'queued', 'running', 'completed' or 'failed'. While a long
+    video is transcribed in segments, 'progress' and 'partial_transcript'
+    grow as segments complete. Completed jobs include the transcript and
+    its source; failed jobs include the error. Finished jobs expire after
+    an hour by default.
+    
+    Returns:
+        TranscriptionJobStatusOutput with status, progress and results
+    """
+    return await get_handlers().get_transcription_status(job_id)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> PlainTextResponse:
+    """Expose request, upstream, cache and queue metrics in the Prometheus text format."""
+    return PlainTextResponse(
+        REGISTRY.render(get_handlers().collect_metrics()),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 def run_server():
@@ -146,6 +385,7 @@ def run_server():
     parser.add_argument('--http', action='store_true', help='Run server with HTTP transport')
     parser.add_argument('--sse', action='store_true', help='Run server with SSE transport')
     args = parser.parse_args()
+    get_handlers()
 
     # Run server with appropriate transport and port
     if args.http:
@@ -0,0 +1,128 @@
+"""
+Tests for audio segmentation and transcript stitching
+"""
+
+import subprocess
+import pytest
+
+from src.core.audio_segments import (
+    build_preprocess_filter,
+    ffmpeg_available,
+    detect_silences,
+    parse_silences,
+    plan_segments,
+    probe_duration,
+    stitch_transcripts,
+)
+
+
+class TestPlanSegments:
+    """Test cases for segment planning."""
+    
+    def test_short_audio_is_one_segment(self):
+        """Test that audio close to the segment length is not split."""
+        assert plan_segments(340, [], segment_seconds=300, overlap=2) == [(0.0, 340)]
+    
+    def test_fixed_cuts_without_silences(self):
+        """Test evenly spaced cuts with overlap when no silence is found."""
+        segments = plan_segments(950, [], segment_seconds=300, overlap=2)
+        
+        # The 350 s remainder is kept whole rather than leaving a 50 s tail
+        assert segments == [(0.0, 300), (298, 600), (598, 950)]
+    
+    def test_cuts_snap_to_nearest_silence(self):
+        """Test that cuts move to a nearby silence midpoint."""
+        silences = [(100.0, 101.0), (290.0, 292.0), (330.0, 331.0)]
+        segments = plan_segments(700, silences, segment_seconds=300, overlap=2)
+        
+        assert segments[0] == (0.0, 291.0)
+        assert segments[1][0] == 289.0
+    
+    def test_distant_silences_ignored(self):
+        """Test that silences outside the search window do not move the cut."""
+        segments = plan_segments(700, [(150.0, 151.0)], segment_seconds=300, overlap=0)
+        
+        assert segments[0] == (0.0, 300)
+
+
+class TestParseSilences:
+    """Test cases for silencedetect output parsing."""
+    
+    def test_parse_intervals(self):
+        """Test pairing of silence_start and silence_end lines."""
+        output = "\n".join([
+            "[silencedetect @ 0x1] silence_start: -0.01",
+            "[silencedetect @ 0x1] silence_end: 1.5 | silence_duration: 1.51",
+            "size=N/A time=00:00:10.00 bitrate=N/A speed= 500x",
+            "[silencedetect @ 0x1] silence_start: 42.25",
+            "[silencedetect @ 0x1] silence_end: 43 | silence_duration: 0.75",
+            "[silencedetect @ 0x1] silence_start: 99.5",
+        ])
+        
+        assert parse_silences(output) == [(0.0, 1.5), (42.25, 43.0)]
+
+
+class TestPreprocessFilter:
+    """Test cases for the preprocessing filter chain."""
+    
+    def test_disabled_returns_none(self):
+        """Test that no filter is built when nothing would change."""
+        assert build_preprocess_filter(False, 1.0) is None
+    
+    def test_trim_and_tempo_chained(self):
+        """Test that silence trimming runs before the tempo change."""
+        audio_filter = build_preprocess_filter(True, 1.5)
+        
+        assert audio_filter.startswith('silenceremove=')
+        assert audio_filter.endswith(',atempo=1.5')
+    
+    def test_large_tempo_split_into_supported_steps(self):
+        """Test that tempo factors above 2.0 are chained."""
+        assert build_preprocess_filter(False, 3.0) == 'atempo=2.0,atempo=1.5'
+
+
+class TestStitchTranscripts:
+    """Test cases for transcript stitching."""
+    
+    def test_overlap_removed(self):
+        """Test that words repeated at a segment boundary appear once."""
+        parts = [
+            "The quick brown fox jumps over",
+            "jumps over the lazy dog.",
+        ]
+        
+        assert stitch_transcripts(parts) == "The quick brown fox jumps over the lazy dog."
+    
+    def test_overlap_tolerates_case_punctuation_and_garbled_edges(self):
+        """Test matching that ignores punctuation and skips cut-off words."""
+        parts = [
+            "we measured the latency of each request, and the resul-",
+            "uh of each request and the results were clear.",
+        ]
+        
+        assert stitch_transcripts(parts) == (
+            "we measured the latency of each request, and the results were clear."
+        )
+    
+    def test_no_overlap_concatenates(self):
+        """Test that parts without shared words are simply joined."""
+        assert stitch_transcripts(["first part.", "Second part.", ""]) == "first part. Second part."
+
+
+@pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg is not installed")
+class TestFfmpegAnalysis:
+    """Test cases that run the real ffmpeg binaries."""
+    
+    def test_probe_and_detect_silences(self, tmp_path):
+        """Test duration probing and silence detection on generated audio."""
+        path = tmp_path / "tone.opus"
+        subprocess.run([
+            'ffmpeg', '-v', 'error', '-f', 'lavfi', '-i', 'sine=frequency=440:duration=2',
+            '-f', 'lavfi', '-i', 'anullsrc=r=48000:cl=mono', '-filter_complex',
+            '[1]atrim=duration=2[silence];[0][silence][0]concat=n=3:v=0:a=1', '-c:a', 'libopus', str(path)
+        ], check=True)
+        
+        assert probe_duration(path) == pytest.approx(6, abs=0.2)
+        silences = detect_silences(path)
+        assert len(silences) == 1
+        assert silences[0][0] == pytest.approx(2, abs=0.2)
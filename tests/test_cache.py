@@ -0,0 +1,151 @@
+"""
+Tests for the TTL + LRU cache
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from src.core.cache import TTLCache, FRESH, STALE
+
+
+class FakeClock:
+    """Controllable replacement for time.monotonic."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Test cases for TTLCache."""
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.patcher = patch('src.core.cache.time.monotonic', self.clock)
+        self.patcher.start()
+
+    def teardown_method(self):
+        self.patcher.stop()
+
+    def test_fresh_hit_and_miss_counters(self):
+        """Test that lookups are counted as hits or misses."""
+        cache = TTLCache(max_entries=10, ttl=60)
+
+        assert cache.get('a') is None
+        cache.set('a', 1)
+        assert cache.get('a') == 1
+
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
+
+    def test_entry_expires_after_ttl(self):
+        """Test that entries disappear once the TTL has passed."""
+        cache = TTLCache(max_entries=10, ttl=60)
+        cache.set('a', 1)
+
+        self.clock.now += 61
+
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+    def test_stale_window(self):
+        """Test that entries are served as stale between TTL and TTL + stale_ttl."""
+        cache = TTLCache(max_entries=10, ttl=60, stale_ttl=30)
+        cache.set('a', 1)
+
+        self.clock.now += 70
+        assert cache.get_with_state('a') == (1, STALE)
+        # get() only returns fresh values
+        assert cache.get('a') is None
+
+        self.clock.now += 30
+        assert cache.get_with_state('a') == (None, None)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = TTLCache(max_entries=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+
+        # Touch 'a' so 'b' becomes least recently used
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+        assert cache.stats()['evictions'] == 1
+
+    def test_byte_bound_eviction(self):
+        """Test eviction driven by the total size of the values."""
+        cache = TTLCache(max_entries=100, ttl=60, max_bytes=10, sizeof=len)
+        cache.set('a', 'x' * 4)
+        cache.set('b', 'x' * 4)
+        cache.set('c', 'x' * 4)
+
+        assert 'a' not in cache
+        assert cache.stats()['bytes'] == 8
+
+        # Values larger than the whole budget are never stored
+        cache.set('huge', 'x' * 11)
+        assert 'huge' not in cache
+        assert 'b' in cache
+
+    @pytest.mark.asyncio
+    async def test_get_or_load_miss_then_hit(self):
+        """Test that the loader runs only on a miss."""
+        cache = TTLCache(max_entries=10, ttl=60)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return 'value'
+
+        assert await cache.get_or_load('k', loader) == 'value'
+        assert await cache.get_or_load('k', loader) == 'value'
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self):
+        """Test that stale values are returned while a single refresh runs."""
+        cache = TTLCache(max_entries=10, ttl=60, stale_ttl=60)
+        cache.set('k', 'old')
+        self.clock.now += 90
+
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return 'new'
+
+        assert await cache.get_or_load('k', loader) == 'old'
+        assert await cache.get_or_load('k', loader) == 'old'
+
+        # Let the background refresh finish
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert len(calls) == 1
+        assert cache.get_with_state('k') == ('new', FRESH)
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_value(self):
+        """Test that a failing background refresh leaves the stale entry in place."""
+        cache = TTLCache(max_entries=10, ttl=60, stale_ttl=60)
+        cache.set('k', 'old')
+        self.clock.now += 90
+
+        async def loader():
+            raise RuntimeError("upstream down")
+
+        assert await cache.get_or_load('k', loader) == 'old'
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert cache.get_with_state('k') == ('old', STALE)
@@ -0,0 +1,105 @@
+"""
+Tests for caption track selection and parsing
+"""
+
+import json
+
+from src.core.captions import parse_json3, parse_vtt, select_caption_track
+
+
+def _track(*exts):
+    return [{'ext': ext, 'url': f'https://captions.test/track.{ext}'} for ext in exts]
+
+
+class TestSelectCaptionTrack:
+    """Test cases for caption track selection."""
+    
+    def test_manual_preferred_language_wins(self):
+        """Test that a manual track in a wanted language is chosen first."""
+        info = {
+            'language': 'de',
+            'subtitles': {'de': _track('vtt'), 'en-GB': _track('srv3', 'vtt', 'json3')},
+            'automatic_captions': {'en-orig': _track('json3')},
+        }
+        
+        lang, kind, entry = select_caption_track(info, ['en'])
+        
+        assert (lang, kind, entry['ext']) == ('en-GB', 'manual', 'json3')
+    
+    def test_manual_original_language_before_automatic(self):
+        """Test that any manual track beats automatic captions."""
+        info = {
+            'language': 'fr',
+            'subtitles': {'fr': _track('vtt'), 'live_chat': _track('json')},
+            'automatic_captions': {'fr-orig': _track('json3')},
+        }
+        
+        assert select_caption_track(info, ['en'])[:2] == ('fr', 'manual')
+    
+    def test_manual_track_in_other_language_ignored(self):
+        """Test that a manual translation loses to original-language automatic captions."""
+        info = {
+            'language': 'ja',
+            'subtitles': {'pt-BR': _track('vtt')},
+            'automatic_captions': {'ja-orig': _track('json3'), 'pt-BR': _track('json3')},
+        }
+        
+        assert select_caption_track(info, ['en'])[:2] == ('ja-orig', 'automatic')
+        assert select_caption_track(info, ['en'], allow_automatic=False) is None
+    
+    def test_automatic_original_language_only(self):
+        """Test that automatic captions are not taken as translations."""
+        info = {
+            'language': 'es',
+            'subtitles': {},
+            'automatic_captions': {'en': _track('vtt'), 'es-orig': _track('vtt'), 'es': _track('vtt')},
+        }
+        
+        assert select_caption_track(info, ['en'])[:2] == ('es-orig', 'automatic')
+        assert select_caption_track(info, ['en'], allow_automatic=False) is None
+    
+    def test_no_usable_track(self):
+        """Test that tracks in unsupported formats or chat replays are ignored."""
+        info = {
+            'subtitles': {'live_chat': _track('json3'), 'en': _track('srv3')},
+            'automatic_captions': {'de': _track('vtt')},
+        }
+        
+        assert select_caption_track(info, ['en']) is None
+
+
+class TestParseCaptions:
+    """Test cases for caption parsing."""
+    
+    def test_parse_json3(self):
+        """Test text extraction from json3 events."""
+        data = json.dumps({'events': [
+            {'tStartMs': 0, 'dDurationMs': 1000},
+            {'tStartMs': 0, 'segs': [{'utf8': 'Hello'}, {'utf8': ' world'}]},
+            {'tStartMs': 1000, 'segs': [{'utf8': '\n'}]},
+            {'tStartMs': 2000, 'segs': [{'utf8': 'second  line'}]},
+        ]})
+        
+        assert parse_json3(data) == "Hello world second line"
+    
+    def test_parse_vtt_with_rolling_automatic_cues(self):
+        """Test that timings, tags and repeated rolling lines are removed."""
+        data = "\n".join([
+            "WEBVTT",
+            "Kind: captions",
+            "Language: en",
+            "",
+            "NOTE generated",
+            "still a note",
+            "",
+            "1",
+            "00:00:00.000 --> 00:00:02.000 align:start position:0%",
+            "we<00:00:00.500><c> measured</c><00:00:01.000><c> latency</c>",
+            "",
+            "00:00:02.000 --> 00:00:04.000 align:start position:0%",
+            "we measured latency",
+            "and throughput &amp; errors",
+            "",
+        ])
+        
+        assert parse_vtt(data) == "we measured latency and throughput & errors"
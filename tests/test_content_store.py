@@ -0,0 +1,176 @@
+"""
+Tests for the persistent content store
+"""
+
+import httpx
+import pytest
+from unittest.mock import patch
+
+from src.core.content_store import ContentStore, CHECKPOINT_CHARS
+from src.core.config import SearchConfig
+from src.core.web_fetcher import WebContentFetcher
+
+
+class TestContentStore:
+    """Test cases for ContentStore."""
+    
+    @pytest.fixture(autouse=True)
+    def store(self, tmp_path):
+        self.root = tmp_path / "store"
+        self.store = ContentStore(str(self.root), max_bytes=1024 * 1024)
+        yield
+        self.store.close()
+    
+    def test_put_and_get_roundtrip(self):
+        """Test that stored documents keep their text and validators."""
+        self.store.put("https://example.com", "hello world", body=b"<p>hello world</p>", etag='"v1"')
+        
+        stored = self.store.get("https://example.com")
+        assert stored.text_length == len("hello world")
+        assert stored.etag == '"v1"'
+        assert self.store.read_slice(stored, 0, stored.text_length) == "hello world"
+        assert self.store.read_body(stored) == b"<p>hello world</p>"
+    
+    def test_read_slice_across_checkpoints(self):
+        """Test slicing multi-byte text at arbitrary character offsets."""
+        text = ("abcé中\U0001F600" * 5000)[:CHECKPOINT_CHARS * 3 + 17]
+        stored = self.store.put("https://example.com/unicode", text)
+        
+        for start, end in [(0, 10), (CHECKPOINT_CHARS - 3, CHECKPOINT_CHARS + 5),
+                           (CHECKPOINT_CHARS * 2, CHECKPOINT_CHARS * 3 + 17), (5000, 10**9)]:
+            assert self.store.read_slice(stored, start, end) == text[start:end]
+    
+    def test_survives_reopen(self):
+        """Test that documents are still available after reopening the store."""
+        self.store.put("https://example.com", "persisted text")
+        self.store.close()
+        
+        self.store = ContentStore(str(self.root), max_bytes=1024 * 1024)
+        stored = self.store.get("https://example.com")
+        assert self.store.read_slice(stored, 0, 100) == "persisted text"
+    
+    def test_lru_eviction_by_size(self):
+        """Test that the least recently used document is evicted past the size cap."""
+        self.store.max_bytes = 250
+        self.store.put("https://example.com/a", "a" * 100)
+        self.store.put("https://example.com/b", "b" * 100)
+        self.store.touch("https://example.com/a")
+        self.store.put("https://example.com/c", "c" * 100)
+        
+        assert self.store.get("https://example.com/a") is not None
+        assert self.store.get("https://example.com/b") is None
+        assert self.store.get("https://example.com/c") is not None
+        assert self.store.total_bytes() <= 250
+    
+    def test_shared_objects_are_reference_counted(self):
+        """Test that identical content stored under two URLs survives deleting one."""
+        self.store.put("https://example.com/a", "same text")
+        self.store.put("https://example.com/b", "same text")
+        
+        self.store.delete("https://example.com/a")
+        stored = self.store.get("https://example.com/b")
+        assert self.store.read_slice(stored, 0, 100) == "same text"
+    
+    def test_oversized_document_not_stored(self):
+        """Test that a document larger than the whole store is skipped."""
+        self.store.max_bytes = 10
+        assert self.store.put("https://example.com", "x" * 100) is None
+        assert self.store.get("https://example.com") is None
+
+
+class TestFetcherRevalidation:
+    """Test cases for conditional revalidation through the content store."""
+    
+    @pytest.fixture(autouse=True)
+    def fetcher(self, tmp_path):
+        self.store = ContentStore(str(tmp_path / "store"), max_bytes=1024 * 1024)
+        with patch.object(SearchConfig, 'DOCUMENT_CACHE_TTL', 0):
+            self.fetcher = WebContentFetcher(content_store=self.store)
+        self.requests = []
+        yield
+        self.store.close()
+    
+    def _mock_origin(self, handler):
+        """Route the fetcher's HTTP traffic to a mock transport."""
+        real_client = httpx.AsyncClient
+        
+        def handle(request):
+            self.requests.append(request)
+            return handler(request)
+        
+        return patch(
+            'src.core.web_fetcher.httpx.AsyncClient',
+            lambda **kwargs: real_client(transport=httpx.MockTransport(handle))
+        )
+    
+    @pytest.mark.asyncio
+    async def test_not_modified_reuses_stored_extraction(self):
+        """Test that a 304 answer serves the stored text without re-parsing."""
+        def handler(request):
+            if request.headers.get('if-none-match') == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200,
+                html="<html><body><p>Stored page</p></body></html>",
+                headers={'ETag': '"v1"', 'Last-Modified': 'Wed, 01 Jan 2025 00:00:00 GMT'}
+            )
+        
+        with self._mock_origin(handler):
+            first, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/page")
+            
+            # Age the stored copy past its freshness window
+            with patch.object(SearchConfig, 'CONTENT_STORE_FRESH_TTL', 0):
+                with patch.object(self.fetcher, '_parse_html_content') as mock_parse:
+                    second, _, _, total = await self.fetcher.fetch_and_parse("https://example.com/page")
+        
+        assert first == second == "Stored page"
+        assert total == len("Stored page")
+        mock_parse.assert_not_called()
+        assert self.requests[1].headers['if-none-match'] == '"v1"'
+        assert self.requests[1].headers['if-modified-since'] == 'Wed, 01 Jan 2025 00:00:00 GMT'
+    
+    @pytest.mark.asyncio
+    async def test_capped_page_reported_and_not_stored(self):
+        """Test that a body cut off at the byte cap is reported as truncated and not persisted."""
+        async def endless_body():
+            while True:
+                yield b'<p>word</p>' * 100
+        
+        handler = lambda request: httpx.Response(200, headers={'content-type': 'text/html'}, content=endless_body())
+        
+        with self._mock_origin(handler), patch.object(SearchConfig, 'MAX_FETCH_BYTES', 10000):
+            content, is_truncated, next_offset, total_length = await self.fetcher.fetch_and_parse(
+                "https://example.com/stream"
+            )
+        
+        assert content.startswith("word")
+        assert is_truncated is True
+        assert next_offset == total_length
+        assert self.store.get("https://example.com/stream") is None
+    
+    @pytest.mark.asyncio
+    async def test_fresh_store_entry_skips_network(self):
+        """Test that a fresh stored document is served without contacting the origin."""
+        handler = lambda request: httpx.Response(200, html="<p>Cached</p>")
+        
+        with self._mock_origin(handler):
+            await self.fetcher.fetch_and_parse("https://example.com/page")
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/page")
+        
+        assert content == "Cached"
+        assert len(self.requests) == 1
+    
+    @pytest.mark.asyncio
+    async def test_changed_document_replaces_stored_copy(self):
+        """Test that a 200 on revalidation stores the new version."""
+        bodies = iter(["<p>Old</p>", "<p>New</p>"])
+        handler = lambda request: httpx.Response(200, html=next(bodies), headers={'ETag': '"x"'})
+        
+        with self._mock_origin(handler):
+            await self.fetcher.fetch_and_parse("https://example.com/page")
+            with patch.object(SearchConfig, 'CONTENT_STORE_FRESH_TTL', 0):
+                content, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/page")
+        
+        assert content == "New"
+        stored = self.store.get("https://example.com/page")
+        assert self.store.read_slice(stored, 0, 100) == "New"
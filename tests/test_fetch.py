@@ -4,8 +4,49 @@ Tests for web content fetching functionality
 
 import pytest
 import asyncio
-from src.core.web_fetcher import WebContentFetcher
-from src.core.config import SearchException
+import threading
+import time
+import httpx
+from unittest.mock import patch, AsyncMock
+from src.core.web_fetcher import PDF_OFFSETS_PER_PAGE, WebContentFetcher
+from src.core.config import SearchConfig, SearchException
+from src.core.models import FetchedDocument
+from src.core.pdf_extractor import PdfNotLoaded, extract_pages, pdf_available
+
+
+def make_pdf(page_texts):
+    """Build a minimal PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(page_texts)} >>"
+    
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref_at = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode()
+    return pdf
+
+
+def mock_http(handler):
+    """Route the fetcher's HTTP traffic to a mock transport serving handler."""
+    real_client = httpx.AsyncClient
+    return patch(
+        'src.core.web_fetcher.httpx.AsyncClient',
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler))
+    )
 
 
 class TestWebContentFetcher:
@@ -150,3 +191,699 @@ class TestWebContentFetcher:
         
         # Content length should match total length
         assert len(content) == total_length
+
+
+class TestDocumentCache:
+    """Test cases for the parsed document cache."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.fetcher = WebContentFetcher()
+    
+    @pytest.mark.asyncio
+    async def test_pagination_reuses_parsed_document(self):
+        """Test that later offsets are sliced from the cached document."""
+        document = "x" * (SearchConfig.MAX_CONTENT_LENGTH * 2 + 500)
+        
+        with patch.object(self.fetcher, '_fetch_document', AsyncMock(return_value=FetchedDocument(text=document))) as mock_fetch:
+            content1, truncated1, next1, total1 = await self.fetcher.fetch_and_parse("https://example.com/long")
+            content2, truncated2, next2, total2 = await self.fetcher.fetch_and_parse("https://example.com/long", offset=next1)
+            content3, truncated3, next3, total3 = await self.fetcher.fetch_and_parse("https://example.com/long", offset=next2)
+        
+        mock_fetch.assert_awaited_once_with("https://example.com/long", None)
+        assert truncated1 and truncated2 and not truncated3
+        assert len(content3) == 500
+        assert total1 == total2 == total3 == len(document)
+        assert self.fetcher.cache_stats()['hits'] == 2
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_download(self):
+        """Test that concurrent fetches of one URL are coalesced."""
+        async def slow_fetch(url, stored=None):
+            await asyncio.sleep(0.01)
+            return FetchedDocument(text="shared page")
+        
+        with patch.object(self.fetcher, '_fetch_document', AsyncMock(side_effect=slow_fetch)) as mock_fetch:
+            results = await asyncio.gather(*[
+                self.fetcher.fetch_and_parse("https://example.com/popular", offset=offset)
+                for offset in (0, 0, 3, 5)
+            ])
+        
+        mock_fetch.assert_awaited_once()
+        assert [content for content, _, _, _ in results] == ["shared page", "shared page", "red page", "d page"]
+    
+    @pytest.mark.asyncio
+    async def test_cache_keyed_by_url(self):
+        """Test that different URLs are fetched separately."""
+        with patch.object(self.fetcher, '_fetch_document', AsyncMock(side_effect=[FetchedDocument(text="page a"), FetchedDocument(text="page b")])) as mock_fetch:
+            content_a, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/a")
+            content_b, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/b")
+        
+        assert content_a == "page a"
+        assert content_b == "page b"
+        assert mock_fetch.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        """Test that a failed fetch is retried on the next call."""
+        side_effects = [SearchException("boom"), FetchedDocument(text="recovered")]
+        
+        with patch.object(self.fetcher, '_fetch_document', AsyncMock(side_effect=side_effects)):
+            with pytest.raises(SearchException):
+                await self.fetcher.fetch_and_parse("https://example.com/flaky")
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/flaky")
+        
+        assert content == "recovered"
+    
+    @pytest.mark.asyncio
+    async def test_cache_disabled(self):
+        """Test that every call fetches when no cache is configured."""
+        with patch.object(SearchConfig, 'DOCUMENT_CACHE_TTL', 0):
+            fetcher = WebContentFetcher()
+        
+        assert fetcher.document_cache is None
+        with patch.object(fetcher, '_fetch_document', AsyncMock(return_value=FetchedDocument(text="text"))) as mock_fetch:
+            await fetcher.fetch_and_parse("https://example.com")
+            await fetcher.fetch_and_parse("https://example.com")
+        
+        assert mock_fetch.await_count == 2
+
+
+class TestStreamingFetch:
+    """Test cases for the streaming download path."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        with patch.object(SearchConfig, 'DOCUMENT_CACHE_TTL', 0), \
+                patch.object(SearchConfig, 'PDF_LOCAL_EXTRACTION', False):
+            self.fetcher = WebContentFetcher()
+        self.jina = AsyncMock(return_value=("reader text", False))
+    
+    @pytest.mark.asyncio
+    async def test_declared_oversized_body_rejected(self):
+        """Test that a Content-Length above the cap aborts before reading the body."""
+        handler = lambda request: httpx.Response(
+            200,
+            headers={'content-type': 'text/html', 'content-length': str(SearchConfig.MAX_FETCH_BYTES + 1)},
+            content=b'<p>never read</p>',
+        )
+        
+        with mock_http(handler), patch.object(self.fetcher, '_fetch_via_jina', self.jina):
+            with pytest.raises(SearchException, match="Content too large"):
+                await self.fetcher.fetch_and_parse("https://example.com/huge")
+        
+        self.jina.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_endless_stream_stops_at_cap(self):
+        """Test that a body without Content-Length is cut off at the byte cap."""
+        chunks_sent = []
+        
+        async def endless_body():
+            while True:
+                chunks_sent.append(1)
+                yield b'<p>word</p>' * 100
+        
+        handler = lambda request: httpx.Response(200, headers={'content-type': 'text/html'}, content=endless_body())
+        
+        with patch.object(SearchConfig, 'MAX_FETCH_BYTES', 10000), mock_http(handler):
+            content, _, _, total_length = await self.fetcher.fetch_and_parse("https://example.com/stream")
+        
+        assert content.startswith("word")
+        assert total_length <= 10000
+        assert len(chunks_sent) < 20
+    
+    @pytest.mark.asyncio
+    async def test_binary_content_type_rejected(self):
+        """Test that non-text content types are not downloaded or parsed."""
+        handler = lambda request: httpx.Response(200, headers={'content-type': 'video/mp4'}, content=b'\x00' * 1000)
+        
+        with mock_http(handler), patch.object(self.fetcher, '_fetch_via_jina', self.jina):
+            with pytest.raises(SearchException, match="Unsupported content type"):
+                await self.fetcher.fetch_and_parse("https://example.com/movie")
+        
+        self.jina.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_octet_stream_pdf_routed_to_reader(self):
+        """Test that a PDF served as octet-stream is still detected."""
+        handler = lambda request: httpx.Response(
+            200, headers={'content-type': 'application/octet-stream'}, content=b'%PDF-1.7 binary'
+        )
+        
+        with mock_http(handler), patch.object(self.fetcher, '_fetch_via_jina', self.jina):
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/download")
+        
+        assert content == "reader text"
+    
+    @pytest.mark.asyncio
+    async def test_declared_charset_used_for_decoding(self):
+        """Test that the body is decoded with the charset from Content-Type."""
+        handler = lambda request: httpx.Response(
+            200,
+            headers={'content-type': 'text/html; charset=iso-8859-1'},
+            content='<p>café</p>'.encode('iso-8859-1'),
+        )
+        
+        with mock_http(handler):
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/latin1")
+        
+        assert content == "café"
+    
+    @pytest.mark.asyncio
+    async def test_pdf_detected_from_first_bytes_is_not_downloaded(self):
+        """Test that a PDF without a PDF URL or header is routed after the first bytes."""
+        chunks_sent = []
+        
+        async def pdf_body():
+            yield b'%PDF-1.7\n' + b'x' * 1024
+            for _ in range(100):
+                chunks_sent.append(1)
+                yield b'x' * 65536
+        
+        handler = lambda request: httpx.Response(200, headers={'content-type': 'text/html'}, content=pdf_body())
+        
+        with mock_http(handler), patch.object(self.fetcher, '_fetch_via_jina', self.jina):
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/report")
+        
+        assert content == "reader text"
+        self.jina.assert_awaited_once_with("https://example.com/report")
+        assert len(chunks_sent) <= 1
+    
+    @pytest.mark.asyncio
+    async def test_pdf_header_routes_without_reading_body(self):
+        """Test that an application/pdf response is closed before any body is read."""
+        chunks_sent = []
+        
+        async def pdf_body():
+            chunks_sent.append(1)
+            yield b'%PDF-1.7'
+        
+        handler = lambda request: httpx.Response(200, headers={'content-type': 'application/pdf'}, content=pdf_body())
+        
+        with mock_http(handler), patch.object(self.fetcher, '_fetch_via_jina', self.jina):
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/paper")
+        
+        assert content == "reader text"
+        assert chunks_sent == []
+    
+    @pytest.mark.asyncio
+    async def test_mislabelled_binary_rejected(self):
+        """Test that binary magic numbers win over a text Content-Type."""
+        handler = lambda request: httpx.Response(
+            200, headers={'content-type': 'text/html'}, content=b'\x89PNG\r\n\x1a\n' + b'\x00' * 4096
+        )
+        
+        with mock_http(handler), patch.object(self.fetcher, '_fetch_via_jina', self.jina):
+            with pytest.raises(SearchException, match="Unsupported content type"):
+                await self.fetcher.fetch_and_parse("https://example.com/image")
+        
+        self.jina.assert_not_awaited()
+
+
+class TestParsingExecutors:
+    """Test cases for moving HTML parsing off the event loop."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.fetcher = WebContentFetcher()
+    
+    def teardown_method(self):
+        self.fetcher.close()
+    
+    @pytest.mark.asyncio
+    async def test_small_document_parsed_in_thread(self):
+        """Test that documents below the threshold are parsed in a worker thread."""
+        threads = []
+        
+        def record_thread(html):
+            threads.append(threading.current_thread())
+            return "parsed"
+        
+        with patch('src.core.web_fetcher.extract_text', side_effect=record_thread):
+            text = await self.fetcher._parse_html_content("<p>small</p>")
+        
+        assert text == "parsed"
+        assert threads[0] is not threading.main_thread()
+        assert self.fetcher._process_pool is None
+    
+    @pytest.mark.asyncio
+    async def test_large_document_parsed_in_process_pool(self):
+        """Test that documents above the threshold go to the process pool."""
+        html = "<p>" + "word " * 100 + "</p>"
+        
+        with patch.object(SearchConfig, 'PARSE_PROCESS_THRESHOLD', 100), \
+                patch.object(SearchConfig, 'PARSE_PROCESS_WORKERS', 1):
+            text = await self.fetcher._parse_html_content(html)
+        
+        assert text == ("word " * 100).strip()
+        assert self.fetcher._process_pool is not None
+    
+    @pytest.mark.asyncio
+    async def test_process_pool_disabled(self):
+        """Test that zero workers keeps large documents in threads."""
+        with patch.object(SearchConfig, 'PARSE_PROCESS_THRESHOLD', 1), \
+                patch.object(SearchConfig, 'PARSE_PROCESS_WORKERS', 0):
+            text = await self.fetcher._parse_html_content("<p>text</p>")
+        
+        assert text == "text"
+        assert self.fetcher._process_pool is None
+
+
+class TestFetchMany:
+    """Test cases for concurrent batch fetching."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.fetcher = WebContentFetcher()
+        self.active = {}
+        self.peak = {}
+        self.peak_total = 0
+    
+    async def _tracked_fetch(self, url, offset=0, max_chars=None):
+        """Fake fetch_and_parse that records concurrency per host and overall."""
+        host = url.split('/')[2]
+        self.active[host] = self.active.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        self.peak_total = max(self.peak_total, sum(self.active.values()))
+        await asyncio.sleep(0.01)
+        self.active[host] -= 1
+        if 'fail' in url:
+            raise SearchException("origin unavailable")
+        return f"content of {url}", False, 10, 10
+    
+    @pytest.mark.asyncio
+    async def test_results_in_request_order_with_errors(self):
+        """Test that each URL gets its own result or error, in order."""
+        urls = ["https://a.test/1", "https://b.test/fail", "https://c.test/3"]
+        
+        with patch.object(self.fetcher, 'fetch_and_parse', side_effect=self._tracked_fetch):
+            results = await self.fetcher.fetch_many(urls)
+        
+        assert results[0][0] == "content of https://a.test/1"
+        assert isinstance(results[1], SearchException)
+        assert results[2][0] == "content of https://c.test/3"
+    
+    @pytest.mark.asyncio
+    async def test_per_host_and_global_limits(self):
+        """Test that concurrency is bounded per host and overall."""
+        urls = [f"https://same.test/{i}" for i in range(6)] + [f"https://h{i}.test/" for i in range(10)]
+        
+        with patch.object(SearchConfig, 'FETCH_MANY_CONCURRENCY', 4), \
+                patch.object(SearchConfig, 'FETCH_MANY_PER_HOST', 2):
+            fetcher = WebContentFetcher()
+        
+        with patch.object(fetcher, 'fetch_and_parse', side_effect=self._tracked_fetch):
+            results = await fetcher.fetch_many(urls)
+        
+        assert len(results) == len(urls)
+        assert self.peak["same.test"] <= 2
+        assert self.peak_total <= 4
+        assert self.peak_total > 1
+        # Idle hosts do not keep a limiter
+        assert fetcher._host_semaphores == {}
+
+
+@pytest.mark.skipif(not pdf_available(), reason="pypdf is not installed")
+class TestLocalPdfExtraction:
+    """Test cases for page-wise local PDF extraction."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        with patch.object(SearchConfig, 'PDF_LOCAL_EXTRACTION', True):
+            self.fetcher = WebContentFetcher()
+        self.pdf = make_pdf([f"Text of page {number}" for number in range(1, 21)])
+        self.downloads = []
+        self.jina = AsyncMock(return_value=("reader text", False))
+    
+    def _mock_origin(self, body):
+        """Serve body as a PDF and count the downloads."""
+        def handler(request):
+            self.downloads.append(request.url)
+            return httpx.Response(200, headers={'content-type': 'application/pdf'}, content=body)
+        
+        return mock_http(handler)
+    
+    @pytest.mark.asyncio
+    async def test_pdf_extracted_locally_by_page(self):
+        """Test that PDF pages are extracted locally and paginated by page."""
+        with self._mock_origin(self.pdf), patch.object(self.fetcher, '_fetch_via_jina', self.jina), \
+                patch.object(SearchConfig, 'PARSE_PROCESS_WORKERS', 0):
+            content, is_truncated, next_offset, total_length = await self.fetcher.fetch_and_parse(
+                "https://example.com/paper.pdf", max_chars=80
+            )
+        
+        assert content == "[Page 1/20]\nText of page 1\n\n[Page 2/20]\nText of page 2"
+        assert is_truncated is True
+        assert next_offset == 2 * PDF_OFFSETS_PER_PAGE
+        assert total_length == 20 * PDF_OFFSETS_PER_PAGE
+        self.jina.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_later_page_skips_earlier_pages(self):
+        """Test that reading from a page offset extracts no earlier pages and reuses the download."""
+        calls = []
+        real_extract = extract_pages
+        
+        def tracked_extract(key, start, end, data=None):
+            calls.append((start, end))
+            return real_extract(key, start, end, data)
+        
+        with self._mock_origin(self.pdf), \
+                patch('src.core.web_fetcher.extract_pages', side_effect=tracked_extract), \
+                patch.object(SearchConfig, 'PARSE_PROCESS_WORKERS', 0), \
+                patch.object(SearchConfig, 'PDF_PAGES_PER_BATCH', 4):
+            content, _, next_offset, _ = await self.fetcher.fetch_and_parse(
+                "https://example.com/paper.pdf", offset=15 * PDF_OFFSETS_PER_PAGE, max_chars=80
+            )
+            again, _, _, _ = await self.fetcher.fetch_and_parse(
+                "https://example.com/paper.pdf", offset=15 * PDF_OFFSETS_PER_PAGE, max_chars=80
+            )
+        
+        assert content.startswith("[Page 16/20]\nText of page 16")
+        assert again == content
+        assert next_offset == 17 * PDF_OFFSETS_PER_PAGE
+        assert calls == [(15, 19)]
+        assert len(self.downloads) == 1
+    
+    @pytest.mark.asyncio
+    async def test_last_page_not_truncated(self):
+        """Test the end of a PDF and offsets past its last page."""
+        with self._mock_origin(self.pdf), patch.object(SearchConfig, 'PARSE_PROCESS_WORKERS', 0):
+            content, is_truncated, next_offset, total_length = await self.fetcher.fetch_and_parse(
+                "https://example.com/paper.pdf", offset=19 * PDF_OFFSETS_PER_PAGE
+            )
+            beyond = await self.fetcher.fetch_and_parse(
+                "https://example.com/paper.pdf", offset=40 * PDF_OFFSETS_PER_PAGE
+            )
+        
+        end = 20 * PDF_OFFSETS_PER_PAGE
+        assert content == "[Page 20/20]\nText of page 20"
+        assert (is_truncated, next_offset, total_length) == (False, end, end)
+        assert beyond == ("", False, end, end)
+    
+    @pytest.mark.asyncio
+    async def test_changed_pdf_not_mixed_with_cached_pages(self):
+        """Test that pages cached from an earlier download are not served for a changed file."""
+        url = "https://example.com/paper.pdf"
+        revised = make_pdf([f"Revised page {number}" for number in range(1, 21)])
+        
+        with patch.object(SearchConfig, 'PARSE_PROCESS_WORKERS', 0):
+            with self._mock_origin(self.pdf):
+                first, _, _, _ = await self.fetcher.fetch_and_parse(url, max_chars=80)
+            # The downloaded file expires while its extracted pages are still cached
+            self.fetcher.pdf_cache.delete(url)
+            with self._mock_origin(revised):
+                second, _, _, _ = await self.fetcher.fetch_and_parse(url, max_chars=80)
+        
+        assert first.startswith("[Page 1/20]\nText of page 1")
+        assert second.startswith("[Page 1/20]\nRevised page 1")
+    
+    @pytest.mark.asyncio
+    async def test_long_page_split_across_chunks(self):
+        """Test that a page longer than the chunk size is read in full over several chunks."""
+        long_text = " ".join(f"word{index:03d}" for index in range(60))
+        pdf = make_pdf(["Short first page", long_text, "Last page"])
+        url = "https://example.com/long-page.pdf"
+        chunks = []
+        offsets = [0]
+        
+        with self._mock_origin(pdf), patch.object(SearchConfig, 'PARSE_PROCESS_WORKERS', 0):
+            while True:
+                content, is_truncated, next_offset, _ = await self.fetcher.fetch_and_parse(
+                    url, offset=offsets[-1], max_chars=200
+                )
+                chunks.append(content)
+                if not is_truncated:
+                    break
+                offsets.append(next_offset)
+        
+        assert chunks[0] == "[Page 1/3]\nShort first page"
+        assert chunks[1].startswith("[Page 2/3]\nword000")
+        assert chunks[2].startswith("[Page 2/3, continued]\n")
+        assert all(len(chunk) <= 200 for chunk in chunks)
+        rest = "".join(chunk.split("]\n", 1)[1] for chunk in chunks[1:])
+        assert rest == long_text + "\n\n[Page 3/3]\nLast page"
+        assert offsets[1] == PDF_OFFSETS_PER_PAGE
+        assert offsets[2] > PDF_OFFSETS_PER_PAGE
+    
+    @pytest.mark.asyncio
+    async def test_pdf_sent_to_worker_only_once(self):
+        """Test that later page ranges reuse the parsed PDF instead of sending the file again."""
+        calls = []
+        real_extract = extract_pages
+        
+        def tracked_extract(key, start, end, data=None):
+            calls.append(data is not None)
+            return real_extract(key, start, end, data)
+        
+        with self._mock_origin(self.pdf), \
+                patch('src.core.web_fetcher.extract_pages', side_effect=tracked_extract), \
+                patch.object(SearchConfig, 'PARSE_PROCESS_WORKERS', 0), \
+                patch.object(SearchConfig, 'PDF_PAGES_PER_BATCH', 4):
+            for page in (0, 8, 16):
+                await self.fetcher.fetch_and_parse(
+                    "https://example.com/paper.pdf", offset=page * PDF_OFFSETS_PER_PAGE, max_chars=80
+                )
+        
+        assert calls == [False, False, False]
+    
+    def test_unloaded_pdf_needs_data(self):
+        """Test that a process without the parsed PDF asks for the file."""
+        with pytest.raises(PdfNotLoaded):
+            extract_pages('never-loaded', 0, 1)
+        
+        assert extract_pages('loaded-with-data', 0, 1, self.pdf) == ["Text of page 1"]
+        assert extract_pages('loaded-with-data', 1, 2) == ["Text of page 2"]
+    
+    @pytest.mark.asyncio
+    async def test_unreadable_pdf_falls_back_to_reader(self):
+        """Test that a PDF that cannot be parsed is sent to the Jina reader."""
+        with self._mock_origin(b'%PDF-1.7 not really a pdf'), \
+                patch.object(self.fetcher, '_fetch_via_jina', self.jina), \
+                patch.object(SearchConfig, 'PARSE_PROCESS_WORKERS', 0):
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/broken.pdf")
+        
+        assert content == "reader text"
+        self.jina.assert_awaited_once_with("https://example.com/broken.pdf")
+    
+    @pytest.mark.asyncio
+    async def test_oversized_pdf_falls_back_to_reader(self):
+        """Test that a PDF above PDF_MAX_BYTES is not parsed locally."""
+        with self._mock_origin(self.pdf), patch.object(self.fetcher, '_fetch_via_jina', self.jina), \
+                patch.object(SearchConfig, 'PDF_MAX_BYTES', 100):
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/paper.pdf")
+        
+        assert content == "reader text"
+
+
+class TestReaderCache:
+    """Test cases for caching full Jina reader output."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        with patch.object(SearchConfig, 'DOCUMENT_CACHE_TTL', 60), \
+                patch.object(SearchConfig, 'PDF_LOCAL_EXTRACTION', False):
+            self.fetcher = WebContentFetcher()
+        self.reader_calls = []
+        self.text = "".join(f"line {index:05d}\n" for index in range(10000))
+    
+    def _mock_reader(self, status=200):
+        """Serve self.text from the reader endpoint and count the calls."""
+        def handler(request):
+            self.reader_calls.append(str(request.url))
+            return httpx.Response(status, headers={'content-type': 'text/plain'}, content=self.text.encode())
+        
+        return mock_http(handler)
+    
+    @pytest.mark.asyncio
+    async def test_pagination_reads_full_output_with_one_call(self):
+        """Test that every chunk of a long reader document comes from one reader call."""
+        url = "https://example.com/long.pdf"
+        chunks = []
+        offset = 0
+        
+        with self._mock_reader():
+            while True:
+                content, is_truncated, next_offset, total_length = await self.fetcher.fetch_and_parse(url, offset)
+                chunks.append(content)
+                if not is_truncated:
+                    break
+                offset = next_offset
+        
+        assert len(chunks) == 4
+        assert "".join(chunks) == self.text
+        assert total_length == len(self.text)
+        assert self.reader_calls == [f"https://r.jina.ai/{url}"]
+    
+    @pytest.mark.asyncio
+    async def test_output_cut_at_byte_cap(self):
+        """Test that reader output is bounded by MAX_FETCH_BYTES."""
+        with self._mock_reader(), patch.object(SearchConfig, 'MAX_FETCH_BYTES', 1000):
+            text, is_truncated = await self.fetcher._fetch_via_jina("https://example.com/long.pdf")
+        
+        assert text == self.text[:1000]
+        assert is_truncated is True
+    
+    @pytest.mark.asyncio
+    async def test_cut_off_output_reported_as_truncated(self):
+        """Test that the last chunk of capped reader output is still marked truncated."""
+        url = "https://example.com/long.pdf"
+        with self._mock_reader(), patch.object(SearchConfig, 'MAX_FETCH_BYTES', 1000):
+            content, is_truncated, next_offset, total_length = await self.fetcher.fetch_and_parse(url)
+            cached = await self.fetcher.fetch_and_parse(url, 500)
+        
+        assert (content, is_truncated, next_offset, total_length) == (self.text[:1000], True, 1000, 1000)
+        assert cached == (self.text[500:1000], True, 1000, 1000)
+        assert len(self.reader_calls) == 1
+        assert self.fetcher.document_cache.stats()['entries'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_reader_errors_not_cached(self):
+        """Test that a failed reader call is retried on the next request."""
+        with self._mock_reader(status=503):
+            with pytest.raises(SearchException, match="Jina Reader"):
+                await self.fetcher.fetch_and_parse("https://example.com/long.pdf")
+        with self._mock_reader():
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://example.com/long.pdf")
+        
+        assert content == self.text[:SearchConfig.MAX_CONTENT_LENGTH]
+        assert len(self.reader_calls) == 2
+
+
+class TestHedgedFetch:
+    """Test cases for hedging slow origins with the reader."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        with patch.object(SearchConfig, 'DOCUMENT_CACHE_TTL', 0):
+            self.fetcher = WebContentFetcher()
+        self.origin_finished = []
+    
+    def _mock_origin(self, delay, body=b'<p>origin text</p>', content_type='text/html'):
+        """Serve a body after a delay and record whether the response completed."""
+        async def handler(request):
+            await asyncio.sleep(delay)
+            self.origin_finished.append(request.url)
+            return httpx.Response(200, headers={'content-type': content_type}, content=body)
+        
+        return mock_http(handler)
+    
+    @pytest.mark.asyncio
+    async def test_slow_origin_hedged_with_reader(self):
+        """Test that the reader answers for an origin that has not responded in time."""
+        jina = AsyncMock(return_value=("reader text", False))
+        
+        with self._mock_origin(delay=5), patch.object(self.fetcher, '_fetch_via_jina', jina), \
+                patch.object(SearchConfig, 'FETCH_HEDGE_DELAY', 0.05):
+            started = time.monotonic()
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://slow.example/page")
+        
+        assert content == "reader text"
+        assert time.monotonic() - started < 1
+        await asyncio.sleep(0)
+        assert self.origin_finished == []
+    
+    @pytest.mark.asyncio
+    async def test_fast_origin_not_hedged(self):
+        """Test that the reader is not called when the origin answers within the delay."""
+        jina = AsyncMock(return_value=("reader text", False))
+        
+        with self._mock_origin(delay=0), patch.object(self.fetcher, '_fetch_via_jina', jina), \
+                patch.object(SearchConfig, 'FETCH_HEDGE_DELAY', 1.0):
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://fast.example/page")
+        
+        assert content == "origin text"
+        jina.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_failed_reader_leaves_origin_to_answer(self):
+        """Test that a hedged reader failure does not fail the fetch."""
+        jina = AsyncMock(side_effect=SearchException("Failed to fetch via Jina Reader: 429"))
+        
+        with self._mock_origin(delay=0.2), patch.object(self.fetcher, '_fetch_via_jina', jina), \
+                patch.object(SearchConfig, 'FETCH_HEDGE_DELAY', 0.05):
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://slow.example/page")
+        
+        assert content == "origin text"
+        jina.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_total_budget_falls_back_to_reader(self):
+        """Test that a download exceeding FETCH_TIMEOUT is abandoned for the reader."""
+        jina = AsyncMock(return_value=("reader text", False))
+        
+        with self._mock_origin(delay=5), patch.object(self.fetcher, '_fetch_via_jina', jina), \
+                patch.object(SearchConfig, 'FETCH_HEDGE_DELAY', 0), \
+                patch.object(SearchConfig, 'FETCH_TIMEOUT', 0.1):
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://slow.example/page")
+        
+        assert content == "reader text"
+        jina.assert_awaited_once_with("https://slow.example/page")
+    
+    def test_direct_timeouts_split(self):
+        """Test that connect and time-to-first-byte budgets are configured separately."""
+        with patch.object(SearchConfig, 'FETCH_CONNECT_TIMEOUT', 2.0), \
+                patch.object(SearchConfig, 'FETCH_TTFB_TIMEOUT', 7.0):
+            timeout = self.fetcher._direct_timeout()
+        
+        assert timeout.connect == 2.0
+        assert timeout.read == 7.0
+    
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not pdf_available(), reason="pypdf is not installed")
+    async def test_local_pdf_not_hedged(self):
+        """Test that a slow PDF is not answered by the reader, keeping page offsets."""
+        jina = AsyncMock(return_value=("reader text", False))
+        pdf = make_pdf([f"Text of page {number}" for number in range(1, 5)])
+        with patch.object(SearchConfig, 'PDF_LOCAL_EXTRACTION', True):
+            fetcher = WebContentFetcher()
+        
+        with self._mock_origin(delay=0.2, body=pdf, content_type='application/pdf'), \
+                patch.object(fetcher, '_fetch_via_jina', jina), \
+                patch.object(SearchConfig, 'FETCH_HEDGE_DELAY', 0.05), \
+                patch.object(SearchConfig, 'PARSE_PROCESS_WORKERS', 0):
+            content, _, _, total_length = await fetcher.fetch_and_parse("https://slow.example/paper.pdf")
+        
+        assert content.startswith("[Page 1/4]")
+        assert total_length == 4 * PDF_OFFSETS_PER_PAGE
+        jina.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not pdf_available(), reason="pypdf is not installed")
+    async def test_hedge_dropped_when_origin_serves_pdf(self):
+        """Test that a PDF behind a non-PDF URL is not answered by a hedged reader."""
+        pdf = make_pdf([f"Text of page {number}" for number in range(1, 5)])
+        reader_cancelled = []
+        
+        async def slow_reader(url):
+            try:
+                await asyncio.sleep(0.15)
+            except asyncio.CancelledError:
+                reader_cancelled.append(url)
+                raise
+            return ("reader text", False)
+        
+        async def slow_body():
+            # The reader would win if it were allowed to, while the PDF body is still downloading
+            yield pdf[:100]
+            await asyncio.sleep(0.2)
+            yield pdf[100:]
+        
+        async def handler(request):
+            await asyncio.sleep(0.1)
+            return httpx.Response(200, headers={'content-type': 'application/pdf'}, content=slow_body())
+        
+        with patch.object(SearchConfig, 'PDF_LOCAL_EXTRACTION', True):
+            fetcher = WebContentFetcher()
+        
+        with mock_http(handler), patch.object(fetcher, '_fetch_via_jina', side_effect=slow_reader), \
+                patch.object(SearchConfig, 'FETCH_HEDGE_DELAY', 0.05), \
+                patch.object(SearchConfig, 'PARSE_PROCESS_WORKERS', 0):
+            started = time.monotonic()
+            content, _, _, total_length = await fetcher.fetch_and_parse("https://slow.example/download?id=7")
+        
+        assert content.startswith("[Page 1/4]")
+        assert total_length == 4 * PDF_OFFSETS_PER_PAGE
+        assert reader_cancelled == ["https://slow.example/download?id=7"]
+        assert time.monotonic() - started < 1
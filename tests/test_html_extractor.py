@@ -0,0 +1,57 @@
+"""
+Tests for HTML text extraction
+"""
+
+import pytest
+
+from src.core.html_extractor import extract_text, extract_text_bs4
+
+
+PARITY_CASES = [
+    "<p>a</p><p>b</p>",
+    "<p>a</p>\n<p>b</p>",
+    "<div>x<script>var a = 1;</script>y</div>",
+    "<div>x <nav>menu</nav> y</div>",
+    "<html><head><title>T</title><style>b{}</style></head><body><header>H</header>"
+    "Hello&nbsp;world<!-- comment -->!<footer>F</footer>tail</body></html>",
+    "<p>café <b>bo</b>ld</p>",
+    "<?xml version='1.0' encoding='iso-8859-1'?><html><body>x</body></html>",
+    "<meta charset='iso-8859-1'><p>café</p>",
+    "<ruby>漢<rt>kan</rt>字<rp>(</rp></ruby>",
+    "<template><p>tpl</p></template>after",
+    "plain text only",
+    "<table><tr><td>a</td><td>b</td></tr></table>",
+    "<p>line1<br>line2</p>",
+    "<pre>  code\n   more </pre>",
+    "<div>a<aside>b</aside>c<menu><li>m</li></menu>d</div>",
+    "<div>unclosed <p>tags <b>everywhere",
+]
+
+
+class TestExtractText:
+    """Test cases for the single-pass extractor."""
+    
+    @pytest.mark.parametrize("html", PARITY_CASES)
+    def test_matches_original_extractor(self, html):
+        """Test that output is identical to the BeautifulSoup implementation."""
+        assert extract_text(html) == extract_text_bs4(html)
+    
+    def test_unwanted_subtrees_skipped_but_tails_kept(self):
+        """Test that skipped elements drop their content but not following text."""
+        html = "<body>before<nav><a>Home</a></nav>after <footer>legal</footer>end</body>"
+        assert extract_text(html) == "beforeafter end"
+    
+    def test_whitespace_collapsed(self):
+        """Test that all whitespace runs become single spaces."""
+        html = "<p>  lots \n\n of\t\twhitespace  </p>\n\n<p> next</p>"
+        assert extract_text(html) == "lots of whitespace next"
+    
+    def test_no_markup_left(self):
+        """Test that tags and entities do not leak into the text."""
+        text = extract_text("<div class='x'><p>a &lt;b&gt; &amp; c</p></div>")
+        assert text == "a <b> & c"
+    
+    @pytest.mark.parametrize("html", ["", "   ", "<!-- only a comment -->"])
+    def test_empty_documents(self, html):
+        """Test that documents without text produce an empty string."""
+        assert extract_text(html) == ""
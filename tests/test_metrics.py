@@ -0,0 +1,109 @@
+"""
+Tests for the Prometheus-style metrics
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from src.core.config import SearchConfig
+from src.core.metrics import MetricsRegistry, track_tool, track_upstream, TOOL_ERRORS, TOOL_REQUESTS, UPSTREAM_LATENCY
+from src.server.handlers import SearchHandlers
+
+
+class TestMetricsRegistry:
+    """Test cases for the registry and its metric types."""
+
+    def setup_method(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_and_gauge_render(self):
+        """Test labelled samples in the text format."""
+        counter = self.registry.counter('requests_total', 'Requests.', ['tool'])
+        gauge = self.registry.gauge('in_flight', 'In flight.', ['tool'])
+        counter.inc(tool='search')
+        counter.inc(2, tool='search')
+        gauge.set(1.5, tool='fetch"x')
+
+        text = self.registry.render()
+
+        assert '# TYPE requests_total counter' in text
+        assert 'requests_total{tool="search"} 3' in text
+        assert 'in_flight{tool="fetch\\"x"} 1.5' in text
+        assert text.endswith('\n')
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket, sum and count samples of a histogram."""
+        histogram = self.registry.histogram('latency_seconds', 'Latency.', buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        lines = self.registry.render().splitlines()
+
+        assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{le="1"} 2' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+        assert 'latency_seconds_sum 5.55' in lines
+        assert 'latency_seconds_count 3' in lines
+
+    def test_wrong_labels_rejected(self):
+        """Test that label names must match the declaration."""
+        counter = self.registry.counter('requests_total', 'Requests.', ['tool'])
+        with pytest.raises(ValueError):
+            counter.inc(upstream='searxng')
+
+    def test_collected_families_rendered(self):
+        """Test families passed in at scrape time."""
+        text = self.registry.render([('cache_hits_total', 'counter', 'Hits.', [({'cache': 'search'}, 4)])])
+
+        assert '# TYPE cache_hits_total counter' in text
+        assert 'cache_hits_total{cache="search"} 4' in text
+
+
+class TestTracking:
+    """Test cases for the tool and upstream tracking helpers."""
+
+    @pytest.mark.asyncio
+    async def test_track_tool_counts_errors(self):
+        """Test that failing calls count as requests and errors."""
+        @track_tool('test_failing')
+        async def failing():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await failing()
+
+        assert TOOL_REQUESTS.value(tool='test_failing') >= 1
+        assert TOOL_ERRORS.value(tool='test_failing') >= 1
+
+    @pytest.mark.asyncio
+    async def test_track_upstream_records_cancellation(self):
+        """Test that an abandoned request is labelled cancelled."""
+        async def request():
+            with track_upstream('test_upstream'):
+                await asyncio.sleep(5)
+
+        before = UPSTREAM_LATENCY.count(upstream='test_upstream', outcome='cancelled')
+        task = asyncio.create_task(request())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert UPSTREAM_LATENCY.count(upstream='test_upstream', outcome='cancelled') == before + 1
+
+    def test_handlers_collect_cache_and_backend_metrics(self):
+        """Test the scrape-time families gathered by the handlers."""
+        with patch.object(SearchConfig, 'TRANSCRIPT_CACHE_ENABLED', False):
+            handlers = SearchHandlers()
+        with patch.object(handlers.client, 'backend_stats', return_value=[{
+            'url': 'http://a.test', 'latency_ms': 120.0, 'outstanding': 1,
+            'requests': 5, 'errors': 2, 'ejected': False
+        }]):
+            families = {name: samples for name, _, _, samples in handlers.collect_metrics()}
+
+        assert ({'backend': 'http://a.test'}, 0.12) in families['webintel_searxng_latency_seconds']
+        assert ({'backend': 'http://a.test'}, 2) in families['webintel_searxng_errors_total']
+        assert ({'state': 'queued'}, 0) in families['webintel_transcription_jobs']
+        if handlers.client.cache is not None:
+            assert any(labels == {'cache': 'search'} for labels, _ in families['webintel_cache_hits_total'])
@@ -2,12 +2,14 @@
 Tests for core search functionality
 """
 
+import asyncio
+import time
 import pytest
-from unittest.mock import patch, Mock
-import requests
+from unittest.mock import patch
+import httpx
 
 from src.core.search import SearxngClient, search_general, search_videos
-from src.core.config import SearchRequestException, SearchParseException
+from src.core.config import SearchConfig, SearchRequestException, SearchParseException
 from src.core.models import RawSearxngResponse, RawResult
 
 
@@ -28,53 +30,91 @@ class TestSearxngClient:
         client = SearxngClient(custom_host)
         assert client.host == custom_host
     
-    @patch('src.core.search.requests.get')
-    def test_search_raw_success(self, mock_get):
+    @staticmethod
+    def _client_with_handler(handler):
+        """Build a client whose HTTP traffic is served by a mock transport."""
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return SearxngClient("http://searxng.test", http_client=http_client)
+    
+    @pytest.mark.asyncio
+    async def test_search_raw_success(self):
         """Test successful raw search."""
-        # Mock response
-        mock_response = Mock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {
-            'query': 'test query',
-            'number_of_results': 1,
-            'results': [{
-                'url': 'http://example.com',
-                'title': 'Test Result',
-                'engine': 'test'
-            }]
-        }
-        mock_get.return_value = mock_response
+        requests_seen = []
+        
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json={
+                'query': 'test query',
+                'number_of_results': 1,
+                'results': [{
+                    'url': 'http://example.com',
+                    'title': 'Test Result',
+                    'engine': 'test'
+                }]
+            })
+        
+        client = self._client_with_handler(handler)
         
         # Execute search
-        result = self.client._search_raw('test query')
+        result = await client._search_raw('test query', engines=['a', 'b'], categories='general')
         
         # Verify
         assert isinstance(result, RawSearxngResponse)
         assert result.query == 'test query'
         assert len(result.results) == 1
         assert result.results[0].title == 'Test Result'
+        
+        params = requests_seen[0].url.params
+        assert params['q'] == 'test query'
+        assert params['format'] == 'json'
+        assert params['engines'] == 'a,b'
+        assert params['categories'] == 'general'
     
-    @patch('src.core.search.requests.get')
-    def test_search_raw_request_failure(self, mock_get):
+    @pytest.mark.asyncio
+    async def test_search_raw_request_failure(self):
         """Test search request failure."""
-        mock_get.side_effect = requests.exceptions.RequestException("Network error")
+        def handler(request):
+            raise httpx.ConnectError("Network error", request=request)
+        
+        client = self._client_with_handler(handler)
         
         with pytest.raises(SearchRequestException):
-            self.client._search_raw('test query')
+            await client._search_raw('test query')
     
-    @patch('src.core.search.requests.get')
-    def test_search_raw_parse_failure(self, mock_get):
+    @pytest.mark.asyncio
+    async def test_search_raw_http_error(self):
+        """Test search with an error status from SearxNG."""
+        client = self._client_with_handler(lambda request: httpx.Response(503))
+        
+        with pytest.raises(SearchRequestException):
+            await client._search_raw('test query')
+    
+    @pytest.mark.asyncio
+    async def test_search_raw_parse_failure(self):
         """Test search response parsing failure."""
-        mock_response = Mock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.side_effect = ValueError("Invalid JSON")
-        mock_get.return_value = mock_response
+        client = self._client_with_handler(lambda request: httpx.Response(200, content=b'not json'))
         
         with pytest.raises(SearchParseException):
-            self.client._search_raw('test query')
+            await client._search_raw('test query')
+    
+    @pytest.mark.asyncio
+    async def test_connection_pool_reused(self):
+        """Test that consecutive searches share one pooled HTTP client."""
+        client = SearxngClient("http://searxng.test")
+        first = client._get_http_client()
+        second = client._get_http_client()
+        assert first is second
+        
+        await client.aclose()
+        assert first.is_closed
+        
+        # A closed pool is transparently replaced
+        assert client._get_http_client() is not first
+        await client.aclose()
     
+    @pytest.mark.asyncio
     @patch.object(SearxngClient, '_search_raw')
-    def test_search_general_success(self, mock_search_raw):
+    async def test_search_general_success(self, mock_search_raw):
         """Test successful general search."""
         # Mock raw response
         mock_raw_result = RawResult(
@@ -93,7 +133,7 @@ class TestSearxngClient:
         mock_search_raw.return_value = mock_response
         
         # Execute search
-        results = self.client.search_general('test query')
+        results = await self.client.search_general('test query')
         
         # Verify
         assert len(results) == 1
@@ -102,8 +142,9 @@ class TestSearxngClient:
         assert results[0].content == 'Test content'
         assert results[0].score == 0.95
     
+    @pytest.mark.asyncio
     @patch.object(SearxngClient, '_search_raw')
-    def test_search_videos_success(self, mock_search_raw):
+    async def test_search_videos_success(self, mock_search_raw):
         """Test successful video search."""
         # Mock raw response
         mock_raw_result = RawResult(
@@ -123,7 +164,7 @@ class TestSearxngClient:
         mock_search_raw.return_value = mock_response
         
         # Execute search
-        results = self.client.search_videos('test video query')
+        results = await self.client.search_videos('test video query')
         
         # Verify
         assert len(results) == 1
@@ -132,6 +173,249 @@ class TestSearxngClient:
         assert results[0].author == 'Test Author'
         assert results[0].duration == '5:30'
         assert results[0].published_date == '2024-01-01'
+    
+    @pytest.mark.asyncio
+    async def test_repeated_search_served_from_cache(self):
+        """Test that equivalent searches reuse the cached SearxNG response."""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={
+                'query': 'python',
+                'number_of_results': 1,
+                'results': [{
+                    'url': 'http://example.com',
+                    'title': 'Python',
+                    'engine': 'test',
+                    'score': 1.0
+                }]
+            })
+        
+        client = self._client_with_handler(handler)
+        
+        first = await client.search_general('Python  tutorial', max_results=5)
+        second = await client.search_general('python tutorial', max_results=5)
+        
+        assert len(calls) == 1
+        assert first == second
+        assert client.cache_stats()['hits'] == 1
+        assert client.cache_stats()['misses'] == 1
+        
+        # A different max_results is a different cache key
+        await client.search_general('python tutorial', max_results=3)
+        assert len(calls) == 2
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_searches_coalesced(self):
+        """Test that identical in-flight searches share one SearxNG request."""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={'query': 'q', 'number_of_results': 0, 'results': []})
+        
+        client = self._client_with_handler(handler)
+        client.cache = None
+        
+        await asyncio.gather(*[client.search_general('same query') for _ in range(5)])
+        
+        assert len(calls) == 1
+    
+    @pytest.mark.asyncio
+    async def test_search_batch_runs_queries_concurrently(self):
+        """Test that batch queries are in flight at the same time."""
+        in_flight = []
+        peak = []
+        
+        async def handler(request):
+            in_flight.append(request)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.05)
+            in_flight.remove(request)
+            query = request.url.params['q']
+            return httpx.Response(200, json={
+                'query': query,
+                'number_of_results': 1,
+                'results': [{'url': f'https://{query}.test', 'title': query, 'engine': 'e', 'score': 1.0}]
+            })
+        
+        client = self._client_with_handler(handler)
+        client.cache = None
+        
+        response = await client.search_batch(['a', 'b', 'c', 'A '])
+        
+        # 'A ' collapses into 'a'
+        assert max(peak) == 3
+        assert [result.url for result in response.results] == ['https://a.test', 'https://b.test', 'https://c.test']
+    
+    @pytest.mark.asyncio
+    async def test_search_batch_merges_and_tags_results(self):
+        """Test URL deduplication, rank interleaving and query tagging."""
+        results_by_query = {
+            'first': [('https://shared.test/page', 0.5), ('https://one.test', 0.9)],
+            'second': [('https://two.test', 0.8), ('https://SHARED.test/page/#intro', 0.7)],
+        }
+        
+        def handler(request):
+            query = request.url.params['q']
+            return httpx.Response(200, json={
+                'query': query,
+                'number_of_results': 2,
+                'results': [
+                    {'url': url, 'title': url, 'engine': 'e', 'score': score}
+                    for url, score in results_by_query[query]
+                ]
+            })
+        
+        client = self._client_with_handler(handler)
+        client.cache = None
+        
+        response = await client.search_batch(['first', 'second'])
+        
+        assert [result.url for result in response.results] == [
+            'https://shared.test/page', 'https://two.test', 'https://one.test'
+        ]
+        shared = response.results[0]
+        assert shared.queries == ['first', 'second']
+        assert shared.score == 0.7
+        assert response.results[1].queries == ['second']
+        assert response.failed_queries == {}
+    
+    @pytest.mark.asyncio
+    async def test_search_batch_partial_and_total_failure(self):
+        """Test that failing queries are reported unless all of them fail."""
+        def handler(request):
+            query = request.url.params['q']
+            if query.startswith('bad'):
+                return httpx.Response(500)
+            return httpx.Response(200, json={'query': query, 'number_of_results': 0, 'results': []})
+        
+        client = self._client_with_handler(handler)
+        client.cache = None
+        
+        response = await client.search_batch(['good', 'bad'])
+        assert list(response.failed_queries) == ['bad']
+        
+        with pytest.raises(SearchRequestException):
+            await client.search_batch(['bad one', 'bad two'])
+
+
+class TestBackendPoolSearch:
+    """Test cases for searching across several SearxNG backends."""
+    
+    def setup_method(self):
+        self.calls = []
+    
+    def _client(self, handler, hosts="http://a.test,http://b.test"):
+        """Build an uncached multi-backend client served by a mock transport."""
+        async def record(request):
+            self.calls.append(request.url.host)
+            response = handler(request)
+            return await response if asyncio.iscoroutine(response) else response
+        
+        with patch.object(SearchConfig, 'SEARXNG_HEALTH_INTERVAL', 0):
+            client = SearxngClient(hosts, http_client=httpx.AsyncClient(transport=httpx.MockTransport(record)))
+        client.cache = None
+        return client
+    
+    @staticmethod
+    def _results(host):
+        return httpx.Response(200, json={
+            'query': 'q',
+            'number_of_results': 1,
+            'results': [{'url': f'http://{host}/result', 'title': host, 'engine': 'test', 'score': 1.0}],
+        })
+    
+    def test_comma_separated_hosts(self):
+        """Test that a host list creates one backend per host."""
+        client = SearxngClient("http://a.test, http://b.test")
+        
+        assert [backend.url for backend in client.pool.backends] == ["http://a.test", "http://b.test"]
+        assert client.host == "http://a.test"
+    
+    @pytest.mark.asyncio
+    async def test_failed_backend_fails_over(self):
+        """Test that a search failing on one backend is retried on another."""
+        def handler(request):
+            if request.url.host == 'a.test':
+                return httpx.Response(502)
+            return self._results(request.url.host)
+        
+        client = self._client(handler)
+        results = await client.search_general('q')
+        
+        assert results[0].title == 'b.test'
+        assert self.calls == ['a.test', 'b.test']
+        assert client.pool.backends[0].failures == 1
+    
+    @pytest.mark.asyncio
+    async def test_ejected_backend_skipped(self):
+        """Test that repeated failures take a backend out of rotation."""
+        def handler(request):
+            if request.url.host == 'a.test':
+                raise httpx.ConnectError("refused", request=request)
+            return self._results(request.url.host)
+        
+        client = self._client(handler)
+        for _ in range(SearchConfig.SEARXNG_FAILURE_THRESHOLD):
+            await client.search_general('q')
+        self.calls.clear()
+        await client.search_general('q')
+        
+        assert self.calls == ['b.test']
+        assert client.backend_stats()[0]['ejected'] is True
+    
+    @pytest.mark.asyncio
+    async def test_all_backends_failing_raises(self):
+        """Test that the error is reported when every attempt fails."""
+        client = self._client(lambda request: httpx.Response(503))
+        
+        with pytest.raises(SearchRequestException):
+            await client.search_general('q')
+        assert len(self.calls) == 2
+    
+    @pytest.mark.asyncio
+    async def test_slow_backend_hedged(self):
+        """Test that a second backend answers when the first is slow."""
+        async def slow(request):
+            await asyncio.sleep(5)
+            return self._results(request.url.host)
+        
+        def handler(request):
+            return slow(request) if request.url.host == 'a.test' else self._results(request.url.host)
+        
+        client = self._client(handler)
+        with patch.object(SearchConfig, 'SEARXNG_HEDGE_DELAY', 0.05):
+            started = time.monotonic()
+            results = await client.search_general('q')
+        
+        assert results[0].title == 'b.test'
+        assert time.monotonic() - started < 1
+        assert client.pool.backends[0].outstanding == 0
+        assert client.pool.backends[0].latency >= 0.05
+    
+    @pytest.mark.asyncio
+    async def test_hedging_stops_without_spare_backend(self):
+        """Test that a slow search is not polled again once no backend can be hedged to."""
+        async def slow(request):
+            await asyncio.sleep(0.3)
+            return self._results(request.url.host)
+        
+        client = self._client(slow)
+        real_select = client.pool.select
+        selections = []
+        
+        def select(exclude=()):
+            selections.append(len(exclude))
+            return real_select(exclude) if not exclude else None
+        
+        with patch.object(client.pool, 'select', side_effect=select), \
+                patch.object(SearchConfig, 'SEARXNG_HEDGE_DELAY', 0.02):
+            results = await client.search_general('q')
+        
+        assert results[0].title == 'a.test'
+        assert selections == [0, 1]
 
 
 class TestConvenienceFunctions:
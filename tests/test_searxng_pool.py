@@ -0,0 +1,147 @@
+"""
+Tests for the SearxNG backend pool
+"""
+
+import asyncio
+import time
+import httpx
+import pytest
+
+from src.core.searxng_pool import SearxngBackendPool, parse_hosts
+
+
+class TestSearxngBackendPool:
+    """Test cases for SearxngBackendPool."""
+
+    def setup_method(self):
+        self.pool = SearxngBackendPool(
+            ["http://a.test", "http://b.test", "http://c.test"],
+            failure_threshold=2,
+            eject_seconds=30,
+        )
+        self.a, self.b, self.c = self.pool.backends
+
+    def test_parse_hosts(self):
+        """Test splitting and deduplicating a host list."""
+        assert parse_hosts(" http://a.test/, http://b.test,,http://a.test") == ["http://a.test", "http://b.test"]
+        assert parse_hosts(["http://a.test"]) == ["http://a.test"]
+
+    def test_untried_backends_preferred_then_lowest_latency(self):
+        """Test that selection favours unmeasured, then fastest backends."""
+        self.a.record_success(0.5)
+        self.b.record_success(0.1)
+        assert self.pool.select() is self.c
+
+        self.c.record_success(0.3)
+        assert self.pool.select() is self.b
+
+    def test_outstanding_requests_weigh_on_latency(self):
+        """Test that a busy fast backend loses to an idle slower one."""
+        self.a.record_success(0.1)
+        self.b.record_success(0.15)
+        self.c.record_success(1.0)
+        self.a.outstanding = 3
+
+        assert self.pool.select() is self.b
+
+    def test_ewma_smooths_latency(self):
+        """Test that one slow sample moves the average only partly."""
+        self.a.record_success(0.1)
+        self.a.record_success(1.1)
+
+        assert self.a.latency == pytest.approx(0.4)
+
+    def test_failing_backend_ejected_then_half_open(self):
+        """Test ejection at the threshold and a single trial after the ejection period."""
+        self.a.record_failure()
+        assert self.pool.select(exclude=[self.b, self.c]) is self.a
+        self.a.record_failure()
+
+        assert self.a.ejected
+        assert not self.a.available(time.monotonic())
+        assert self.pool.select(exclude=[self.b]) is self.c
+
+        self.a.ejected_until = time.monotonic() - 1
+        assert self.a.available(time.monotonic())
+        self.a.outstanding = 1
+        assert not self.a.available(time.monotonic())
+
+        self.a.outstanding = 0
+        self.a.record_success(0.2)
+        assert not self.a.ejected
+
+    def test_all_ejected_uses_soonest_readmitted(self):
+        """Test that a fully ejected pool still returns a backend."""
+        for backend in self.pool.backends:
+            backend.record_failure()
+            backend.record_failure()
+        self.b.ejected_until = time.monotonic() + 1
+
+        assert self.pool.select() is self.b
+
+    @pytest.mark.asyncio
+    async def test_request_records_outcome(self):
+        """Test that requests update latency, counters and failures."""
+        def handler(request):
+            return httpx.Response(503 if request.url.host == 'a.test' else 200, json={})
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with pytest.raises(httpx.HTTPStatusError):
+                await self.pool.request(self.a, client, '/search')
+            await self.pool.request(self.b, client, '/search')
+
+        assert (self.a.failures, self.a.errors, self.a.outstanding) == (1, 1, 0)
+        assert self.b.latency is not None and self.b.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_counts_elapsed_time(self):
+        """Test that a cancelled slow request still raises the backend's latency."""
+        async def handler(request):
+            await asyncio.sleep(5)
+            return httpx.Response(200)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            task = asyncio.create_task(self.pool.request(self.a, client, '/search'))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        assert self.a.latency >= 0.05
+        assert self.a.failures == 0
+        assert self.a.outstanding == 0
+
+    @pytest.mark.asyncio
+    async def test_probe_readmits_recovered_backend(self):
+        """Test that a passing health probe closes an open circuit."""
+        self.a.record_failure()
+        self.a.record_failure()
+        paths = []
+
+        def handler(request):
+            paths.append(request.url.path)
+            return httpx.Response(200, text="OK")
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            assert await self.pool.probe(self.a, client)
+
+        assert paths == ['/healthz']
+        assert not self.a.ejected
+
+    @pytest.mark.asyncio
+    async def test_health_checks_run_in_background(self):
+        """Test that the probe loop probes every backend until closed."""
+        pool = SearxngBackendPool(["http://a.test", "http://b.test"], 2, 30, health_interval=0.01)
+        probed = []
+
+        def handler(request):
+            probed.append(request.url.host)
+            return httpx.Response(503)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        pool.start_health_checks(lambda: client)
+        await asyncio.sleep(0.1)
+        await pool.aclose()
+        await client.aclose()
+
+        assert {'a.test', 'b.test'} <= set(probed)
+        assert all(backend.ejected for backend in pool.backends)
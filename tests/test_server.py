@@ -2,21 +2,25 @@
 Tests for server functionality
 """
 
+import asyncio
+import time
 import pytest
-from unittest.mock import patch, Mock
+from unittest.mock import patch, AsyncMock
 
 from src.server.handlers import SearchHandlers
-from src.core.config import SearchException
-from src.core.models import GeneralSearchResult
+from src.core.config import SearchConfig, SearchException
+from src.core.models import BatchSearchResponse, BatchSearchResult, GeneralSearchResult, YouTubeTranscript
 
 
 class TestSearchHandlers:
     """Test cases for SearchHandlers class."""
     
     def setup_method(self):
-        self.handlers = SearchHandlers()
+        with patch.object(SearchConfig, 'TRANSCRIPT_CACHE_ENABLED', False):
+            self.handlers = SearchHandlers()
     
-    def test_search_success(self):
+    @pytest.mark.asyncio
+    async def test_search_success(self):
         """Test successful search."""
         # Mock the client's search_general method directly
         mock_result = GeneralSearchResult(
@@ -30,7 +34,7 @@ class TestSearchHandlers:
         
         with patch.object(self.handlers.client, 'search_general', return_value=[mock_result]):
             # Execute search
-            result = self.handlers.search('test query', max_results=5)
+            result = await self.handlers.search('test query', max_results=5)
             
             # Verify - results are now Pydantic models
             assert len(result) == 1
@@ -39,54 +43,226 @@ class TestSearchHandlers:
             assert result[0].content == 'Test content'
             assert result[0].score == 0.95
     
-    def test_search_max_results_validation(self):
+    @pytest.mark.asyncio
+    async def test_search_max_results_validation(self):
         """Test max_results validation in search."""
         # Test upper limit
         with patch.object(self.handlers.client, 'search_general', return_value=[]):
-            result = self.handlers.search('test', max_results=100)
+            result = await self.handlers.search('test', max_results=100)
             # Should not raise error, but limit max_results to 25
             assert isinstance(result, list)
         
         # Test lower limit
         with patch.object(self.handlers.client, 'search_general', return_value=[]):
-            result = self.handlers.search('test', max_results=0)
+            result = await self.handlers.search('test', max_results=0)
             # Should not raise error, but set max_results to 1
             assert isinstance(result, list)
     
+    @pytest.mark.asyncio
     @patch.object(SearchHandlers, '__init__', lambda x: None)
     @patch('src.server.handlers.SearxngClient')
-    def test_search_exception_handling(self, mock_client_class):
+    async def test_search_exception_handling(self, mock_client_class):
         """Test search with search exception."""
         from fastmcp.exceptions import ToolError
         
         handlers = SearchHandlers()
-        handlers.client = Mock()
+        handlers.client = AsyncMock()
         
         # Mock SearchException
         handlers.client.search_general.side_effect = SearchException("Search failed")
         
         # Execute search - should raise ToolError
         with pytest.raises(ToolError) as exc_info:
-            handlers.search('test query')
+            await handlers.search('test query')
         
         # Verify error message
         assert 'Search failed' in str(exc_info.value)
     
+    @pytest.mark.asyncio
     @patch.object(SearchHandlers, '__init__', lambda x: None)
     @patch('src.server.handlers.SearxngClient')
-    def test_search_unexpected_exception_handling(self, mock_client_class):
+    async def test_search_unexpected_exception_handling(self, mock_client_class):
         """Test search with unexpected exception."""
         from fastmcp.exceptions import ToolError
         
         handlers = SearchHandlers()
-        handlers.client = Mock()
+        handlers.client = AsyncMock()
         
         # Mock unexpected exception
         handlers.client.search_general.side_effect = ValueError("Unexpected error")
         
         # Execute search - should raise ToolError
         with pytest.raises(ToolError) as exc_info:
-            handlers.search('test query')
+            await handlers.search('test query')
         
         # Verify error message
         assert 'Unexpected error' in str(exc_info.value)
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_youtube_requests_coalesced(self):
+        """Test that concurrent requests for one video share one transcription."""
+        def slow_transcribe(video_input, use_cache=True):
+            time.sleep(0.05)
+            return YouTubeTranscript(video_id='dQw4w9WgXcQ', transcript='shared transcript', source='captions')
+        
+        with patch.object(self.handlers.youtube_fetcher, 'fetch_transcript', side_effect=slow_transcribe) as mock_fetch:
+            results = await asyncio.gather(*[
+                self.handlers.fetch_youtube_content(video) for video in (
+                    'dQw4w9WgXcQ', 'https://www.youtube.com/watch?v=dQw4w9WgXcQ', 'https://youtu.be/dQw4w9WgXcQ'
+                )
+            ])
+        
+        mock_fetch.assert_called_once()
+        assert all(result.transcript == 'shared transcript' for result in results)
+        assert all(result.source == 'captions' for result in results)
+    
+    @pytest.mark.asyncio
+    async def test_fetch_many_maps_results_and_errors(self):
+        """Test that fetch_many returns per-URL content and errors."""
+        results = [("page text", True, 30000, 50000), SearchException("timed out")]
+        
+        with patch.object(self.handlers.fetcher, 'fetch_many', AsyncMock(return_value=results)):
+            outputs = await self.handlers.fetch_many(["https://a.test", "https://b.test"])
+        
+        assert outputs[0].success is True
+        assert outputs[0].content == "page text"
+        assert outputs[0].next_offset == 30000
+        assert outputs[1].success is False
+        assert "timed out" in outputs[1].error
+        assert outputs[1].content is None
+    
+    @pytest.mark.asyncio
+    async def test_fetch_many_validation(self):
+        """Test that empty or oversized URL lists are rejected."""
+        from fastmcp.exceptions import ToolError
+        
+        with pytest.raises(ToolError):
+            await self.handlers.fetch_many([])
+        with pytest.raises(ToolError):
+            await self.handlers.fetch_many(["https://a.test"] * (SearchConfig.FETCH_MANY_MAX_URLS + 1))
+        with pytest.raises(ToolError):
+            await self.handlers.fetch_many(["https://a.test", " "])
+    
+    @pytest.mark.asyncio
+    async def test_search_and_fetch_attaches_page_content(self):
+        """Test that top results are returned with their page content."""
+        results = [
+            GeneralSearchResult(title='A', url='https://a.test', content='snippet a', score=0.9),
+            GeneralSearchResult(title='B', url='https://b.test', content='snippet b', score=0.5),
+        ]
+        pages = {
+            'https://a.test': ("x" * 40, True, 40, 100),
+            'https://b.test': SearchException("blocked"),
+        }
+        
+        with patch.object(self.handlers.client, 'search_general', AsyncMock(return_value=results)) as mock_search, \
+                patch.object(self.handlers.fetcher, 'fetch_with_limits', AsyncMock(side_effect=lambda url, max_chars: pages[url])) as mock_fetch:
+            outputs = await self.handlers.search_and_fetch('query', max_pages=2, max_chars_per_page=40)
+        
+        mock_search.assert_awaited_once_with('query', max_results=2)
+        mock_fetch.assert_any_await('https://a.test', max_chars=40)
+        assert outputs[0].snippet == 'snippet a'
+        assert outputs[0].page_content == "x" * 40
+        assert outputs[0].is_truncated is True
+        assert outputs[0].next_offset == 40
+        assert outputs[0].total_length == 100
+        assert outputs[1].page_content is None
+        assert 'blocked' in outputs[1].error
+    
+    @pytest.mark.asyncio
+    async def test_search_and_fetch_deadline(self):
+        """Test that slow pages are reported instead of delaying the response."""
+        results = [
+            GeneralSearchResult(title='Fast', url='https://fast.test', score=1.0),
+            GeneralSearchResult(title='Slow', url='https://slow.test', score=1.0),
+        ]
+        
+        async def fetch(url, max_chars):
+            if 'slow' in url:
+                await asyncio.sleep(10)
+            return ("fast page", False, 9, 9)
+        
+        with patch.object(self.handlers.client, 'search_general', AsyncMock(return_value=results)), \
+                patch.object(self.handlers.fetcher, 'fetch_with_limits', side_effect=fetch):
+            started = time.monotonic()
+            outputs = await self.handlers.search_and_fetch('query', deadline=1.0)
+        
+        assert time.monotonic() - started < 2
+        assert outputs[0].page_content == "fast page"
+        assert outputs[0].is_truncated is False
+        assert outputs[0].next_offset is None
+        assert 'deadline' in outputs[1].error
+    
+    @pytest.mark.asyncio
+    async def test_search_batch_maps_results(self):
+        """Test that merged batch results keep their query tags."""
+        response = BatchSearchResponse(
+            results=[BatchSearchResult(title='A', url='https://a.test', score=None, queries=['q1', 'q2'])],
+            failed_queries={'q3': 'Search request failed'}
+        )
+        
+        with patch.object(self.handlers.client, 'search_batch', AsyncMock(return_value=response)) as mock_batch:
+            output = await self.handlers.search_batch(['q1', 'q2', 'q3'], max_results=50)
+        
+        mock_batch.assert_awaited_once_with(['q1', 'q2', 'q3'], max_results=SearchConfig.MAX_GENERAL_RESULTS)
+        assert output.results[0].queries == ['q1', 'q2']
+        assert output.results[0].score == 0.0
+        assert output.failed_queries == {'q3': 'Search request failed'}
+    
+    @pytest.mark.asyncio
+    async def test_search_batch_validation(self):
+        """Test that empty or oversized query lists are rejected."""
+        with pytest.raises(Exception, match="At least one"):
+            await self.handlers.search_batch([])
+        with pytest.raises(Exception, match="cannot be empty"):
+            await self.handlers.search_batch(['ok', '  '])
+        with pytest.raises(Exception, match="Too many queries"):
+            await self.handlers.search_batch(['q'] * (SearchConfig.SEARCH_BATCH_MAX_QUERIES + 1))
+    
+    @pytest.mark.asyncio
+    async def test_transcription_job_lifecycle(self):
+        """Test that a job ID is returned at once and polled to completion."""
+        def transcribe(video_input, use_cache=True, progress=None):
+            time.sleep(0.05)
+            return YouTubeTranscript(video_id='dQw4w9WgXcQ', transcript='job transcript', source='stt')
+        
+        with patch.object(self.handlers.youtube_fetcher, 'fetch_transcript', side_effect=transcribe):
+            started = await self.handlers.start_youtube_transcription('dQw4w9WgXcQ')
+            assert started.status == 'queued'
+            
+            for _ in range(100):
+                status = await self.handlers.get_transcription_status(started.job_id)
+                if status.status == 'completed':
+                    break
+                await asyncio.sleep(0.01)
+        
+        assert status.transcript == 'job transcript'
+        assert status.transcript_length == len('job transcript')
+        assert status.source == 'stt'
+        assert status.progress == 1.0
+        await self.handlers.transcription_jobs.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_transcription_status_unknown_job(self):
+        """Test that polling an unknown job ID raises an error."""
+        with pytest.raises(Exception, match="Unknown or expired"):
+            await self.handlers.get_transcription_status('missing')
+
+
+class TestMcpServer:
+    """Test cases for the MCP server module."""
+    
+    def test_handlers_not_created_on_import(self):
+        """Test that importing the server module (as spawned workers do) creates no handlers."""
+        import importlib
+        from src.server import mcp_server
+        
+        try:
+            with patch('src.server.handlers.SearchHandlers') as mock_handlers:
+                module = importlib.reload(mcp_server)
+                assert mock_handlers.call_count == 0
+                
+                assert module.get_handlers() is module.get_handlers()
+                assert mock_handlers.call_count == 1
+        finally:
+            importlib.reload(mcp_server)
@@ -0,0 +1,127 @@
+"""
+Tests for single-flight request coalescing
+"""
+
+import asyncio
+import pytest
+
+from src.core.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight."""
+    
+    def setup_method(self):
+        self.group = SingleFlight()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test that identical concurrent calls run the work once."""
+        calls = []
+        release = asyncio.Event()
+        
+        async def work():
+            calls.append(1)
+            await release.wait()
+            return 'result'
+        
+        waiters = [asyncio.create_task(self.group.do('key', work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+        
+        assert results == ['result'] * 5
+        assert len(calls) == 1
+        assert len(self.group) == 0
+    
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """Test that calls with different keys are not coalesced."""
+        calls = []
+        
+        async def work(value):
+            calls.append(value)
+            await asyncio.sleep(0)
+            return value
+        
+        results = await asyncio.gather(
+            self.group.do('a', lambda: work('a')),
+            self.group.do('b', lambda: work('b')),
+        )
+        
+        assert results == ['a', 'b']
+        assert sorted(calls) == ['a', 'b']
+    
+    @pytest.mark.asyncio
+    async def test_exception_shared_with_all_waiters(self):
+        """Test that every waiter receives the shared failure."""
+        async def work():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+        
+        results = await asyncio.gather(
+            self.group.do('key', work),
+            self.group.do('key', work),
+            return_exceptions=True,
+        )
+        
+        assert all(isinstance(result, ValueError) for result in results)
+        assert len(self.group) == 0
+    
+    @pytest.mark.asyncio
+    async def test_sequential_calls_run_again(self):
+        """Test that a finished call does not satisfy later calls."""
+        calls = []
+        
+        async def work():
+            calls.append(1)
+            return len(calls)
+        
+        assert await self.group.do('key', work) == 1
+        assert await self.group.do('key', work) == 2
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_work(self):
+        """Test that cancelling one caller leaves the shared work running."""
+        release = asyncio.Event()
+        
+        async def work():
+            await release.wait()
+            return 'done'
+        
+        first = asyncio.create_task(self.group.do('key', work))
+        second = asyncio.create_task(self.group.do('key', work))
+        await asyncio.sleep(0)
+        
+        first.cancel()
+        release.set()
+        
+        assert await second == 'done'
+        with pytest.raises(asyncio.CancelledError):
+            await first
+    
+    @pytest.mark.asyncio
+    async def test_work_cancelled_with_its_last_waiter(self):
+        """Test that shared work nobody is waiting for any more is cancelled."""
+        cancelled = []
+        
+        async def work():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        
+        first = asyncio.create_task(self.group.do('key', work))
+        second = asyncio.create_task(self.group.do('key', work))
+        await asyncio.sleep(0)
+        
+        first.cancel()
+        await asyncio.sleep(0)
+        assert cancelled == []
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.sleep(0)
+        
+        assert cancelled == [True]
+        assert len(self.group) == 0
@@ -0,0 +1,237 @@
+"""
+Tests for stage-level tracing
+"""
+
+import asyncio
+import http.server
+import io
+import json
+import threading
+import httpx
+import pytest
+from unittest.mock import patch
+
+from src.core.config import SearchConfig
+from src.core.models import YouTubeTranscript
+from src.core.tracing import (
+    InMemoryExporter, JsonLinesExporter, current_span, http_trace, set_exporter, span, traced
+)
+from src.core.transcription_jobs import COMPLETED, TranscriptionJobQueue
+from src.core.web_fetcher import WebContentFetcher
+
+
+class TestSpans:
+    """Test cases for span nesting, status and export."""
+
+    def setup_method(self):
+        self.exporter = InMemoryExporter()
+        self.previous = set_exporter(self.exporter)
+
+    def teardown_method(self):
+        set_exporter(self.previous)
+
+    def _spans(self):
+        return {recorded.name: recorded for recorded in self.exporter.spans}
+
+    def test_nested_spans_share_trace(self):
+        """Test parent/child links and attributes."""
+        with span('outer', {'url.full': 'https://example.com', 'skipped': None}):
+            with span('inner') as inner:
+                inner.set_attribute('http.response.body.size', 42)
+
+        spans = self._spans()
+        assert spans['inner'].parent_id == spans['outer'].span_id
+        assert spans['inner'].trace_id == spans['outer'].trace_id
+        assert spans['outer'].parent_id is None
+        assert spans['outer'].attributes == {'url.full': 'https://example.com'}
+        assert spans['inner'].attributes == {'http.response.body.size': 42}
+
+    def test_exception_marks_span_failed(self):
+        """Test that errors set the status and an exception event."""
+        with pytest.raises(ValueError):
+            with span('failing'):
+                raise ValueError("bad input")
+
+        failing = self._spans()['failing']
+        assert failing.status == 'ERROR'
+        assert failing.events[0]['attributes']['exception.message'] == "bad input"
+
+    @pytest.mark.asyncio
+    async def test_context_follows_tasks_and_threads(self):
+        """Test that tasks and to_thread calls nest under the span that started them."""
+        @traced('worker')
+        def work():
+            return current_span().name
+
+        with span('request'):
+            assert await asyncio.to_thread(work) == 'worker'
+            await asyncio.create_task(traced('task')(asyncio.sleep)(0))
+
+        spans = self._spans()
+        assert spans['worker'].parent_id == spans['request'].span_id
+        assert spans['task'].parent_id == spans['request'].span_id
+
+    @pytest.mark.asyncio
+    async def test_cancelled_span_not_an_error(self):
+        """Test that a cancelled stage is marked cancelled, not failed."""
+        async def slow():
+            with span('slow'):
+                await asyncio.sleep(5)
+
+        task = asyncio.create_task(slow())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        slow_span = self._spans()['slow']
+        assert slow_span.attributes['cancelled'] is True
+        assert slow_span.status == 'UNSET'
+
+    def test_json_lines_exporter_writes_otel_shape(self):
+        """Test the exported record layout."""
+        stream = io.StringIO()
+        set_exporter(JsonLinesExporter(stream))
+        with span('stage', {'fetch.route': 'direct'}):
+            pass
+
+        record = json.loads(stream.getvalue())
+        assert record['name'] == 'stage'
+        assert record['context']['trace_id'].startswith('0x') and len(record['context']['trace_id']) == 34
+        assert record['attributes'] == {'fetch.route': 'direct'}
+        assert record['status'] == {'status_code': 'UNSET'}
+        assert record['resource']['attributes']['service.name'] == 'webintel-mcp'
+
+    @pytest.mark.asyncio
+    async def test_http_trace_times_connection_phases(self):
+        """Test that httpcore trace events become phase durations on the span."""
+        with span('request') as current:
+            trace = http_trace(current)
+            for event in ('connection.connect_tcp', 'connection.start_tls', 'http11.receive_response_headers'):
+                await trace(f'{event}.started', {})
+                await trace(f'{event}.complete', {'return_value': None})
+            await trace('http11.send_request_body.started', {})
+
+        recorded = self._spans()['request']
+        for phase in ('network.connect', 'network.tls', 'http.ttfb'):
+            assert recorded.attributes[f'{phase}.duration_ms'] >= 0
+        assert [event['name'] for event in recorded.events] == ['network.connect', 'network.tls', 'http.ttfb']
+
+    def test_http_trace_off_without_exporter(self):
+        """Test that no trace callback is installed while tracing is disabled."""
+        set_exporter(None)
+        with span('ignored') as ignored:
+            assert http_trace(ignored) is None
+
+    def test_disabled_tracing_records_nothing(self):
+        """Test that spans are no-ops without an exporter."""
+        set_exporter(None)
+        with span('ignored') as ignored:
+            ignored.set_attribute('key', 'value')
+            assert not current_span().recording
+
+        assert self.exporter.spans == []
+
+    @pytest.mark.asyncio
+    async def test_queued_jobs_join_their_submitters_trace(self):
+        """Test that each background job is traced under the request that queued it."""
+        class Fetcher:
+            @traced('fetch_transcript')
+            def fetch_transcript(self, video_input, use_cache=True, progress=None):
+                return YouTubeTranscript(video_id=video_input, transcript="text", source='stt')
+        
+        queue = TranscriptionJobQueue(Fetcher(), workers=1, max_queue=4, retention=60)
+        jobs = []
+        for video in ('aaaaaaaaaaa', 'bbbbbbbbbbb'):
+            with span(f'request {video}'):
+                jobs.append(queue.submit(video))
+            while jobs[-1].status != COMPLETED:
+                await asyncio.sleep(0.01)
+        await queue.aclose()
+        
+        spans = self._spans()
+        for video in ('aaaaaaaaaaa', 'bbbbbbbbbbb'):
+            request = spans[f'request {video}']
+            job_span = next(
+                recorded for recorded in self.exporter.spans
+                if recorded.name == 'TranscriptionJobQueue.job' and recorded.trace_id == request.trace_id
+            )
+            assert job_span.parent_id == request.span_id
+        assert spans['request aaaaaaaaaaa'].trace_id != spans['request bbbbbbbbbbb'].trace_id
+
+
+class TestFetchTracing:
+    """Test cases for the spans emitted by a fetch."""
+
+    def setup_method(self):
+        self.exporter = InMemoryExporter()
+        self.previous = set_exporter(self.exporter)
+        with patch.object(SearchConfig, 'DOCUMENT_CACHE_TTL', 0):
+            self.fetcher = WebContentFetcher()
+
+    def teardown_method(self):
+        set_exporter(self.previous)
+
+    @pytest.mark.asyncio
+    async def test_fetch_emits_nested_stage_spans(self):
+        """Test the fetch, download and parse spans with their attributes."""
+        body = b'<html><body><p>traced page text</p></body></html>'
+
+        def handler(request):
+            return httpx.Response(200, headers={'content-type': 'text/html'}, content=body)
+
+        real_client = httpx.AsyncClient
+        with patch(
+            'src.core.web_fetcher.httpx.AsyncClient',
+            lambda **kwargs: real_client(transport=httpx.MockTransport(handler))
+        ):
+            content, _, _, _ = await self.fetcher.fetch_and_parse("https://traced.example/page")
+
+        spans = {recorded.name: recorded for recorded in self.exporter.spans}
+        top = spans['WebContentFetcher.fetch_and_parse']
+        document = spans['WebContentFetcher._fetch_document']
+        direct = spans['fetch.direct']
+        parse = spans['WebContentFetcher._parse_html_content']
+
+        assert "traced page text" in content
+        assert top.attributes['url.full'] == "https://traced.example/page"
+        assert top.attributes['fetch.source'] == 'network'
+        assert document.parent_id == top.span_id
+        assert document.attributes['fetch.route'] == 'direct'
+        assert direct.parent_id == document.span_id
+        assert direct.attributes['http.response.body.size'] == len(body)
+        assert direct.attributes['http.response.status_code'] == 200
+        assert [event['name'] for event in direct.events] == ['response_headers']
+        assert parse.parent_id == document.span_id
+        assert parse.attributes['parse.executor'] == 'thread'
+
+    @pytest.mark.asyncio
+    async def test_direct_fetch_records_network_phases(self):
+        """Test connect and time-to-first-byte timing against a real local server."""
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = b'<html><body><p>local page text</p></body></html>'
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/page"
+            with patch.object(SearchConfig, 'FETCH_HEDGE_DELAY', 0):
+                content, _, _, _ = await self.fetcher.fetch_and_parse(url)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        direct = {recorded.name: recorded for recorded in self.exporter.spans}['fetch.direct']
+        assert "local page text" in content
+        assert direct.attributes['network.connect.duration_ms'] >= 0
+        assert direct.attributes['http.ttfb.duration_ms'] >= 0
+        assert 'network.tls.duration_ms' not in direct.attributes
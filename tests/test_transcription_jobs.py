@@ -0,0 +1,161 @@
+"""
+Tests for the background transcription job queue
+"""
+
+import asyncio
+import threading
+import pytest
+
+from src.core.config import SearchException
+from src.core.models import YouTubeTranscript
+from src.core.transcription_jobs import (
+    TranscriptionJobQueue,
+    QUEUED,
+    RUNNING,
+    COMPLETED,
+    FAILED,
+)
+
+
+class FakeFetcher:
+    """Fetcher whose transcriptions block until released by the test."""
+    
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+    
+    def fetch_transcript(self, video_input, use_cache=True, progress=None):
+        self.calls.append(video_input)
+        progress('transcribing', 1, 2, 'first half')
+        if not self.release.wait(timeout=5):
+            raise RuntimeError("test never released the job")
+        if video_input == 'broken':
+            raise SearchException("STT unavailable")
+        return YouTubeTranscript(video_id=video_input, transcript=f"{video_input} transcript", source='stt')
+
+
+async def wait_for(condition, timeout=2.0):
+    """Poll until condition() is true."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+class TestTranscriptionJobQueue:
+    """Test cases for TranscriptionJobQueue."""
+    
+    def setup_method(self):
+        self.fetcher = FakeFetcher()
+    
+    def teardown_method(self):
+        self.fetcher.release.set()
+    
+    @pytest.mark.asyncio
+    async def test_job_runs_with_progress_and_result(self):
+        """Test that a submitted job reports partial progress and then its result."""
+        queue = TranscriptionJobQueue(self.fetcher, workers=1, max_queue=4, retention=60)
+        job = queue.submit('video1')
+        assert job.status == QUEUED
+        
+        await wait_for(lambda: job.snapshot()['stage'] == 'transcribing')
+        state = job.snapshot()
+        assert state['status'] == RUNNING
+        assert state['progress'] == 0.5
+        assert state['partial_transcript'] == 'first half'
+        
+        self.fetcher.release.set()
+        await wait_for(lambda: job.status == COMPLETED)
+        state = job.snapshot()
+        assert state['result'].transcript == 'video1 transcript'
+        assert state['progress'] == 1.0
+        assert state['partial_transcript'] is None
+        await queue.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_worker_pool_bounds_concurrency(self):
+        """Test that jobs beyond the worker count wait in order."""
+        queue = TranscriptionJobQueue(self.fetcher, workers=1, max_queue=4, retention=60)
+        first = queue.submit('a')
+        second = queue.submit('b')
+        third = queue.submit('c')
+        
+        await wait_for(lambda: first.status == RUNNING)
+        assert self.fetcher.calls == ['a']
+        assert queue.queue_position(second) == 0
+        assert queue.queue_position(third) == 1
+        
+        self.fetcher.release.set()
+        await wait_for(lambda: third.status == COMPLETED)
+        assert self.fetcher.calls == ['a', 'b', 'c']
+        await queue.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_queue_depth_limit(self):
+        """Test that submissions beyond the queue size are rejected."""
+        queue = TranscriptionJobQueue(self.fetcher, workers=1, max_queue=1, retention=60)
+        running = queue.submit('a')
+        await wait_for(lambda: running.status == RUNNING)
+        queue.submit('b')
+        
+        with pytest.raises(SearchException, match="queue is full"):
+            queue.submit('c')
+        self.fetcher.release.set()
+        await queue.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_submission_returns_existing_job(self):
+        """Test that a video already in progress is not queued twice."""
+        queue = TranscriptionJobQueue(self.fetcher, workers=1, max_queue=4, retention=60)
+        
+        first = queue.submit('a')
+        assert queue.submit('a') is first
+        assert queue.submit('a', use_cache=False) is not first
+        
+        self.fetcher.release.set()
+        await wait_for(lambda: first.status == COMPLETED)
+        # Finished jobs no longer absorb new submissions
+        assert queue.submit('a') is not first
+        await queue.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_same_video_by_url_and_id_shares_job(self):
+        """Test that URL and ID forms of one video are deduplicated."""
+        queue = TranscriptionJobQueue(self.fetcher, workers=1, max_queue=4, retention=60)
+        
+        first = queue.submit('dQw4w9WgXcQ')
+        assert queue.submit('https://www.youtube.com/watch?v=dQw4w9WgXcQ') is first
+        assert queue.submit('https://youtu.be/dQw4w9WgXcQ') is first
+        
+        self.fetcher.release.set()
+        await wait_for(lambda: first.status == COMPLETED)
+        second = queue.submit('https://youtu.be/dQw4w9WgXcQ')
+        assert second is not first
+        await wait_for(lambda: second.status == COMPLETED)
+        assert self.fetcher.calls == ['dQw4w9WgXcQ', 'https://youtu.be/dQw4w9WgXcQ']
+        await queue.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_failed_job_records_error(self):
+        """Test that fetcher errors mark the job as failed."""
+        queue = TranscriptionJobQueue(self.fetcher, workers=1, max_queue=4, retention=60)
+        job = queue.submit('broken')
+        self.fetcher.release.set()
+        
+        await wait_for(lambda: job.status == FAILED)
+        assert job.snapshot()['error'] == "STT unavailable"
+        await queue.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_finished_jobs_expire(self):
+        """Test that finished jobs are forgotten after the retention period."""
+        queue = TranscriptionJobQueue(self.fetcher, workers=1, max_queue=4, retention=60)
+        job = queue.submit('a')
+        self.fetcher.release.set()
+        await wait_for(lambda: job.status == COMPLETED)
+        
+        assert queue.get(job.job_id) is job
+        job.finished_at -= 61
+        assert queue.get(job.job_id) is None
+        await queue.aclose()
@@ -3,6 +3,7 @@ Tests for video search functionality
 """
 
 import pytest
+from unittest.mock import patch
 from src.server.handlers import SearchHandlers
 from src.core.config import SearchConfig
 
@@ -12,12 +13,14 @@ class TestVideoSearch:
     
     def setup_method(self):
         """Set up test fixtures."""
-        self.handlers = SearchHandlers()
+        with patch.object(SearchConfig, 'TRANSCRIPT_CACHE_ENABLED', False):
+            self.handlers = SearchHandlers()
     
-    def test_search_videos_basic(self):
+    @pytest.mark.asyncio
+    async def test_search_videos_basic(self):
         """Test basic video search functionality."""
         query = "python tutorial"
-        results = self.handlers.search_videos(query, max_results=5)
+        results = await self.handlers.search_videos(query, max_results=5)
         
         # Should return a list
         assert isinstance(results, list)
@@ -36,22 +39,24 @@ class TestVideoSearch:
             # URL should be YouTube
             assert "youtube.com" in first_result.url
     
-    def test_search_videos_max_results_validation(self):
+    @pytest.mark.asyncio
+    async def test_search_videos_max_results_validation(self):
         """Test that max_results is properly validated."""
         query = "coding"
         
         # Test with value above max
-        results = self.handlers.search_videos(query, max_results=100)
+        results = await self.handlers.search_videos(query, max_results=100)
         assert len(results) <= SearchConfig.MAX_VIDEO_RESULTS
         
         # Test with value below 1
-        results = self.handlers.search_videos(query, max_results=0)
+        results = await self.handlers.search_videos(query, max_results=0)
         assert len(results) >= 1
     
-    def test_search_videos_response_fields(self):
+    @pytest.mark.asyncio
+    async def test_search_videos_response_fields(self):
         """Test that all expected fields are present in response."""
         query = "machine learning"
-        results = self.handlers.search_videos(query, max_results=3)
+        results = await self.handlers.search_videos(query, max_results=3)
         
         if results:
             for result in results:
@@ -2,11 +2,71 @@
 Tests for YouTube content fetching functionality
 """
 
+import threading
+import time
+import httpx
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from openai import APIStatusError
+from unittest.mock import ANY, Mock, patch, MagicMock
 from pathlib import Path
-from src.core.youtube_fetcher import YouTubeContentFetcher
-from src.core.config import SearchException
+from src.core.models import AudioTranscript
+from src.core.youtube_fetcher import YouTubeContentFetcher, parse_video_id
+from src.core.transcript_cache import TranscriptCache
+from src.core.config import SearchConfig, SearchException
+
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+# (input, expected video ID or None when yt-dlp must resolve it)
+VIDEO_ID_CASES = [
+    (VIDEO_ID, VIDEO_ID),
+    (f"  {VIDEO_ID}\n", VIDEO_ID),
+    ("a-b_c1D2e3F", "a-b_c1D2e3F"),
+    (f"https://www.youtube.com/watch?v={VIDEO_ID}", VIDEO_ID),
+    (f"http://youtube.com/watch?v={VIDEO_ID}", VIDEO_ID),
+    (f"https://www.youtube.com/watch?feature=share&v={VIDEO_ID}&t=42s", VIDEO_ID),
+    (f"https://www.youtube.com/watch?v={VIDEO_ID}&list=PL1234567890&index=3", VIDEO_ID),
+    (f"https://www.youtube.com/watch?v={VIDEO_ID}#t=1m2s", VIDEO_ID),
+    (f"www.youtube.com/watch?v={VIDEO_ID}", VIDEO_ID),
+    (f"youtube.com/watch?v={VIDEO_ID}", VIDEO_ID),
+    (f"HTTPS://WWW.YOUTUBE.COM/watch?v={VIDEO_ID}", VIDEO_ID),
+    (f"https://m.youtube.com/watch?v={VIDEO_ID}&feature=youtu.be", VIDEO_ID),
+    (f"https://music.youtube.com/watch?v={VIDEO_ID}&si=abc123", VIDEO_ID),
+    (f"https://youtu.be/{VIDEO_ID}", VIDEO_ID),
+    (f"https://youtu.be/{VIDEO_ID}?si=Xy12_ab&t=30", VIDEO_ID),
+    (f"youtu.be/{VIDEO_ID}", VIDEO_ID),
+    (f"https://www.youtube.com/shorts/{VIDEO_ID}", VIDEO_ID),
+    (f"https://youtube.com/shorts/{VIDEO_ID}?feature=share", VIDEO_ID),
+    (f"https://www.youtube.com/embed/{VIDEO_ID}?start=10&autoplay=1", VIDEO_ID),
+    (f"https://www.youtube-nocookie.com/embed/{VIDEO_ID}", VIDEO_ID),
+    (f"https://www.youtube.com/live/{VIDEO_ID}?si=abc", VIDEO_ID),
+    (f"https://www.youtube.com/v/{VIDEO_ID}", VIDEO_ID),
+    (f"https://www.youtube.com/e/{VIDEO_ID}", VIDEO_ID),
+    (f"https://www.youtube.com/watch/{VIDEO_ID}", VIDEO_ID),
+    (f"https://www.youtube.com/attribution_link?a=xyz&u=/watch%3Fv%3D{VIDEO_ID}%26feature%3Dshare", VIDEO_ID),
+    ("", None),
+    ("dQw4w9WgXc", None),
+    ("dQw4w9WgXcQQ", None),
+    ("dQw4w9WgX!Q", None),
+    ("https://www.youtube.com/watch?list=PL1234567890", None),
+    ("https://www.youtube.com/watch?v=short", None),
+    ("https://www.youtube.com/@SomeChannel", None),
+    ("https://www.youtube.com/channel/UC1234567890abcdefghij", None),
+    ("https://www.youtube.com/playlist?list=PL1234567890", None),
+    (f"https://notyoutube.com/watch?v={VIDEO_ID}", None),
+    (f"https://vimeo.com/{VIDEO_ID}", None),
+    ("https://youtu.be/", None),
+    ("not a url at all", None),
+]
+
+
+class TestParseVideoId:
+    """Test suite for the local video ID parser."""
+    
+    @pytest.mark.parametrize("video_input,expected", VIDEO_ID_CASES)
+    def test_parse_video_id(self, video_input, expected):
+        """Test recognition of YouTube URL and ID shapes."""
+        assert parse_video_id(video_input) == expected
 
 
 class TestYouTubeContentFetcher:
@@ -14,7 +74,11 @@ class TestYouTubeContentFetcher:
     
     def setup_method(self):
         """Set up test fixtures."""
-        self.fetcher = YouTubeContentFetcher()
+        # These tests cover the transcoding path; captions and native audio have their own suites
+        with patch.object(SearchConfig, 'TRANSCRIPT_CACHE_ENABLED', False), \
+                patch.object(SearchConfig, 'YOUTUBE_CAPTIONS_ENABLED', False), \
+                patch.object(SearchConfig, 'STT_NATIVE_AUDIO', False):
+            self.fetcher = YouTubeContentFetcher()
     
     def test_extract_video_id_from_id(self):
         """Test extracting video ID when already provided as ID."""
@@ -24,12 +88,21 @@ class TestYouTubeContentFetcher:
     
     @patch('yt_dlp.YoutubeDL')
     def test_extract_video_id_from_url(self, mock_ydl_class):
-        """Test extracting video ID from YouTube URL."""
+        """Test that YouTube URLs are parsed without a yt-dlp round trip."""
+        video_url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        result = self.fetcher._extract_video_id(video_url)
+        
+        assert result == "dQw4w9WgXcQ"
+        mock_ydl_class.assert_not_called()
+    
+    @patch('yt_dlp.YoutubeDL')
+    def test_extract_video_id_falls_back_to_ytdlp(self, mock_ydl_class):
+        """Test that unrecognized inputs are resolved with yt-dlp."""
         mock_ydl = MagicMock()
         mock_ydl.extract_info.return_value = {'id': 'dQw4w9WgXcQ'}
         mock_ydl_class.return_value.__enter__.return_value = mock_ydl
         
-        video_url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        video_url = "https://www.youtube.com/@SomeChannel/live"
         result = self.fetcher._extract_video_id(video_url)
         
         assert result == "dQw4w9WgXcQ"
@@ -152,3 +225,342 @@ class TestYouTubeContentFetcher:
         # Cleanup should still be called
         mock_unlink.assert_called_once()
         mock_rmdir.assert_called_once()
+
+    
+    def test_long_audio_transcribed_in_parallel_segments(self):
+        """Test that segments are transcribed concurrently and stitched in order."""
+        segments = [(0.0, 300.0), (298.0, 600.0), (598.0, 900.0)]
+        texts = ["one two three four", "three four five six", "five six seven"]
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def transcribe(client, path):
+            with lock:
+                active.append(path)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(path)
+            return texts[int(path.stem[-3:])]
+        
+        audio_path = Path('/tmp/youtube_audio_test/audio.opus')
+        with patch.object(self.fetcher, '_plan_audio_segments', return_value=segments), \
+                patch.object(self.fetcher, '_transcribe_file', side_effect=transcribe), \
+                patch('src.core.youtube_fetcher.extract_segment') as mock_extract, \
+                patch.object(SearchConfig, 'STT_CONCURRENCY', 3):
+            transcript = self.fetcher._transcribe_audio(MagicMock(), audio_path)
+        
+        assert transcript.transcript == "one two three four five six seven"
+        assert mock_extract.call_count == 3
+        assert max(peak) == 3
+    
+    def test_short_audio_uploaded_whole(self):
+        """Test that audio without a split plan is sent in one request."""
+        with patch.object(self.fetcher, '_plan_audio_segments', return_value=[]), \
+                patch.object(self.fetcher, '_transcribe_file', return_value="whole") as mock_transcribe:
+            transcript = self.fetcher._transcribe_audio(MagicMock(), Path('/tmp/audio.opus'))
+        
+        assert transcript.transcript == "whole"
+        mock_transcribe.assert_called_once()
+    
+    def test_preprocessed_audio_transcribed_with_durations(self):
+        """Test that preprocessed audio is transcribed and both durations are reported."""
+        audio_path = Path('/tmp/youtube_audio_test/audio.opus')
+        with patch.object(self.fetcher, '_preprocess_filter', return_value='atempo=1.5'), \
+                patch('src.core.youtube_fetcher.probe_duration', side_effect=[600.0, 360.0]), \
+                patch('src.core.youtube_fetcher.preprocess_audio') as mock_preprocess, \
+                patch.object(self.fetcher, '_plan_audio_segments', return_value=[]), \
+                patch.object(self.fetcher, '_transcribe_file', return_value="faster") as mock_transcribe:
+            transcript = self.fetcher._transcribe_audio(MagicMock(), audio_path)
+        
+        processed_path = audio_path.with_name('audio_processed.opus')
+        mock_preprocess.assert_called_once_with(audio_path, processed_path, 'atempo=1.5')
+        assert mock_transcribe.call_args[0][1] == processed_path
+        assert transcript == AudioTranscript(transcript="faster", audio_duration=600.0, processed_duration=360.0)
+    
+    def test_preprocessing_failure_transcribes_original(self):
+        """Test that an ffmpeg failure falls back to the unprocessed audio."""
+        audio_path = Path('/tmp/youtube_audio_test/audio.opus')
+        with patch.object(self.fetcher, '_preprocess_filter', return_value='atempo=1.5'), \
+                patch('src.core.youtube_fetcher.probe_duration', return_value=600.0), \
+                patch('src.core.youtube_fetcher.preprocess_audio', side_effect=SearchException("ffmpeg failed")), \
+                patch.object(self.fetcher, '_plan_audio_segments', return_value=[]), \
+                patch.object(self.fetcher, '_transcribe_file', return_value="original") as mock_transcribe:
+            transcript = self.fetcher._transcribe_audio(MagicMock(), audio_path)
+        
+        assert mock_transcribe.call_args[0][1] == audio_path
+        assert transcript == AudioTranscript(transcript="original")
+
+
+
+class TestNativeAudio:
+    """Test suite for the native audio fast path."""
+    
+    def setup_method(self):
+        with patch.object(SearchConfig, 'TRANSCRIPT_CACHE_ENABLED', False), \
+                patch.object(SearchConfig, 'YOUTUBE_CAPTIONS_ENABLED', False), \
+                patch.object(SearchConfig, 'STT_NATIVE_AUDIO', True):
+            self.fetcher = YouTubeContentFetcher()
+        self.info = {
+            'id': 'dQw4w9WgXcQ',
+            'url': 'https://media.test/audio.webm',
+            'protocol': 'https',
+            'ext': 'webm',
+            'duration': 60,
+        }
+        self.audio = b'native-opus-bytes'
+        self.requests = []
+        self.content_range = True
+        self.real_client = httpx.Client
+    
+    def _serve_ranges(self, request):
+        """Serve self.audio honouring Range headers."""
+        self.requests.append(request)
+        start, end = (int(position) for position in request.headers['Range'].split('=')[1].split('-'))
+        if start >= len(self.audio):
+            return httpx.Response(416, headers={'content-range': f'bytes */{len(self.audio)}'})
+        end = min(end, len(self.audio) - 1)
+        headers = {'content-range': f'bytes {start}-{end}/{len(self.audio)}'} if self.content_range else {}
+        return httpx.Response(206, headers=headers, content=self.audio[start:end + 1])
+    
+    def _http_client(self, **kwargs):
+        return self.real_client(transport=httpx.MockTransport(self._serve_ranges), **kwargs)
+    
+    def _patches(self, mock_ydl_class, mock_openai_class, transcript="native transcript"):
+        mock_ydl = MagicMock()
+        mock_ydl.extract_info.return_value = self.info
+        mock_ydl_class.return_value.__enter__.return_value = mock_ydl
+        
+        uploads = []
+        
+        def create(model, file, response_format):
+            name, handle = file
+            uploads.append((name, handle.read()))
+            if isinstance(transcript, Exception):
+                raise transcript
+            return transcript
+        
+        mock_openai_class.return_value.audio.transcriptions.create.side_effect = create
+        return mock_ydl, uploads
+    
+    @patch('src.core.youtube_fetcher.OpenAI')
+    @patch('yt_dlp.YoutubeDL')
+    def test_native_stream_uploaded_without_transcoding(self, mock_ydl_class, mock_openai_class):
+        """Test that the native stream is piped to STT without yt-dlp download or ffmpeg."""
+        mock_ydl, uploads = self._patches(mock_ydl_class, mock_openai_class)
+        
+        with patch('src.core.youtube_fetcher.httpx.Client', self._http_client), \
+                patch.object(self.fetcher, '_transcode_and_transcribe') as mock_transcode:
+            _, transcript = self.fetcher.fetch_and_transcribe('dQw4w9WgXcQ')
+        
+        assert transcript == "native transcript"
+        assert uploads == [('dQw4w9WgXcQ.webm', self.audio)]
+        assert mock_ydl_class.call_args[0][0]['format'] == 'worstaudio[ext=webm]/worstaudio[ext=m4a]/bestaudio/best'
+        mock_ydl.download.assert_not_called()
+        mock_transcode.assert_not_called()
+    
+    @patch('src.core.youtube_fetcher.OpenAI')
+    @patch('yt_dlp.YoutubeDL')
+    def test_native_stream_downloaded_in_ranges(self, mock_ydl_class, mock_openai_class):
+        """Test that the stream is fetched in consecutive byte ranges."""
+        _, uploads = self._patches(mock_ydl_class, mock_openai_class)
+        
+        with patch('src.core.youtube_fetcher.httpx.Client', self._http_client), \
+                patch('src.core.youtube_fetcher.NATIVE_CHUNK_BYTES', 8):
+            self.fetcher.fetch_and_transcribe('dQw4w9WgXcQ')
+        
+        assert uploads[0][1] == self.audio
+        assert [request.headers['Range'] for request in self.requests] == [
+            'bytes=0-7', 'bytes=8-15', 'bytes=16-23'
+        ]
+    
+    @pytest.mark.parametrize('content_range', [True, False])
+    @patch('src.core.youtube_fetcher.OpenAI')
+    @patch('yt_dlp.YoutubeDL')
+    def test_stream_of_whole_chunks_completes(self, mock_ydl_class, mock_openai_class, content_range):
+        """Test a stream whose length is a multiple of the chunk size, with and without Content-Range."""
+        self.audio = b'sixteen-bytes-ok'
+        self.content_range = content_range
+        _, uploads = self._patches(mock_ydl_class, mock_openai_class)
+        
+        with patch('src.core.youtube_fetcher.httpx.Client', self._http_client), \
+                patch('src.core.youtube_fetcher.NATIVE_CHUNK_BYTES', 8), \
+                patch.object(self.fetcher, '_transcode_and_transcribe') as mock_transcode:
+            _, transcript = self.fetcher.fetch_and_transcribe('dQw4w9WgXcQ')
+        
+        assert transcript == "native transcript"
+        assert uploads[0][1] == self.audio
+        # Without a total the end is only found by the range past it being rejected
+        assert len(self.requests) == (2 if content_range else 3)
+        mock_transcode.assert_not_called()
+    
+    @patch('src.core.youtube_fetcher.OpenAI')
+    @patch('yt_dlp.YoutubeDL')
+    def test_rejected_format_falls_back_to_transcoding(self, mock_ydl_class, mock_openai_class):
+        """Test that an STT format rejection triggers the transcoding path."""
+        rejection = APIStatusError(
+            "Unsupported audio format",
+            response=httpx.Response(415, request=httpx.Request('POST', 'http://stt.test')),
+            body=None
+        )
+        self._patches(mock_ydl_class, mock_openai_class, transcript=rejection)
+        
+        with patch('src.core.youtube_fetcher.httpx.Client', self._http_client), \
+                patch.object(self.fetcher, '_transcode_and_transcribe', return_value=AudioTranscript(transcript="transcoded")) as mock_transcode:
+            _, transcript = self.fetcher.fetch_and_transcribe('dQw4w9WgXcQ')
+        
+        assert transcript == "transcoded"
+        mock_transcode.assert_called_once_with('dQw4w9WgXcQ', ANY)
+    
+    @patch('yt_dlp.YoutubeDL')
+    def test_missing_native_format_falls_back_to_transcoding(self, mock_ydl_class):
+        """Test that a failed format selection triggers the transcoding path."""
+        mock_ydl_class.return_value.__enter__.return_value.extract_info.side_effect = Exception(
+            "Requested format is not available"
+        )
+        
+        with patch.object(self.fetcher, '_transcode_and_transcribe', return_value=AudioTranscript(transcript="transcoded")):
+            _, transcript = self.fetcher.fetch_and_transcribe('dQw4w9WgXcQ')
+        
+        assert transcript == "transcoded"
+    
+    @patch('src.core.youtube_fetcher.OpenAI')
+    @patch('yt_dlp.YoutubeDL')
+    def test_stt_outage_does_not_transcode(self, mock_ydl_class, mock_openai_class):
+        """Test that server errors are reported instead of retried through ffmpeg."""
+        outage = APIStatusError(
+            "Service unavailable",
+            response=httpx.Response(503, request=httpx.Request('POST', 'http://stt.test')),
+            body=None
+        )
+        self._patches(mock_ydl_class, mock_openai_class, transcript=outage)
+        
+        with patch('src.core.youtube_fetcher.httpx.Client', self._http_client), \
+                patch.object(self.fetcher, '_transcode_and_transcribe') as mock_transcode:
+            with pytest.raises(SearchException):
+                self.fetcher.fetch_and_transcribe('dQw4w9WgXcQ')
+        
+        mock_transcode.assert_not_called()
+
+    
+    @patch('yt_dlp.YoutubeDL')
+    def test_video_format_selected_falls_back_to_transcoding(self, mock_ydl_class):
+        """Test that a non-native fallback format is transcoded instead of uploaded."""
+        self.info.update(ext='mp4', vcodec='avc1', format_id='18')
+        mock_ydl_class.return_value.__enter__.return_value.extract_info.return_value = self.info
+        
+        with patch.object(self.fetcher, '_transcode_and_transcribe', return_value=AudioTranscript(transcript="transcoded")) as mock_transcode:
+            _, transcript = self.fetcher.fetch_and_transcribe('dQw4w9WgXcQ')
+        
+        assert transcript == "transcoded"
+        mock_transcode.assert_called_once()
+
+
+class TestCaptionFastPath:
+    """Test suite for using caption tracks instead of STT."""
+    
+    @pytest.fixture(autouse=True)
+    def fetcher(self, tmp_path):
+        self.cache = TranscriptCache(str(tmp_path / "transcripts"), max_bytes=1024 * 1024, max_age=3600)
+        with patch.object(SearchConfig, 'YOUTUBE_CAPTIONS_ENABLED', True):
+            self.fetcher = YouTubeContentFetcher(transcript_cache=self.cache)
+        self.real_client = httpx.Client
+        yield
+        self.cache.close()
+    
+    def _http_client(self, **kwargs):
+        def handler(request):
+            return httpx.Response(200, text="WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nhello from captions\n")
+        return self.real_client(transport=httpx.MockTransport(handler), **kwargs)
+    
+    @patch('yt_dlp.YoutubeDL')
+    def test_captions_used_instead_of_stt(self, mock_ydl_class):
+        """Test that a caption track skips the audio download and is cached by source."""
+        mock_ydl_class.return_value.__enter__.return_value.extract_info.return_value = {
+            'id': 'dQw4w9WgXcQ',
+            'subtitles': {'en': [{'ext': 'vtt', 'url': 'https://captions.test/en.vtt'}]},
+        }
+        
+        with patch('src.core.youtube_fetcher.httpx.Client', self._http_client), \
+                patch.object(self.fetcher, '_download_and_transcribe') as mock_stt:
+            first = self.fetcher.fetch_transcript('dQw4w9WgXcQ')
+            second = self.fetcher.fetch_transcript('dQw4w9WgXcQ')
+        
+        assert first.transcript == "hello from captions"
+        assert first.source == second.source == 'captions'
+        mock_stt.assert_not_called()
+        # The second request is served from the cache without another metadata call
+        assert mock_ydl_class.return_value.__enter__.return_value.extract_info.call_count == 1
+    
+    @patch('yt_dlp.YoutubeDL')
+    def test_stt_used_without_captions(self, mock_ydl_class):
+        """Test that videos without a usable track fall back to STT with the same metadata."""
+        info = {'id': 'dQw4w9WgXcQ', 'subtitles': {}, 'automatic_captions': {}}
+        mock_ydl_class.return_value.__enter__.return_value.extract_info.return_value = info
+        
+        with patch.object(self.fetcher, '_download_and_transcribe', return_value=AudioTranscript(transcript="spoken words")) as mock_stt:
+            result = self.fetcher.fetch_transcript('dQw4w9WgXcQ')
+        
+        assert result.transcript == "spoken words"
+        assert result.source == 'stt'
+        mock_stt.assert_called_once_with('dQw4w9WgXcQ', info, ANY)
+
+
+class TestTranscriptCache:
+    """Test suite for transcript caching."""
+    
+    @pytest.fixture(autouse=True)
+    def cache(self, tmp_path):
+        self.cache = TranscriptCache(str(tmp_path / "transcripts"), max_bytes=1024 * 1024, max_age=3600)
+        with patch.object(SearchConfig, 'YOUTUBE_CAPTIONS_ENABLED', False):
+            self.fetcher = YouTubeContentFetcher(transcript_cache=self.cache)
+        yield
+        self.cache.close()
+    
+    def test_repeat_request_served_from_cache(self):
+        """Test that a second request for the same video skips transcription."""
+        with patch.object(self.fetcher, '_download_and_transcribe', return_value=AudioTranscript(transcript="cached transcript")) as mock_transcribe:
+            first = self.fetcher.fetch_and_transcribe("dQw4w9WgXcQ")
+            second = self.fetcher.fetch_and_transcribe("dQw4w9WgXcQ")
+        
+        assert first == second == ("dQw4w9WgXcQ", "cached transcript")
+        mock_transcribe.assert_called_once()
+    
+    def test_cache_keyed_by_model(self):
+        """Test that switching STT model does not reuse another model's transcript."""
+        self.cache.put("dQw4w9WgXcQ", "other-model", "old transcript")
+        
+        with patch.object(self.fetcher, '_download_and_transcribe', return_value=AudioTranscript(transcript="new transcript")):
+            _, transcript = self.fetcher.fetch_and_transcribe("dQw4w9WgXcQ")
+        
+        assert transcript == "new transcript"
+        assert self.cache.get("dQw4w9WgXcQ", self.fetcher.stt_model) == "new transcript"
+    
+    def test_use_cache_false_forces_transcription(self):
+        """Test that the opt-out flag bypasses the cache."""
+        self.cache.put("dQw4w9WgXcQ", self.fetcher.stt_model, "stale transcript")
+        
+        with patch.object(self.fetcher, '_download_and_transcribe', return_value=AudioTranscript(transcript="fresh transcript")) as mock_transcribe:
+            _, transcript = self.fetcher.fetch_and_transcribe("dQw4w9WgXcQ", use_cache=False)
+        
+        assert transcript == "fresh transcript"
+        mock_transcribe.assert_called_once()
+    
+    def test_forced_refresh_replaces_cached_transcript(self):
+        """Test that a transcription forced with use_cache=False overwrites the stored entry."""
+        self.cache.put("dQw4w9WgXcQ", self.fetcher.stt_model, "bad transcript")
+        
+        with patch.object(self.fetcher, '_download_and_transcribe', return_value=AudioTranscript(transcript="fixed transcript")):
+            self.fetcher.fetch_and_transcribe("dQw4w9WgXcQ", use_cache=False)
+            _, transcript = self.fetcher.fetch_and_transcribe("dQw4w9WgXcQ")
+        
+        assert transcript == "fixed transcript"
+        assert self.cache.get("dQw4w9WgXcQ", self.fetcher.stt_model) == "fixed transcript"
+    
+    def test_expired_transcript_discarded(self):
+        """Test that transcripts older than max_age are not returned."""
+        self.cache.put("dQw4w9WgXcQ", "model", "old transcript")
+        self.cache.max_age = 0
+        
+        assert self.cache.get("dQw4w9WgXcQ", "model") is None